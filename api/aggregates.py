@@ -0,0 +1,202 @@
+"""
+Precomputed aggregate cube over the analysis dataset.
+Holds the number of analysis rows for every combination of the categorical
+dimensions the findings endpoints filter and group by, so charts and stats
+are answered by summing a small dense array instead of scanning rows.
+
+Dimensions (each with a trailing None slot for missing values):
+    HAS_LEGAL_REP, BINARY_OUTCOME, POLICY_ERA   - as stored in analysis_filtered
+    quarter      - calendar quarter of hearing_date_combined
+    time_period  - TIME_PERIODS key whose range contains hearing_date_combined
+    case_type    - CASE_TYPE normalized like apply_filters (single slot if absent)
+The historical time series has its own index (quarter_index.py), so the cube
+does not depend on the current date.
+"""
+from __future__ import annotations
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .models import cache
+from .filters import (
+    TIME_PERIODS, CASE_TYPE_KEY_COLUMN, compile_filters, _pick_date_col, _representation_codes,
+)
+
+DIMENSIONS: List[str] = [
+    "HAS_LEGAL_REP",
+    "BINARY_OUTCOME",
+    "POLICY_ERA",
+    "quarter",
+    "time_period",
+    "case_type",
+]
+
+_build_lock = threading.Lock()
+
+def _encode(values) -> Tuple[np.ndarray, list]:
+    """Codes into sorted labels, missing values mapped to a trailing None label"""
+    codes, uniques = pd.factorize(values)
+    labels = list(uniques)
+    order = sorted(range(len(labels)), key=lambda i: labels[i])
+    rank = np.empty(len(labels) + 1, dtype=np.int64)
+    rank[order] = np.arange(len(labels))
+    rank[-1] = len(labels)
+    return rank[codes], [labels[i] for i in order] + [None]
+
+def _time_period_keys(dates: pd.Series) -> pd.Series:
+    """TIME_PERIODS key whose [start, end) range contains each date (None outside)"""
+    conditions, keys = [], []
+    for key, bounds in TIME_PERIODS.items():
+        if bounds is None:
+            continue
+        start, end = bounds
+        condition = dates >= start
+        if end is not None:
+            condition &= dates < end
+        conditions.append(condition.to_numpy())
+        keys.append(key)
+    selected = np.select(conditions, keys, default="").astype(object)
+    selected[selected == ""] = None
+    return pd.Series(selected, index=dates.index)
+
+class AggregateCube:
+    """Dense row counts over DIMENSIONS with the labels of every axis"""
+
+    def __init__(self, counts: np.ndarray, labels: Dict[str, list]):
+        self.counts = counts
+        self.labels = labels
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AggregateCube":
+        date_col = _pick_date_col(df)
+        if date_col is not None:
+            dates = pd.to_datetime(df[date_col], errors="coerce")
+        else:
+            dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+
+        columns = {
+            "HAS_LEGAL_REP": df["HAS_LEGAL_REP"],
+            "BINARY_OUTCOME": df["BINARY_OUTCOME"],
+            "POLICY_ERA": df["POLICY_ERA"],
+            "quarter": dates.dt.to_period("Q"),
+            "time_period": _time_period_keys(dates),
+        }
+        if CASE_TYPE_KEY_COLUMN in df.columns:
+            columns["case_type"] = df[CASE_TYPE_KEY_COLUMN]
+        elif "CASE_TYPE" in df.columns:
+            columns["case_type"] = df["CASE_TYPE"].astype(str).str.strip().str.lower()
+
+        codes, labels = [], {}
+        for dim in DIMENSIONS:
+            if dim in columns:
+                dim_codes, dim_labels = _encode(columns[dim])
+            else:
+                dim_codes, dim_labels = np.zeros(len(df), dtype=np.int64), [None]
+            codes.append(dim_codes)
+            labels[dim] = dim_labels
+
+        shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+        flat = np.ravel_multi_index(codes, shape) if len(df) else np.empty(0, dtype=np.int64)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+        return cls(counts, labels)
+
+    def masks(self, filters) -> Dict[str, np.ndarray]:
+        """Per-dimension label masks equivalent to filters.apply_filters (Filters, dict or FilterPlan)"""
+        masks: Dict[str, np.ndarray] = {}
+        plan = compile_filters(filters)
+        if plan.time_period is not None:
+            masks["time_period"] = np.array(
+                [label == plan.time_period for label in self.labels["time_period"]]
+            )
+        if plan.rep_code is not None:
+            codes = _representation_codes(pd.DataFrame({"HAS_LEGAL_REP": self.labels["HAS_LEGAL_REP"]}))
+            masks["HAS_LEGAL_REP"] = codes == plan.rep_code
+        if plan.case_type_key is not None and self.labels["case_type"] != [None]:
+            masks["case_type"] = np.array([label == plan.case_type_key for label in self.labels["case_type"]])
+        return masks
+
+    def select(self, masks: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Counts restricted to the labels selected by masks (all labels when absent)"""
+        counts = self.counts
+        for axis, dim in enumerate(DIMENSIONS):
+            if masks and dim in masks:
+                counts = np.compress(masks[dim], counts, axis=axis)
+        return counts
+
+    def total(self, masks: Optional[Dict[str, np.ndarray]] = None) -> int:
+        """Number of rows selected by masks"""
+        return int(self.select(masks).sum())
+
+    def value_counts(self, dim: str, masks: Optional[Dict[str, np.ndarray]] = None) -> pd.Series:
+        """Selected row counts per non-missing label of dim"""
+        counts = self.select(masks)
+        axis = DIMENSIONS.index(dim)
+        totals = counts.sum(axis=tuple(a for a in range(counts.ndim) if a != axis))
+        labels = self._labels(dim, masks)
+        return pd.Series(
+            {label: int(count) for label, count in zip(labels, totals) if label is not None and count > 0},
+            dtype=np.int64,
+        )
+
+    def _labels(self, dim: str, masks: Optional[Dict[str, np.ndarray]]) -> list:
+        labels = self.labels[dim]
+        if masks and dim in masks:
+            labels = [label for label, keep in zip(labels, masks[dim]) if keep]
+        return labels
+
+    def crosstab(self, index: str, columns: str,
+                 masks: Optional[Dict[str, np.ndarray]] = None,
+                 normalize: bool = False) -> pd.DataFrame:
+        """Equivalent of pd.crosstab(df[index], df[columns]) over the selected rows"""
+        counts = self.select(masks)
+        i, j = DIMENSIONS.index(index), DIMENSIONS.index(columns)
+        other = tuple(axis for axis in range(counts.ndim) if axis not in (i, j))
+        table = counts.sum(axis=other)
+        if i > j:
+            table = table.T
+        row_labels = self._labels(index, masks)
+        col_labels = self._labels(columns, masks)
+
+        # crosstab drops missing values and labels that never occur
+        rows = np.array([label is not None for label in row_labels])
+        cols = np.array([label is not None for label in col_labels])
+        table = table[np.ix_(rows, cols)]
+        row_labels = [label for label in row_labels if label is not None]
+        col_labels = [label for label in col_labels if label is not None]
+        rows = table.sum(axis=1) > 0
+        cols = table.sum(axis=0) > 0
+        table = table[np.ix_(rows, cols)]
+
+        result = pd.DataFrame(
+            table.astype(np.int64),
+            index=pd.Index([label for label, keep in zip(row_labels, rows) if keep], name=index),
+            columns=pd.Index([label for label, keep in zip(col_labels, cols) if keep], name=columns),
+        )
+        if normalize:
+            result = result.div(result.sum(axis=1), axis=0)
+        return result
+
+def build_aggregates(analysis_filtered: Optional[pd.DataFrame] = None) -> Optional[AggregateCube]:
+    """Build the cube from analysis_filtered and store it in the cache"""
+    if analysis_filtered is None:
+        analysis_filtered = cache.get('analysis_filtered')
+    if analysis_filtered is None or analysis_filtered.empty:
+        return None
+    cube = AggregateCube.from_frame(analysis_filtered)
+    cache.set('aggregates', cube)
+    print(f"🧊 Built aggregate cube {cube.counts.shape} from {len(analysis_filtered):,} rows")
+    return cube
+
+def get_aggregates() -> Optional[AggregateCube]:
+    """Cached cube, built on first use after loading from cache"""
+    cube = cache.get('aggregates')
+    if cube is not None:
+        return cube
+    with _build_lock:
+        cube = cache.get('aggregates')
+        if cube is None:
+            cube = build_aggregates()
+    return cube
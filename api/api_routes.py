@@ -5,20 +5,51 @@ from flask import jsonify, request
 from datetime import datetime
 
 # Local imports
-from .data_loader import load_data, download_raw_files_from_google_drive, save_to_cache
-from .data_processor import get_data_statistics, process_analysis_data
+from .data_loader import load_data, load_status, remap_shared_tables, download_raw_files_from_google_drive
 from .chart_generator import (
     generate_representation_outcomes_chart,
     generate_time_series_chart,
     generate_chi_square_analysis,
     generate_outcome_percentages_chart,
-    generate_countries_chart
+    generate_countries_chart,
+    findings_slice
 )
 from .basic_stats import get_basic_statistics, get_filtered_statistics
 from .models import cache
+from .config import LOAD_WAIT_TIMEOUT, LOAD_RETRY_AFTER, MEMORY_BUDGET_MB
+from .pipeline import start_reload, reload_status
+from .compaction import compaction_report
+from .overview import get_overview_view
 from .filters import Filters, filter_options
+from .response_cache import response_cache, cached_response
 from .email_service import email_service
 
+# Endpoints that answer without the dataset and never wait for a load
+NO_DATA_ENDPOINTS = {'health', 'data_status', 'force_reload_data', 'contact'}
+
+def require_data():
+    """
+    before_request hook: join the data load in flight (or start it) and wait
+    up to LOAD_WAIT_TIMEOUT; past that, answer 503 with Retry-After instead
+    of tying up a worker thread
+    """
+    if request.endpoint in NO_DATA_ENDPOINTS or request.method == 'OPTIONS':
+        return None
+    if load_data(timeout=LOAD_WAIT_TIMEOUT) or load_status()['state'] != 'loading':
+        return None
+    response = jsonify({"error": "Data is still loading, please retry shortly", "load": load_status()})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(LOAD_RETRY_AFTER)
+    return response
+
+def refresh_shared_data():
+    """
+    before_request hook (memory-mapped mode): pick up a shared store rewritten
+    by another worker's reload, dropping the responses built from the old data
+    """
+    if remap_shared_tables():
+        response_cache.clear()
+
 def health():
     """Health check endpoint"""
     return jsonify({
@@ -35,72 +66,25 @@ def meta_options():
         if not load_data():
             return jsonify({"error": "No data loaded"}), 500
         analysis_filtered = cache.get('analysis_filtered')
-        from .filters import filter_options
         opts = filter_options(analysis_filtered if analysis_filtered is not None else cache.get('merged_data'))
         return jsonify({"options": opts})
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 def get_overview():
-    """Get overview statistics from real data"""
+    """Overview statistics, served from the view materialized at load (304 when the client's ETag matches)"""
     try:
         # Load data if not already loaded
         if not load_data():
             return jsonify({"error": "Failed to load data"}), 500
         
-        # Get real statistics from the data
-        stats = get_data_statistics()
-        if stats is None:
+        view = get_overview_view()
+        if view is None:
             return jsonify({"error": "Failed to calculate statistics"}), 500
         
-        # Calculate time series trends if we have date data
-        trends = {}
-        juvenile_cases = cache.get('juvenile_cases')
-        if juvenile_cases is not None and 'LATEST_HEARING' in juvenile_cases.columns:
-            try:
-                # Filter only historical data (not future scheduled hearings)
-                import pandas as pd
-                current_date = pd.Timestamp.now()
-                
-                # Group by month for trends - only historical data
-                historical_data = juvenile_cases[
-                    (juvenile_cases['LATEST_HEARING'].notna()) & 
-                    (juvenile_cases['LATEST_HEARING'] <= current_date)
-                ].copy()
-                
-                if len(historical_data) > 0:
-                    historical_data['month'] = historical_data['LATEST_HEARING'].dt.to_period('M')
-                    monthly_counts = historical_data.groupby('month').size()
-                    
-                    # Convert to dictionary for JSON serialization - last 12 months
-                    trends = {
-                        "monthly_cases": {
-                            str(month): count for month, count in monthly_counts.tail(12).items()
-                        }
-                    }
-                else:
-                    trends = {"monthly_cases": {}}
-            except Exception as e:
-                print(f"Error calculating trends: {str(e)}")
-                trends = {"monthly_cases": {}}
-        
-        # Structure the response to match frontend expectations
-        overview_data = {
-            "total_cases": stats['total_cases'],
-            "average_age": stats.get('average_age'),
-            "representation_rate": stats.get('representation_rate', 0),
-            "top_nationalities": stats['nationalities'],
-            "demographic_breakdown": {
-                "by_gender": stats['gender'],
-                "by_custody": stats['custody'],
-                "by_case_type": stats['case_types']
-            },
-            "representation_breakdown": stats.get('attorney_types', {}),
-            "language_breakdown": stats['languages'],
-            "trends": trends
-        }
-        
-        return jsonify(overview_data)
+        response = jsonify(view.payload)
+        response.set_etag(view.etag)
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
@@ -125,28 +109,18 @@ def load_data_endpoint():
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 def force_reload_data():
-    """Force reload data from Google Drive (clear cache first)"""
+    """
+    Force reload data from Google Drive in the background (202 Accepted).
+    The new version is built off to the side and swapped in when complete;
+    until then requests keep being served from the current data.
+    """
     try:
-        # Clear cache
-        cache.clear()
-        
-        # Force download from Google Drive
-        success = download_raw_files_from_google_drive()
-        if success:
-            # Load the downloaded files
-            success = load_data()
-            if success:
-                stats = cache.get_stats()
-                return jsonify({
-                    "status": "success",
-                    "message": "Data force-reloaded from Google Drive",
-                    "cases_count": stats.get('juvenile_cases', 0),
-                    "proceedings_count": stats.get('proceedings', 0),
-                    "reps_count": stats.get('reps_assigned', 0),
-                    "analysis_count": stats.get('analysis_filtered', 0)
-                })
-        
-        return jsonify({"error": "Failed to reload data from Google Drive"}), 500
+        started = start_reload(lambda: download_raw_files_from_google_drive(force=True))
+        return jsonify({
+            "status": "accepted" if started else "in_progress",
+            "message": "Reload started" if started else "A reload is already running",
+            "reload": reload_status()
+        }), 202
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
@@ -154,20 +128,33 @@ def data_status():
     """Check if data is loaded and get basic info"""
     try:
         stats = cache.get_stats()
+        memory = cache.resident_memory()
         return jsonify({
             "data_loaded": cache.is_loaded(),
             "cases_loaded": cache.get('juvenile_cases') is not None,
             "proceedings_loaded": cache.get('proceedings') is not None,
             "reps_loaded": cache.get('reps_assigned') is not None,
             "lookup_loaded": cache.get('lookup_decisions') is not None,
-            "lookup_juvenile_loaded": cache.get('lookup_juvenile') is not None,
+            "lookup_juvenile_loaded": cache.peek('lookup_juvenile') is not None,
+            "lazy_tables": [key for key, value in stats.items() if value == "lazy"],
             "cases_count": stats.get('juvenile_cases', 0),
             "proceedings_count": stats.get('proceedings', 0),
-            "reps_count": stats.get('reps_assigned', 0)
+            "reps_count": stats.get('reps_assigned', 0),
+            "dataset_version": cache.version(),
+            "memory_usage_mb": {key: round(size / 1024 / 1024, 2) for key, size in memory.items()},
+            "memory_total_mb": round(sum(memory.values()) / 1024 / 1024, 2),
+            "memory_budget_mb": MEMORY_BUDGET_MB,
+            "spilled_tables": [key for key, value in stats.items() if value == "spilled"],
+            "dropped_tables": [key for key, value in stats.items() if value == "dropped"],
+            "compaction": compaction_report(),
+            "load": load_status(),
+            "reload": reload_status(),
+            "response_cache": response_cache.stats()
         })
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('representation-outcomes')
 def representation_outcomes():
     """Generate Plotly chart data for representation vs outcomes chart (EXACTLY like notebook)"""
     try:
@@ -175,10 +162,9 @@ def representation_outcomes():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
-        chart_data = generate_representation_outcomes_chart(filters.to_dict())
+        chart_data = generate_representation_outcomes_chart(filters)
         if "error" in chart_data:
             return jsonify(chart_data), 500
         
@@ -187,6 +173,7 @@ def representation_outcomes():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('time-series')
 def time_series_analysis():
     """Generate Plotly time series chart exactly like notebook"""
     try:
@@ -194,10 +181,9 @@ def time_series_analysis():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
-        chart_data = generate_time_series_chart(filters.to_dict())
+        chart_data = generate_time_series_chart(filters)
         if "error" in chart_data:
             return jsonify(chart_data), 500
         
@@ -206,6 +192,7 @@ def time_series_analysis():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('chi-square')
 def chi_square_analysis():
     """Generate chi-square analysis results (like notebook) - handle empty data gracefully"""
     try:
@@ -213,15 +200,15 @@ def chi_square_analysis():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
-        results = generate_chi_square_analysis(filters.to_dict())
+        results = generate_chi_square_analysis(filters)
         return jsonify(results)
         
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('outcome-percentages')
 def outcome_percentages():
     """Generate the percentage breakdown chart EXACTLY like notebook"""
     try:
@@ -229,10 +216,9 @@ def outcome_percentages():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
-        chart_data = generate_outcome_percentages_chart(filters.to_dict())
+        chart_data = generate_outcome_percentages_chart(filters)
         if "error" in chart_data:
             return jsonify(chart_data), 500
         
@@ -241,6 +227,7 @@ def outcome_percentages():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('countries')
 def countries_chart():
     """Generate the countries by case volume chart with enhanced hover tooltips"""
     try:
@@ -248,10 +235,9 @@ def countries_chart():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
-        chart_data = generate_countries_chart(filters.to_dict())
+        chart_data = generate_countries_chart(filters)
         if "error" in chart_data:
             return jsonify(chart_data), 500
         
@@ -276,6 +262,7 @@ def basic_statistics():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('overview-filtered')
 def get_filtered_overview():
     """Get overview statistics with filters applied"""
     try:
@@ -284,7 +271,6 @@ def get_filtered_overview():
             return jsonify({"error": "Failed to load data"}), 500
         
         # Get filter parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
         # Get filtered statistics
@@ -297,40 +283,43 @@ def get_filtered_overview():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@cached_response('all')
 def get_all_findings_data():
-    """Get all findings chart data in a single request to reduce API calls"""
+    """Get all findings chart data in a single request, filtering and tabulating the data once"""
     try:
         if not load_data():
             return jsonify({"error": "Failed to load or process data"}), 500
         
         # Get filters from request parameters
-        from .filters import Filters
         filters = Filters.from_query(request.args)
         
+        # Filtered slice and crosstabs shared by every chart
+        findings = findings_slice(filters)
+        
         results = {}
         errors = []
         
         # Try to generate each chart, handling errors individually
         try:
-            results['representationOutcomes'] = generate_representation_outcomes_chart(filters)
+            results['representationOutcomes'] = generate_representation_outcomes_chart(filters, findings)
         except Exception as e:
             results['representationOutcomes'] = {"error": f"Representation chart error: {str(e)}"}
             errors.append(f"Representation outcomes: {str(e)}")
         
         try:
-            results['timeSeriesAnalysis'] = generate_time_series_chart(filters)
+            results['timeSeriesAnalysis'] = generate_time_series_chart(filters, findings)
         except Exception as e:
             results['timeSeriesAnalysis'] = {"error": f"Time series chart error: {str(e)}"}
             errors.append(f"Time series analysis: {str(e)}")
         
         try:
-            results['chiSquareAnalysis'] = generate_chi_square_analysis(filters)
+            results['chiSquareAnalysis'] = generate_chi_square_analysis(filters, findings)
         except Exception as e:
             results['chiSquareAnalysis'] = {"error": f"Chi-square analysis error: {str(e)}"}
             errors.append(f"Chi-square analysis: {str(e)}")
         
         try:
-            results['outcomePercentages'] = generate_outcome_percentages_chart(filters)
+            results['outcomePercentages'] = generate_outcome_percentages_chart(filters, findings)
         except Exception as e:
             results['outcomePercentages'] = {"error": f"Outcome percentages error: {str(e)}"}
             errors.append(f"Outcome percentages: {str(e)}")
@@ -353,7 +342,6 @@ def get_all_findings_data():
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
-
 def contact():
     """Handle contact form submissions"""
     if request.method != 'POST':
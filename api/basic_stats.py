@@ -6,6 +6,7 @@ import pandas as pd
 # Local imports
 from .models import cache
 from .filters import apply_filters, Filters
+from .aggregates import get_aggregates
 
 def get_basic_statistics():
     """Get basic statistics for the data page (success rates, barriers, etc.)"""
@@ -64,21 +65,22 @@ def get_basic_statistics():
 def get_filtered_statistics(filters):
     """Get filtered statistics for the findings page cards"""
     try:
-        # Get the filtered dataset
-        analysis_filtered = cache.get('analysis_filtered')
-        if analysis_filtered is None or analysis_filtered.empty:
+        # Select the filtered slice of the aggregate cube
+        cube = get_aggregates()
+        if cube is None:
             return None
         
-        # Apply filters to the data
-        filtered_data = apply_filters(analysis_filtered, filters)
-        if filtered_data is None or filtered_data.empty:
+        masks = cube.masks(filters)
+        total_cases = cube.total(masks)
+        if total_cases == 0:
             return None
         
         # Calculate success rates
-        percentage_data = pd.crosstab(
-            filtered_data['HAS_LEGAL_REP'],
-            filtered_data['BINARY_OUTCOME'],
-            normalize='index'  # Normalize by rows (representation status)
+        percentage_data = cube.crosstab(
+            'HAS_LEGAL_REP',
+            'BINARY_OUTCOME',
+            masks,
+            normalize=True  # Normalize by rows (representation status)
         ) * 100
         
         stats = {}
@@ -100,11 +102,10 @@ def get_filtered_statistics(filters):
             stats['success_without_representation'] = 0.0
         
         # Total cases in filtered dataset
-        total_cases = len(filtered_data)
         stats['total_cases'] = total_cases
         
         # Calculate representation rate in filtered data
-        rep_counts = filtered_data['HAS_LEGAL_REP'].value_counts()
+        rep_counts = cube.value_counts('HAS_LEGAL_REP', masks)
         if total_cases > 0:
             representation_rate = rep_counts.get("Has Legal Representation", 0) / total_cases * 100
             stats['representation_rate'] = round(representation_rate, 1)
@@ -113,8 +114,10 @@ def get_filtered_statistics(filters):
             
         # Years of data (calculate from actual date range if available)
         stats['years_of_data'] = 7  # Default fallback
-        if 'LATEST_HEARING' in filtered_data.columns:
+        analysis_filtered = cache.get('analysis_filtered')
+        if 'LATEST_HEARING' in analysis_filtered.columns:
             try:
+                filtered_data = apply_filters(analysis_filtered, filters, columns=['LATEST_HEARING'])
                 years_range = filtered_data['LATEST_HEARING'].dt.year.nunique()
                 if years_range > 0:
                     stats['years_of_data'] = years_range
@@ -3,112 +3,90 @@ Chart generation functionality for the juvenile immigration API
 """
 import pandas as pd
 import numpy as np
-import json
-import plotly.graph_objects as go
-import plotly.utils
-from scipy import stats
+from functools import cached_property
 
 # Local imports
 from .config import START_DATE, ADMIN_CHANGES
 from .models import cache
-from .filters import apply_filters, Filters
+from .filters import compile_filters, filter_index
+from .aggregates import get_aggregates
+from .quarter_index import get_quarter_index
+from .figure_spec import figure_spec, json_value, json_values
+from .contingency import ContingencyStats, row_percentages, odds_ratio as contingency_odds_ratio
 
-def apply_filters(data, filters):
-    """Apply filters to the dataset based on request parameters"""
-    if data is None or data.empty:
-        return data
-    
-    filtered_data = data.copy()
-    
-    # Time period filter - use the appropriate date column
-    if filters.get('time_period') and filters['time_period'] != 'all':
-        # Determine which date column to use
-        date_column = None
-        if 'hearing_date_combined' in filtered_data.columns:
-            date_column = 'hearing_date_combined'
-        elif 'LATEST_HEARING' in filtered_data.columns:
-            date_column = 'LATEST_HEARING'
-        
-        if date_column:
-            # Ensure the date column is datetime
-            if not pd.api.types.is_datetime64_any_dtype(filtered_data[date_column]):
-                filtered_data[date_column] = pd.to_datetime(filtered_data[date_column])
-            
-            if filters['time_period'] == 'trump1':
-                # Trump I (2018-2020)
-                filtered_data = filtered_data[
-                    (filtered_data[date_column] >= '2018-01-01') & 
-                    (filtered_data[date_column] <= '2020-12-31')
-                ]
-            elif filters['time_period'] == 'biden':
-                # Biden (2021-2024)
-                filtered_data = filtered_data[
-                    (filtered_data[date_column] >= '2021-01-01') & 
-                    (filtered_data[date_column] <= '2024-12-31')
-                ]
-            elif filters['time_period'] == 'trump2':
-                # Trump II (2025)
-                filtered_data = filtered_data[
-                    filtered_data[date_column] >= '2025-01-01'
-                ]
-    
-    # Representation filter
-    if filters.get('representation') and filters['representation'] != 'all':
-        if 'HAS_LEGAL_REP' in filtered_data.columns:
-            if filters['representation'] == 'represented':
-                # Check different possible values for represented
-                possible_yes_values = ['Yes', 'Has Legal Representation', 'Y', '1', 1, True]
-                filtered_data = filtered_data[filtered_data['HAS_LEGAL_REP'].isin(possible_yes_values)]
-            elif filters['representation'] == 'unrepresented':
-                # Check different possible values for unrepresented
-                possible_no_values = ['No', 'No Legal Representation', 'N', '0', 0, False]
-                filtered_data = filtered_data[filtered_data['HAS_LEGAL_REP'].isin(possible_no_values)]
-    
-    # Case type filter (this would need to be implemented based on available data)
-    if filters.get('case_type') and filters['case_type'] != 'all':
-        # This would depend on what case type fields are available in the data
-        # For now, we'll skip this filter
-        pass
-    
-    return filtered_data
+class FindingsSlice:
+    """
+    The filtered slice of the aggregate cube and the crosstabs the findings
+    charts share, so a batched request filters and tabulates only once
+    """
+
+    def __init__(self, cube, filters=None):
+        self.cube = cube
+        self.filters = filters
+        self.masks = cube.masks(filters)
+        self.total = cube.total(self.masks)
+
+    @property
+    def is_empty(self):
+        """Active filters select no rows (an unfiltered empty slice is not "filtered-empty")"""
+        return self.total == 0 and not compile_filters(self.filters).is_empty
+
+    @cached_property
+    def rep_outcome_counts(self):
+        """Counts of HAS_LEGAL_REP x BINARY_OUTCOME"""
+        return self.cube.crosstab('HAS_LEGAL_REP', 'BINARY_OUTCOME', self.masks)
 
-def generate_representation_outcomes_chart(filters=None):
+    @cached_property
+    def rep_outcome_percentages(self):
+        """Outcome percentages within each representation status (rows sum to 100)"""
+        counts = self.rep_outcome_counts
+        return pd.DataFrame(row_percentages(counts.to_numpy()), index=counts.index, columns=counts.columns)
+
+    @cached_property
+    def quarterly_representation(self):
+        """Historical total and represented cases per quarter, from the quarter index"""
+        return get_quarter_index().quarterly_representation(self.filters)
+
+    @cached_property
+    def era_rep_counts(self):
+        """Counts of POLICY_ERA x HAS_LEGAL_REP"""
+        return self.cube.crosstab('POLICY_ERA', 'HAS_LEGAL_REP', self.masks)
+
+def findings_slice(filters=None):
+    """FindingsSlice of the cached aggregate cube (None when there is no analysis data)"""
+    cube = get_aggregates()
+    if cube is None:
+        return None
+    return FindingsSlice(cube, filters)
+
+def generate_representation_outcomes_chart(filters=None, findings=None):
     """Generate Plotly chart for representation vs outcomes (EXACTLY like notebook)"""
-    analysis_filtered = cache.get('analysis_filtered')
+    findings = findings or findings_slice(filters)
     
-    if analysis_filtered is None or analysis_filtered.empty:
+    if findings is None:
         return {"error": "No analysis data available"}
     
-    # Apply filters if provided
-    if filters:
-        analysis_filtered = apply_filters(analysis_filtered, filters)
-        if analysis_filtered.empty:
-            return {"error": "No data available for the selected filters"}
+    # Filters are applied by the slice
+    if findings.is_empty:
+        return {"error": "No data available for the selected filters"}
     
     try:
         print("Generating representation outcomes chart EXACTLY like notebook...")
         
         # EXACTLY like notebook: Create count data
-        crosstab_counts = pd.crosstab(
-            analysis_filtered['HAS_LEGAL_REP'], 
-            analysis_filtered['BINARY_OUTCOME']
-        )
+        crosstab_counts = findings.rep_outcome_counts
         
         print("Count data:")
         print(crosstab_counts)
         
         # EXACTLY like notebook: Calculate percentages (normalize by index - each row sums to 100%)
-        percentage_data = pd.crosstab(
-            analysis_filtered['HAS_LEGAL_REP'],
-            analysis_filtered['BINARY_OUTCOME'], 
-            normalize='index'  # EXACTLY like notebook - percentages within each representation category
-        ) * 100
+        percentage_data = findings.rep_outcome_percentages
         
         print("Percentage data:")
         print(percentage_data.round(1))
         
-        # Create Plotly figure for count plot with log scale (EXACTLY like notebook)
-        fig = go.Figure()
+        # Plotly figure for count plot with log scale (EXACTLY like notebook)
+        traces = []
         
         # Custom colors EXACTLY like notebook - using RGBA format for transparency
         colors = {
@@ -125,75 +103,61 @@ def generate_representation_outcomes_chart(filters=None):
                 # Get percentages for text labels
                 percentages = percentage_data[outcome] if outcome in percentage_data.columns else [0] * len(categories)
                 
-                fig.add_trace(go.Bar(
-                    name=outcome,
-                    x=categories,
-                    y=crosstab_counts[outcome],
-                    marker_color=colors.get(outcome, '#888888'),
-                    text=[f"{p:.1f}%" for p in percentages],
-                    textposition='inside',
-                    textfont=dict(color='white', size=12)
-                ))
-        
-        # Update layout EXACTLY like notebook
-        fig.update_layout(
-            title={
+                traces.append({
+                    'type': 'bar',
+                    'name': outcome,
+                    'x': json_values(categories),
+                    'y': json_values(crosstab_counts[outcome]),
+                    'marker': {'color': colors.get(outcome, '#888888')},
+                    'text': [f"{p:.1f}%" for p in percentages],
+                    'textposition': 'inside',
+                    'textfont': {'color': 'white', 'size': 12}
+                })
+        
+        # Layout EXACTLY like notebook
+        layout = {
+            'title': {
                 'text': 'Case Outcomes by Legal Representation Status',
                 'x': 0.5,
                 'font': {'size': 16, 'family': 'Arial, sans-serif', 'color': '#333'}
             },
-            barmode='group',  # Side by side bars like seaborn countplot
-            xaxis={
-                'title': 'Legal Representation',
+            'barmode': 'group',  # Side by side bars like seaborn countplot
+            'xaxis': {
+                'title': {'text': 'Legal Representation', 'font': {'size': 14}},
                 'tickangle': 0,
-                'title_font': {'size': 14},
                 'showgrid': False
             },
-            yaxis={
-                'title': 'Count',
+            'yaxis': {
+                'title': {'text': 'Count', 'font': {'size': 14}},
                 'type': 'log',  # Log scale EXACTLY like notebook
-                'title_font': {'size': 14},
                 'showgrid': True,
                 'gridcolor': 'rgba(128,128,128,0.3)'
             },
-            showlegend=True,
-            legend=dict(
-                title='Case Outcome',
-                orientation='v',
-                x=1.02,
-                y=1
-            ),
-            margin=dict(t=80, l=80, r=120, b=100),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family='Arial, sans-serif'),
-            width=800,
-            height=500
-        )
-        
-        # Convert to JSON format for frontend
-        chart_data = {
-            'data': fig.data,
-            'layout': fig.layout,
-            'config': {
-                'responsive': True,
-                'displayModeBar': True,
-                'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
-                'displaylogo': False
-            }
+            'showlegend': True,
+            'legend': {
+                'title': {'text': 'Case Outcome'},
+                'orientation': 'v',
+                'x': 1.02,
+                'y': 1
+            },
+            'margin': {'t': 80, 'l': 80, 'r': 120, 'b': 100},
+            'plot_bgcolor': 'white',
+            'paper_bgcolor': 'white',
+            'font': {'family': 'Arial, sans-serif'},
+            'width': 800,
+            'height': 500
         }
         
+        # Figure spec for frontend
+        result = figure_spec(traces, layout)
+        
         # Also return summary data for debugging
-        summary_data = {
+        result['summary'] = {
             'count_data': crosstab_counts.to_dict(),
             'percentage_data': percentage_data.round(1).to_dict(),
-            'total_cases': len(analysis_filtered)
+            'total_cases': findings.total
         }
         
-        # Convert to JSON-serializable format
-        result = json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
-        result['summary'] = summary_data
-        
         return result
         
     except Exception as e:
@@ -202,37 +166,28 @@ def generate_representation_outcomes_chart(filters=None):
         traceback.print_exc()
         return {"error": f"Chart generation error: {str(e)}"}
 
-def generate_outcome_percentages_chart(filters=None):
+def generate_outcome_percentages_chart(filters=None, findings=None):
     """Generate the percentage breakdown chart EXACTLY like notebook (stacked bar chart)"""
-    analysis_filtered = cache.get('analysis_filtered')
+    findings = findings or findings_slice(filters)
     
-    if analysis_filtered is None or analysis_filtered.empty:
+    if findings is None:
         return {"error": "No analysis data available"}
     
-    # Apply filters if provided
-    if filters:
-        analysis_filtered = apply_filters(analysis_filtered, filters)
-        if analysis_filtered.empty:
-            return {"error": "No data available for the selected filters"}
+    # Filters are applied by the slice
+    if findings.is_empty:
+        return {"error": "No data available for the selected filters"}
     
     try:
         print("Generating outcome percentages chart EXACTLY like notebook...")
         
-        # EXACTLY like notebook: Calculate percentages correctly
-        percentage_data = (
-            pd.crosstab(
-                analysis_filtered["HAS_LEGAL_REP"],
-                analysis_filtered["BINARY_OUTCOME"],
-                normalize="index",  # EXACTLY like notebook - normalize by rows
-            )
-            * 100
-        )
+        # EXACTLY like notebook: Calculate percentages correctly (normalized by rows)
+        percentage_data = findings.rep_outcome_percentages
         
         print("Percentage breakdown of outcomes by legal representation:")
         print(percentage_data.round(1))
         
-        # Create stacked bar chart EXACTLY like notebook
-        fig = go.Figure()
+        # Stacked bar chart EXACTLY like notebook
+        traces = []
         
         # Colors for the stacked chart (using Set2 colormap style)
         colors = {
@@ -245,74 +200,60 @@ def generate_outcome_percentages_chart(filters=None):
         # Add stacked bars for each outcome
         for outcome in ['Favorable', 'Unfavorable']:
             if outcome in percentage_data.columns:
-                fig.add_trace(go.Bar(
-                    name=outcome,
-                    x=categories,
-                    y=percentage_data[outcome],
-                    marker_color=colors.get(outcome, '#888888'),
-                    text=[f"{p:.1f}%" for p in percentage_data[outcome]],
-                    textposition='inside',
-                    textfont=dict(color='white', size=12)
-                ))
-        
-        # Update layout EXACTLY like notebook
-        fig.update_layout(
-            title={
+                traces.append({
+                    'type': 'bar',
+                    'name': outcome,
+                    'x': json_values(categories),
+                    'y': json_values(percentage_data[outcome]),
+                    'marker': {'color': colors.get(outcome, '#888888')},
+                    'text': [f"{p:.1f}%" for p in percentage_data[outcome]],
+                    'textposition': 'inside',
+                    'textfont': {'color': 'white', 'size': 12}
+                })
+        
+        # Layout EXACTLY like notebook
+        layout = {
+            'title': {
                 'text': 'Case Outcome Percentages by Legal Representation Status',
                 'x': 0.5,
                 'font': {'size': 16, 'family': 'Arial, sans-serif', 'color': '#333'}
             },
-            barmode='stack',  # Stacked bars EXACTLY like notebook
-            xaxis={
-                'title': 'Legal Representation',
+            'barmode': 'stack',  # Stacked bars EXACTLY like notebook
+            'xaxis': {
+                'title': {'text': 'Legal Representation', 'font': {'size': 14}},
                 'tickangle': 0,
-                'title_font': {'size': 14},
                 'showgrid': False
             },
-            yaxis={
-                'title': 'Percentage (%)',
-                'title_font': {'size': 14},
+            'yaxis': {
+                'title': {'text': 'Percentage (%)', 'font': {'size': 14}},
                 'showgrid': True,
                 'gridcolor': 'rgba(128,128,128,0.3)',
                 'range': [0, 100]
             },
-            showlegend=True,
-            legend=dict(
-                title='Case Outcome',
-                orientation='v',
-                x=1.02,
-                y=1
-            ),
-            margin=dict(t=80, l=80, r=120, b=100),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family='Arial, sans-serif'),
-            width=800,
-            height=500
-        )
-        
-        # Convert to JSON format for frontend
-        chart_data = {
-            'data': fig.data,
-            'layout': fig.layout,
-            'config': {
-                'responsive': True,
-                'displayModeBar': True,
-                'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
-                'displaylogo': False
-            }
+            'showlegend': True,
+            'legend': {
+                'title': {'text': 'Case Outcome'},
+                'orientation': 'v',
+                'x': 1.02,
+                'y': 1
+            },
+            'margin': {'t': 80, 'l': 80, 'r': 120, 'b': 100},
+            'plot_bgcolor': 'white',
+            'paper_bgcolor': 'white',
+            'font': {'family': 'Arial, sans-serif'},
+            'width': 800,
+            'height': 500
         }
         
+        # Figure spec for frontend
+        result = figure_spec(traces, layout)
+        
         # Also return the actual percentage values
-        summary_data = {
+        result['summary'] = {
             'percentage_breakdown': percentage_data.round(1).to_dict(),
-            'total_cases': len(analysis_filtered)
+            'total_cases': findings.total
         }
         
-        # Convert to JSON-serializable format
-        result = json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
-        result['summary'] = summary_data
-        
         return result
         
     except Exception as e:
@@ -321,36 +262,21 @@ def generate_outcome_percentages_chart(filters=None):
         traceback.print_exc()
         return {"error": f"Percentage chart generation error: {str(e)}"}
 
-def generate_time_series_chart(filters=None):
+def generate_time_series_chart(filters=None, findings=None):
     """Generate Plotly time series chart with focused timeframe exactly like notebook"""
-    analysis_filtered = cache.get('analysis_filtered')
+    findings = findings or findings_slice(filters)
     
-    if analysis_filtered is None or analysis_filtered.empty:
+    if findings is None:
         return {"error": "No analysis data available"}
     
-    # Apply filters if provided
-    if filters:
-        analysis_filtered = apply_filters(analysis_filtered, filters)
-        if analysis_filtered.empty:
-            return {"error": "No data available for the selected filters"}
+    # Filters are applied by the slice
+    if findings.is_empty:
+        return {"error": "No data available for the selected filters"}
     
     try:
-        # Filter data with valid dates (like notebook) - use hearing_date_combined column
-        # Also filter out future dates (scheduled hearings) to show only historical trends
-        current_date = pd.Timestamp.now()
-        
-        date_valid = ~analysis_filtered['hearing_date_combined'].isna()
-        historical_only = analysis_filtered['hearing_date_combined'] <= current_date
-        
-        time_series_df = analysis_filtered[date_valid & historical_only].copy()
-        
-        # Create quarterly data (like notebook)
-        time_series_df['YEAR_QUARTER'] = time_series_df['hearing_date_combined'].dt.to_period('Q')
-        
-        quarterly_rep = time_series_df.groupby('YEAR_QUARTER').agg(
-            total_cases=('HAS_LEGAL_REP', 'count'),
-            represented_cases=('HAS_LEGAL_REP', lambda x: (x == 'Has Legal Representation').sum())
-        )
+        # Quarterly data (like notebook) over rows with valid, historical hearing_date_combined
+        # Future dates (scheduled hearings) are left out to show only historical trends
+        quarterly_rep = findings.quarterly_representation
         quarterly_rep['representation_rate'] = quarterly_rep['represented_cases'] / quarterly_rep['total_cases']
         
         # Plot representation rates over time with focused timeframe
@@ -368,19 +294,17 @@ def generate_time_series_chart(filters=None):
             & (quarterly_rep["YEAR_QUARTER_START"] <= current_date)
         ]
         
-        # Create Plotly figure exactly like notebook
-        fig = go.Figure()
-        
-        # Plot the main time series line with filtered data
-        fig.add_trace(go.Scatter(
-            x=filtered_data["YEAR_QUARTER_START"],
-            y=filtered_data["representation_rate"],
-            mode='lines+markers',
-            name='Representation Rate',
-            line=dict(color='navy', width=2),
-            marker=dict(size=6, color='navy'),
-            opacity=0.7
-        ))
+        # Plotly figure exactly like notebook: the main time series line with filtered data
+        traces = [{
+            'type': 'scatter',
+            'x': json_values(filtered_data["YEAR_QUARTER_START"]),
+            'y': json_values(filtered_data["representation_rate"]),
+            'mode': 'lines+markers',
+            'name': 'Representation Rate',
+            'line': {'color': 'navy', 'width': 2},
+            'marker': {'size': 6, 'color': 'navy'},
+            'opacity': 0.7
+        }]
         
         # Add administration changes as vertical lines
         admin_changes = [
@@ -394,79 +318,66 @@ def generate_time_series_chart(filters=None):
         
         for date, label in admin_changes:
             # Add vertical line
-            shapes.append(dict(
-                type="line",
-                x0=date, x1=date,
-                y0=0, y1=1,
-                line=dict(color="red", dash="dash", width=2),
-                opacity=0.6
-            ))
+            shapes.append({
+                'type': "line",
+                'x0': json_value(date), 'x1': json_value(date),
+                'y0': 0, 'y1': 1,
+                'line': {'color': "red", 'dash': "dash", 'width': 2},
+                'opacity': 0.6
+            })
             
             # Add label annotation
-            annotations.append(dict(
-                x=date,
-                y=0.05,  # Position at bottom like in your code
-                text=label,
-                showarrow=False,
-                textangle=-90,
-                xanchor="right",
-                yanchor="bottom",
-                font=dict(size=10, color="red")
-            ))
-        
-        # Update layout to match notebook exactly
-        fig.update_layout(
-            title={
+            annotations.append({
+                'x': json_value(date),
+                'y': 0.05,  # Position at bottom like in your code
+                'text': label,
+                'showarrow': False,
+                'textangle': -90,
+                'xanchor': "right",
+                'yanchor': "bottom",
+                'font': {'size': 10, 'color': "red"}
+            })
+        
+        # Layout to match notebook exactly, with alpha transparency grids like in notebook
+        layout = {
+            'title': {
                 'text': 'Legal Representation Rate for Juvenile Immigration Cases (2016-2025)',
                 'x': 0.5,
                 'font': {'size': 14, 'family': 'Arial, sans-serif'}
             },
-            xaxis={
-                'title': 'Year',
-                'title_font': {'size': 14},
-                'tickformat': '%Y'  # Format x-axis to show years clearly
+            'xaxis': {
+                'title': {'text': 'Year', 'font': {'size': 14}},
+                'tickformat': '%Y',  # Format x-axis to show years clearly
+                'showgrid': True,
+                'gridcolor': 'rgba(128,128,128,0.3)'
             },
-            yaxis={
-                'title': 'Representation Rate',
-                'title_font': {'size': 14},
-                'range': [0, 1]  # Adjust as needed based on your data
+            'yaxis': {
+                'title': {'text': 'Representation Rate', 'font': {'size': 14}},
+                'range': [0, 1],  # Adjust as needed based on your data
+                'showgrid': True,
+                'gridcolor': 'rgba(128,128,128,0.3)'
             },
-            shapes=shapes,
-            annotations=annotations,
-            showlegend=False,
-            margin=dict(t=60, l=60, r=30, b=80),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family='Arial, sans-serif'),
-            width=1000,
-            height=500
-        )
-        
-        # Add grid with alpha transparency like in notebook
-        fig.update_yaxes(showgrid=True, gridcolor='rgba(128,128,128,0.3)')
-        fig.update_xaxes(showgrid=True, gridcolor='rgba(128,128,128,0.3)')
-        
-        # Convert to JSON format
-        chart_data = {
-            'data': fig.data,
-            'layout': fig.layout,
-            'config': {
-                'responsive': True,
-                'displayModeBar': True,
-                'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
-                'displaylogo': False
-            }
+            'shapes': shapes,
+            'annotations': annotations,
+            'showlegend': False,
+            'margin': {'t': 60, 'l': 60, 'r': 30, 'b': 80},
+            'plot_bgcolor': 'white',
+            'paper_bgcolor': 'white',
+            'font': {'family': 'Arial, sans-serif'},
+            'width': 1000,
+            'height': 500
         }
-        return json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
+        
+        return figure_spec(traces, layout)
         
     except Exception as e:
         return {"error": f"Chart generation error: {str(e)}"}
 
-def generate_chi_square_analysis(filters=None):
+def generate_chi_square_analysis(filters=None, findings=None):
     """Generate chi-square analysis results (like notebook) - handle empty data gracefully"""
-    analysis_filtered = cache.get('analysis_filtered')
+    findings = findings or findings_slice(filters)
     
-    if analysis_filtered is None or analysis_filtered.empty:
+    if findings is None:
         return {
             "message": "No analysis data available",
             "representation_by_era": {
@@ -496,48 +407,43 @@ def generate_chi_square_analysis(filters=None):
             }
         }
     
-    # Apply filters if provided
-    if filters:
-        analysis_filtered = apply_filters(analysis_filtered, filters)
-        if analysis_filtered.empty:
-            return {
-                "message": "No data available for the selected filters",
-                "representation_by_era": {
-                    'chi_square': 0.0,
-                    'p_value': 1.0,
-                    'degrees_of_freedom': 0,
-                    'cramer_v': 0.0,
-                    'significant': False,
-                    'contingency_table': {},
-                    'interpretation': "No data available for selected filters"
+    # Filters are applied by the slice
+    if findings.is_empty:
+        return {
+            "message": "No data available for the selected filters",
+            "representation_by_era": {
+                'chi_square': 0.0,
+                'p_value': 1.0,
+                'degrees_of_freedom': 0,
+                'cramer_v': 0.0,
+                'significant': False,
+                'contingency_table': {},
+                'interpretation': "No data available for selected filters"
+            },
+            "outcomes_by_representation": {
+                'chi_square': 0.0,
+                'p_value': 1.0,
+                'degrees_of_freedom': 0,
+                'cramer_v': 0.0,
+                'significant': False,
+                'odds_ratio': 0.0,
+                'contingency_table': {},
+                'percentages': {
+                    'data': {},
+                    'with_representation': {'favorable': 0, 'unfavorable': 0},
+                    'without_representation': {'favorable': 0, 'unfavorable': 0}
                 },
-                "outcomes_by_representation": {
-                    'chi_square': 0.0,
-                    'p_value': 1.0,
-                    'degrees_of_freedom': 0,
-                    'cramer_v': 0.0,
-                    'significant': False,
-                    'odds_ratio': 0.0,
-                    'contingency_table': {},
-                    'percentages': {
-                        'data': {},
-                        'with_representation': {'favorable': 0, 'unfavorable': 0},
-                        'without_representation': {'favorable': 0, 'unfavorable': 0}
-                    },
-                    'interpretation': "No data available for selected filters",
-                    'odds_interpretation': "No data available for selected filters"
-                }
+                'interpretation': "No data available for selected filters",
+                'odds_interpretation': "No data available for selected filters"
             }
+        }
     
     results = {}
     
     # Chi-square test for representation by policy era
     try:
         # Create a contingency table for legal representation by policy era
-        era_rep_table = pd.crosstab(
-            analysis_filtered["POLICY_ERA"], 
-            analysis_filtered["HAS_LEGAL_REP"]
-        )
+        era_rep_table = findings.era_rep_counts
         print("Contingency Table: Legal Representation by Policy Era")
         print(era_rep_table)
         
@@ -552,12 +458,10 @@ def generate_chi_square_analysis(filters=None):
                 'interpretation': "No data available for analysis"
             }
         else:
-            # Perform chi-square test for legal representation by policy era
-            chi2_era_rep, p_era_rep, dof_era_rep, expected_era_rep = stats.chi2_contingency(era_rep_table)
-            
-            # Calculate Cramer's V for effect size
-            n = era_rep_table.values.sum()
-            cramer_v = np.sqrt(chi2_era_rep / (n * (min(era_rep_table.shape) - 1))) if n > 0 and min(era_rep_table.shape) > 1 else 0
+            # Chi-square test and Cramer's V (effect size) for legal representation by policy era
+            era_stats = ContingencyStats(era_rep_table.to_numpy())
+            chi2_era_rep, p_era_rep, dof_era_rep = era_stats.chi2, era_stats.p_value, era_stats.dof
+            cramer_v = era_stats.cramer_v
             
             print("Chi-Square Test Results: Legal Representation by Policy Era")
             print(f"Chi-square statistic: {chi2_era_rep:.2f}")
@@ -599,10 +503,7 @@ def generate_chi_square_analysis(filters=None):
     # Chi-square test for outcomes by representation (EXACTLY like notebook)
     try:
         # Create a contingency table for case outcomes by legal representation
-        outcome_rep_table = pd.crosstab(
-            analysis_filtered["BINARY_OUTCOME"], 
-            analysis_filtered["HAS_LEGAL_REP"]
-        )
+        outcome_rep_table = findings.rep_outcome_counts.T
         print("Contingency Table: Case Outcomes by Legal Representation")
         print(outcome_rep_table)
         
@@ -624,12 +525,11 @@ def generate_chi_square_analysis(filters=None):
                 'odds_interpretation': "No data available for analysis"
             }
         else:
-            # Perform chi-square test for case outcomes by legal representation
-            chi2_outcome_rep, p_outcome_rep, dof_outcome_rep, expected_outcome_rep = stats.chi2_contingency(outcome_rep_table)
-            
-            # Calculate Cramer's V for effect size
-            n = outcome_rep_table.values.sum()
-            cramer_v = np.sqrt(chi2_outcome_rep / (n * (min(outcome_rep_table.shape) - 1))) if n > 0 and min(outcome_rep_table.shape) > 1 else 0
+            # Chi-square test and Cramer's V (effect size) for case outcomes by legal representation
+            counts = outcome_rep_table.to_numpy()
+            outcome_stats = ContingencyStats(counts)
+            chi2_outcome_rep, p_outcome_rep, dof_outcome_rep = outcome_stats.chi2, outcome_stats.p_value, outcome_stats.dof
+            cramer_v = outcome_stats.cramer_v
             
             print("Chi-Square Test Results: Case Outcomes by Legal Representation")
             print(f"Chi-square statistic: {chi2_outcome_rep:.2f}")
@@ -648,11 +548,7 @@ def generate_chi_square_analysis(filters=None):
             print(interpretation)
             
             # Calculate percentages with normalize='index' for comparison table
-            percentage_data_for_table = pd.crosstab(
-                analysis_filtered['HAS_LEGAL_REP'],
-                analysis_filtered['BINARY_OUTCOME'], 
-                normalize='index'
-            ) * 100
+            percentage_data_for_table = findings.rep_outcome_percentages
             
             # Calculate odds ratio if we have the right structure
             odds_ratio = 0.0
@@ -662,14 +558,14 @@ def generate_chi_square_analysis(filters=None):
             
             try:
                 # Calculate odds ratio for favorable outcomes by representation
-                a = outcome_rep_table.loc["Favorable", "Has Legal Representation"]
-                b = outcome_rep_table.loc["Unfavorable", "Has Legal Representation"] 
-                c = outcome_rep_table.loc["Favorable", "No Legal Representation"]
-                d = outcome_rep_table.loc["Unfavorable", "No Legal Representation"]
-
-                odds_with_rep = a / b if b > 0 else 0
-                odds_without_rep = c / d if d > 0 else 0
-                odds_ratio = odds_with_rep / odds_without_rep if odds_without_rep > 0 else 0
+                favorable = outcome_rep_table.index.get_loc("Favorable")
+                unfavorable = outcome_rep_table.index.get_loc("Unfavorable")
+                with_rep = outcome_rep_table.columns.get_loc("Has Legal Representation")
+                without_rep = outcome_rep_table.columns.get_loc("No Legal Representation")
+                odds_with_rep, odds_without_rep, odds_ratio = contingency_odds_ratio(
+                    counts[favorable, with_rep], counts[unfavorable, with_rep],
+                    counts[favorable, without_rep], counts[unfavorable, without_rep],
+                )
 
                 print("\nOdds Ratio Calculation:")
                 print(f"Odds of favorable outcome with representation: {odds_with_rep:.3f}")
@@ -741,27 +637,56 @@ def generate_chi_square_analysis(filters=None):
     
     return results
 
+def top_counts(df, column, rows=None, n=10):
+    """
+    df[column].value_counts().head(n) as a dict, over the row positions rows
+    (every row when None). Categorical columns are counted with np.bincount
+    over their codes, so no filtered copy of the frame is made.
+    """
+    values = df[column]
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        selected = values if rows is None else values.take(rows)
+        return selected.value_counts().head(n).to_dict()
+    codes = values.array.codes
+    if rows is not None:
+        codes = codes[rows]
+    categories = values.cat.categories
+    # Missing values have code -1, counted in the trailing slot and dropped
+    counts = np.bincount(codes.astype(np.intp) % (len(categories) + 1), minlength=len(categories) + 1)[:-1]
+    # value_counts of a categorical: every category, then sorted by count
+    counts = pd.Series(counts.astype(np.int64), index=categories, name='count')
+    return counts.sort_values(ascending=False).head(n).to_dict()
+
 def generate_countries_chart(filters=None):
     """Generate Plotly chart for top countries by case volume with full country names in hover"""
     try:
         from .data_processor import get_data_statistics
+        from .overview import get_overview_view
     except ImportError:
         from data_processor import get_data_statistics
+        from overview import get_overview_view
     
-    # If filters are provided, we need to apply them to the data first
-    if filters:
+    # If filters are active, we need to apply them to the data first
+    if not compile_filters(filters).is_empty:
         juvenile_cases = cache.get('juvenile_cases')
         if juvenile_cases is not None:
-            filtered_data = apply_filters(juvenile_cases, filters)
-            if filtered_data.empty:
+            if juvenile_cases.empty:
                 return {"error": "No data available for the selected filters"}
-            # Calculate statistics for filtered data
-            stats = get_data_statistics(filtered_data)
+            # Top nationalities of the filtered rows, counted without copying them
+            rows = filter_index(juvenile_cases).rows(compile_filters(filters))
+            if rows is not None and len(rows) == 0:
+                return {"error": "No data available for the selected filters"}
+            try:
+                stats = {'nationalities': top_counts(juvenile_cases, 'NAT', rows)}
+            except Exception as e:
+                print(f"Error counting nationalities: {str(e)}")
+                stats = None
         else:
             stats = get_data_statistics()
     else:
-        # Get statistics which includes top nationalities
-        stats = get_data_statistics()
+        # Statistics of the materialized overview, which include top nationalities
+        view = get_overview_view()
+        stats = view.stats if view is not None else None
     
     if stats is None or 'nationalities' not in stats:
         return {"error": "No nationality data available"}
@@ -860,72 +785,55 @@ def generate_countries_chart(filters=None):
         country_names = [country_mapping.get(code, code) for code in country_codes]
         case_counts = [count for code, count in top_countries]
         
-        # Create Plotly figure
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=country_codes,  # Use short codes for x-axis display
-            y=case_counts,
-            marker_color='#F59E0B',  # Orange color to match the existing design
+        # Plotly bar trace
+        traces = [{
+            'type': 'bar',
+            'x': json_values(country_codes),  # Use short codes for x-axis display
+            'y': json_values(case_counts),
+            'marker': {'color': '#F59E0B'},  # Orange color to match the existing design
             # Custom hover template with full country names
-            hovertemplate='<b>%{customdata}</b><br>' +
-                         'Cases: %{y:,}<br>' +
-                         '<extra></extra>',
-            customdata=country_names,  # Full country names for hover
-            text=[f'{count:,}' for count in case_counts],  # Show count on bars
-            textposition='outside'
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            title={
+            'hovertemplate': '<b>%{customdata}</b><br>' +
+                             'Cases: %{y:,}<br>' +
+                             '<extra></extra>',
+            'customdata': json_values(country_names),  # Full country names for hover
+            'text': [f'{count:,}' for count in case_counts],  # Show count on bars
+            'textposition': 'outside'
+        }]
+        
+        # Layout
+        layout = {
+            'title': {
                 'text': 'Top Countries by Case Volume',
                 'x': 0.5,
                 'font': {'size': 16, 'family': 'Arial, sans-serif', 'color': '#333'}
             },
-            xaxis={
-                'title': 'Country',
-                'title_font': {'size': 14},
+            'xaxis': {
+                'title': {'text': 'Country', 'font': {'size': 14}},
                 'tickangle': -45,  # Angle the labels for better readability
                 'showgrid': False
             },
-            yaxis={
-                'title': 'Number of Cases',
-                'title_font': {'size': 14},
+            'yaxis': {
+                'title': {'text': 'Number of Cases', 'font': {'size': 14}},
                 'showgrid': True,
                 'gridcolor': 'rgba(128,128,128,0.3)'
             },
-            showlegend=False,
-            margin=dict(t=80, l=80, r=40, b=120),  # Extra bottom margin for angled labels
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family='Arial, sans-serif'),
-            width=800,
-            height=500
-        )
-        
-        # Convert to JSON format
-        chart_data = {
-            'data': fig.data,
-            'layout': fig.layout,
-            'config': {
-                'responsive': True,
-                'displayModeBar': True,
-                'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
-                'displaylogo': False
-            }
+            'showlegend': False,
+            'margin': {'t': 80, 'l': 80, 'r': 40, 'b': 120},  # Extra bottom margin for angled labels
+            'plot_bgcolor': 'white',
+            'paper_bgcolor': 'white',
+            'font': {'family': 'Arial, sans-serif'},
+            'width': 800,
+            'height': 500
         }
         
+        result = figure_spec(traces, layout)
+        
         # Also return the mapping data for reference
-        summary_data = {
+        result['summary'] = {
             'country_mapping': {code: country_mapping.get(code, code) for code in country_codes},
             'total_countries': len(stats['nationalities'])
         }
         
-        # Convert to JSON-serializable format
-        result = json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
-        result['summary'] = summary_data
-        
         return result
         
     except Exception as e:
@@ -0,0 +1,118 @@
+"""
+Dtype compaction of the cached frames
+Applied before tables are published to the cache, on copies (a published
+frame is never modified): string columns with few distinct values become categoricals, integers are downcast to the smallest
+type holding their range (nullable integers stay nullable) and the
+COMPACT_FLOAT32_COLUMNS become float32. Dates are already datetime64 and
+stay at nanosecond resolution (every pandas datetime unit takes 8 bytes).
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .config import COMPACT_CATEGORY_RATIO, COMPACT_FLOAT32_COLUMNS
+from .models import cache
+
+_INT_TYPES = [np.int8, np.int16, np.int32]
+
+# Memory of the last compaction pass, for the status endpoints
+_report_lock = threading.Lock()
+_last_report = {}
+
+def _smallest_int(values):
+    """Smallest signed integer type holding every value, or None when nothing smaller fits"""
+    if len(values) == 0:
+        return None
+    low, high = values.min(), values.max()
+    if pd.isna(low):
+        return None
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+def compact_column(name, series):
+    """Compacted version of a column, or None when it is already as small as it gets"""
+    dtype = series.dtype
+    if dtype == object:
+        if len(series) == 0 or pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            return None
+        if series.nunique() > COMPACT_CATEGORY_RATIO * len(series):
+            return None
+        return series.astype('category')
+    if isinstance(dtype, pd.core.arrays.masked.BaseMaskedDtype):
+        if dtype.kind != 'i' or dtype.itemsize <= 4:
+            return None
+        smallest = _smallest_int(series)
+        if smallest is None:
+            return None
+        return series.astype(f"Int{np.dtype(smallest).itemsize * 8}")
+    if isinstance(dtype, np.dtype):
+        if dtype.kind == 'i':
+            smallest = _smallest_int(series.to_numpy())
+            if smallest is None or np.dtype(smallest).itemsize >= dtype.itemsize:
+                return None
+            return series.astype(smallest)
+        if dtype == np.float64 and name in COMPACT_FLOAT32_COLUMNS:
+            return series.astype(np.float32)
+    return None
+
+def compact_frame(df):
+    """
+    Compacted copy of df (unchanged columns are shared, df itself is left
+    untouched) and its deep memory (before, after) in bytes; df itself when
+    no column can be compacted
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    compacted = {}
+    for col in df.columns:
+        column = compact_column(col, df[col])
+        if column is not None:
+            compacted[col] = column
+    if not compacted:
+        return df, before, before
+    result = df.copy(deep=False)
+    for col, column in compacted.items():
+        result[col] = column
+    return result, before, int(result.memory_usage(deep=True).sum())
+
+def compact_tables(tables):
+    """
+    Replace every DataFrame of a {key: table} mapping that is not published
+    yet with its compacted copy, logging and returning the memory of each in
+    MB before and after
+    """
+    report = {}
+    for key, df in list(tables.items()):
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
+        tables[key], before, after = compact_frame(df)
+        report[key] = {'before_mb': round(before / 1024 / 1024, 2), 'after_mb': round(after / 1024 / 1024, 2)}
+        if after < before:
+            print(f"   🗜️ Compacted {key}: {report[key]['before_mb']} MB -> {report[key]['after_mb']} MB")
+    if report:
+        before = sum(entry['before_mb'] for entry in report.values())
+        after = sum(entry['after_mb'] for entry in report.values())
+        print(f"🗜️ Cached tables compacted from {before:.1f} MB to {after:.1f} MB")
+    with _report_lock:
+        _last_report.update(report)
+    return report
+
+def compact_cache():
+    """
+    Compact the tables of the cache and publish the compacted copies as a new
+    version (see compact_tables); requests still reading the previous version
+    keep its frames unchanged
+    """
+    tables = {key: df for key, df in cache.get_all().items() if isinstance(df, pd.DataFrame)}
+    report = compact_tables(tables)
+    cache.publish(tables)
+    return report
+
+def compaction_report():
+    """Memory before and after compaction of every table compacted so far"""
+    with _report_lock:
+        return {key: dict(entry) for key, entry in _last_report.items()}
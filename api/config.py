@@ -16,7 +16,136 @@ RAW_DATA_FILES = {
     'tblDecCode': 'tblDecCode.csv'
 }
 
-# Cache configuration
+# How each raw file is read into its cache key: read_csv arguments and date columns
+# converted with errors="coerce" after parsing (columns are projected per COLUMN_MANIFEST)
+RAW_TABLE_SPECS = {
+    'juvenile_history': {
+        'file': 'juvenile_history',
+        'label': 'juvenile history records',
+        'required': False,
+        'read_csv': {
+            'compression': 'gzip',
+            'dtype': {
+                'idnJuvenileHistory': 'Int64',
+                'idnCase': 'Int64',
+                'idnProceeding': 'Int64',
+                'idnJuvenile': 'category',
+            },
+            'low_memory': True,
+        },
+    },
+    'juvenile_cases': {
+        'file': 'juvenile_cases',
+        'label': 'juvenile cases',
+        'required': True,
+        'read_csv': {
+            'dtype': {
+                'IDNCASE': 'Int64',
+                'NAT': 'category',
+                'LANG': 'category',
+                'CUSTODY': 'category',
+                'CASE_TYPE': 'category',
+                'LATEST_CAL_TYPE': 'category',
+                'Sex': 'category',
+            },
+            'parse_dates': ['LATEST_HEARING', 'DATE_OF_ENTRY', 'C_BIRTHDATE', 'DATE_DETAINED', 'DATE_RELEASED'],
+            'low_memory': True,
+        },
+    },
+    'reps_assigned': {
+        'file': 'juvenile_reps_assigned',
+        'label': 'representation assignments',
+        'required': True,
+        'read_csv': {
+            'dtype': {
+                'IDNREPSASSIGNED': 'Int64',
+                'IDNCASE': 'int64',
+                'STRATTYLEVEL': 'category',
+                'STRATTYTYPE': 'category',
+            },
+            'low_memory': True,
+        },
+        'coerce_dates': ['E_28_DATE', 'E_27_DATE'],
+    },
+    'proceedings': {
+        'file': 'juvenile_proceedings',
+        'label': 'proceedings',
+        'required': True,
+        'read_csv': {
+            'dtype': {
+                'IDNPROCEEDING': 'Int64',
+                'IDNCASE': 'Int64',
+                'ABSENTIA': 'category',
+                'DEC_CODE': 'category',
+            },
+            'low_memory': True,
+        },
+        'coerce_dates': ['OSC_DATE', 'INPUT_DATE', 'COMP_DATE'],
+    },
+    'lookup_decisions': {
+        'file': 'tblDecCode',
+        'label': 'decision codes',
+        'required': True,
+        'read_csv': {'delimiter': '\t', 'dtype': {'strCode': 'category'}},
+    },
+    'lookup_juvenile': {
+        'file': 'tblLookup_Juvenile',
+        'label': 'juvenile lookup entries',
+        'required': False,
+        'read_csv': {'delimiter': '\t', 'dtype': {'idnJuvenile': 'category'}},
+    },
+}
+
+# Columns each consumer reads from the loaded tables. The loader reads only the
+# union per table (see table_columns); tables no consumer lists are read whole
+COLUMN_MANIFEST = {
+    'process_analysis_data': {
+        'juvenile_cases': ['IDNCASE', 'NAT', 'LANG', 'CASE_TYPE', 'Sex', 'C_BIRTHDATE', 'LATEST_HEARING'],
+        'proceedings': ['IDNCASE', 'COMP_DATE', 'NAT', 'LANG', 'CASE_TYPE', 'DEC_CODE'],
+        'reps_assigned': ['IDNCASE', 'STRATTYLEVEL'],
+        'lookup_decisions': ['strCode', 'strDescription'],
+    },
+    'get_data_statistics': {
+        'juvenile_cases': ['IDNCASE', 'NAT', 'LANG', 'CUSTODY', 'CASE_TYPE', 'Sex', 'C_BIRTHDATE'],
+        'reps_assigned': ['IDNCASE', 'STRATTYLEVEL', 'STRATTYTYPE'],
+    },
+    # Overview trends and the filtered countries chart (apply_filters on juvenile_cases;
+    # CASE_TYPE_KEY is the prepared filter column kept in snapshots)
+    'request_paths': {
+        'juvenile_cases': ['CASE_TYPE', 'CASE_TYPE_KEY', 'LATEST_HEARING'],
+    },
+}
+
+# Rarely used tables, loaded on first access instead of at startup
+LAZY_TABLES = ['juvenile_history', 'lookup_juvenile']
+
+def table_columns(key):
+    """Union of the columns the COLUMN_MANIFEST consumers read from a table (None = every column)"""
+    columns = []
+    for tables in COLUMN_MANIFEST.values():
+        for col in tables.get(key, []):
+            if col not in columns:
+                columns.append(col)
+    return columns or None
+
+# Content hashes (sha256) of the raw files the cached data was built from, so a
+# reload only recomputes what depends on files that changed (see pipeline.py)
+SOURCE_HASHES_FILE = 'source_hashes.json'
+
+# Chunked CSV ingestion: rows per chunk (0 reads each file in one go) and an
+# optional RSS ceiling in MB above which the chunk size is halved
+INGEST_CHUNK_ROWS = int(os.getenv('INGEST_CHUNK_ROWS', '250000'))
+INGEST_MIN_CHUNK_ROWS = 10000
+INGEST_MEMORY_LIMIT_MB = int(os.getenv('INGEST_MEMORY_LIMIT_MB', '0'))
+
+# Parallel ingestion: number of worker processes parsing raw tables concurrently
+# (1 = serial; each worker holds one table in memory, so keep it low on small hosts)
+# and an optional startup benchmark timing serial against parallel ingestion
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '1'))
+INGEST_BENCHMARK = os.getenv('INGEST_BENCHMARK', 'False').lower() == 'true'
+INGEST_DIR = 'ingest'
+
+# Cached tables (file names are the legacy pickle caches, migrated to the snapshot on first load)
 CACHE_FILES = {
     'juvenile_history': 'juvenile_history_cache.pkl',
     'juvenile_cases': 'juvenile_cases_cache.pkl',
@@ -27,6 +156,52 @@ CACHE_FILES = {
     'analysis_filtered': 'analysis_filtered_cache.pkl'
 }
 
+# Tables the request paths filter with filters.apply_filters (filter columns are prepared at load)
+FILTERED_TABLES = ['juvenile_cases', 'analysis_filtered']
+
+# Columnar snapshot configuration (one Arrow IPC file per table plus a manifest)
+SNAPSHOT_DIR = 'snapshot'
+SNAPSHOT_MANIFEST = 'manifest.json'
+# Tables are read back through a memory map, which only avoids a copy for uncompressed
+# files: lz4/zstd make them smaller on disk but are decompressed into memory on every read
+SNAPSHOT_COMPRESSION = os.getenv('SNAPSHOT_COMPRESSION', 'uncompressed')
+
+# Shared memory-mapped mode: request-path tables are served from .npy column files
+# mapped by every gunicorn worker, so N workers share one copy through the page cache
+DATA_MMAP = os.getenv('DATA_MMAP', 'False').lower() == 'true'
+MMAP_DIR = 'mmap'
+
+# Tables (and columns, None = all) the request paths read in memory-mapped mode
+MMAP_TABLES = {
+    'analysis_filtered': None,
+    'juvenile_cases': ['IDNCASE', 'NAT', 'LANG', 'CUSTODY', 'CASE_TYPE', 'CASE_TYPE_KEY', 'Sex', 'C_BIRTHDATE', 'LATEST_HEARING'],
+    'reps_assigned': ['IDNCASE', 'STRATTYLEVEL', 'STRATTYTYPE'],
+}
+
+# Single-flight data loading: seconds a request waits for the load in flight
+# before getting a 503, and the Retry-After (seconds) sent with it
+LOAD_WAIT_TIMEOUT = float(os.getenv('LOAD_WAIT_TIMEOUT', '10'))
+LOAD_RETRY_AFTER = int(os.getenv('LOAD_RETRY_AFTER', '15'))
+
+# Residency of intermediate tables (derived frames the request paths do not read):
+# while the cached tables use more than MEMORY_BUDGET_MB (0 = keep none resident),
+# intermediates are spilled to Arrow files under SPILL_DIR ('spill'; pickle for tables
+# Arrow cannot round-trip exactly) or dropped ('drop'), largest first, and rebuilt
+# on their next access
+MEMORY_BUDGET_MB = int(os.getenv('MEMORY_BUDGET_MB', '0'))
+RESIDENCY_POLICY = os.getenv('RESIDENCY_POLICY', 'spill').lower()
+SPILL_DIR = 'spill'
+INTERMEDIATE_TABLES = ['merged_data', 'proceedings_with_decisions']
+
+# Dtype compaction of the cached tables (see compaction.py): string columns with at
+# most COMPACT_CATEGORY_RATIO distinct values per row become categoricals, and the
+# listed float columns are stored as float32
+COMPACT_CATEGORY_RATIO = float(os.getenv('COMPACT_CATEGORY_RATIO', '0.5'))
+COMPACT_FLOAT32_COLUMNS = ['AGE_AT_FILING']
+
+# Upper bound on the serialized findings responses kept by the response cache
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
 # Google Drive file IDs for the datasets
 GOOGLE_DRIVE_FILES = {
     'juvenile_cases': '1XXUKEa9QBCBKAoYSvKWQf19NIsEjWPCo',
@@ -37,6 +212,17 @@ GOOGLE_DRIVE_FILES = {
     'tblLookup_Juvenile': '1V8kB0F3hhcvy0h-0qX2D-3dIhBPzMAGs'
 }
 
+# Raw file downloads: parallel workers, streaming chunk size, resume attempts per file
+# and per-request timeout in seconds
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '3'))
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', '3'))
+DOWNLOAD_TIMEOUT = 120
+
+# Optional SHA-256 of the raw files (keyed like RAW_DATA_FILES); downloads that
+# do not match are discarded. The digest of every download is logged.
+RAW_DATA_CHECKSUMS = {}
+
 # Decision code classifications (from notebook)
 FAVORABLE_DECISIONS = ["A", "C", "G", "R", "S", "T"]
 UNFAVORABLE_DECISIONS = ["D", "E", "V", "X"]
@@ -0,0 +1,76 @@
+"""
+Closed-form statistics of contingency tables
+Works on plain count arrays, such as the crosstabs of the aggregate cube, and
+reproduces scipy.stats.chi2_contingency bit for bit (same expected
+frequencies, Yates' correction when there is one degree of freedom, p-value
+from the chi-square survival function) without its input validation and
+result wrapping. Effect sizes and row percentages come from the same arrays.
+"""
+from __future__ import annotations
+from typing import Tuple
+
+import numpy as np
+from scipy import special
+
+class ContingencyStats:
+    """Chi-square test, Cramer's V and row percentages of a 2D count table"""
+
+    def __init__(self, observed, correction: bool = True):
+        observed = np.asarray(observed)
+        if np.any(observed < 0):
+            raise ValueError("All values in `observed` must be nonnegative.")
+        if observed.size == 0:
+            raise ValueError("No data; `observed` has size 0.")
+        self.observed = observed
+        self.n = observed.sum()
+
+        # Expected frequencies from the margins, computed as chi2_contingency does
+        counts = observed.astype(np.float64)
+        row_totals = counts.sum(axis=1, keepdims=True)
+        col_totals = counts.sum(axis=0, keepdims=True)
+        self.expected = row_totals * col_totals / counts.sum()
+        if np.any(self.expected == 0):
+            zeropos = list(zip(*np.nonzero(self.expected == 0)))[0]
+            raise ValueError("The internally computed table of expected "
+                             f"frequencies has a zero element at {zeropos}.")
+
+        self.dof = self.expected.size - sum(self.expected.shape) + self.expected.ndim - 1
+        if self.dof == 0:
+            # Only one row or column: observed equals expected
+            self.chi2, self.p_value = 0.0, 1.0
+        else:
+            adjusted = observed
+            if self.dof == 1 and correction:
+                # Yates' correction, never larger than the difference itself
+                diff = self.expected - observed
+                adjusted = observed + np.minimum(0.5, np.abs(diff)) * np.sign(diff)
+            self.chi2 = ((adjusted - self.expected) ** 2 / self.expected).sum()
+            self.p_value = special.chdtrc(self.dof, self.chi2)
+
+        shortest = min(observed.shape)
+        self.cramer_v = np.sqrt(self.chi2 / (self.n * (shortest - 1))) if self.n > 0 and shortest > 1 else 0
+
+    @property
+    def significant(self) -> bool:
+        return bool(self.p_value < 0.05)
+
+    def row_percentages(self) -> np.ndarray:
+        """Share of every cell in its row, in percent (rows sum to 100)"""
+        return row_percentages(self.observed)
+
+def row_percentages(observed) -> np.ndarray:
+    """Share of every cell of a count table in its row, in percent (NaN for empty rows)"""
+    observed = np.asarray(observed)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return observed / observed.sum(axis=1, keepdims=True) * 100
+
+def odds_ratio(a, b, c, d) -> Tuple[float, float, float]:
+    """
+    (odds of the outcome with the exposure, odds without it, odds ratio) of the
+    2x2 table [[a, b], [c, d]] (rows: exposed, unexposed; columns: outcome,
+    no outcome), with 0 for any odds whose denominator is 0
+    """
+    odds_with = a / b if b > 0 else 0
+    odds_without = c / d if d > 0 else 0
+    ratio = odds_with / odds_without if odds_without > 0 else 0
+    return odds_with, odds_without, ratio
@@ -4,18 +4,41 @@ Only loads real data from cache or Google Drive - no mock data
 MEMORY OPTIMIZED VERSION for t3.small instances
 """
 import pandas as pd
-import requests
 import io
+import json
 import gzip
 import pickle
 import os
+import shutil
+import tempfile
+import threading
+import time
 import traceback
 import gc
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # Local imports
-from .config import CACHE_FILES, GOOGLE_DRIVE_FILES, RAW_DATA_FILES, get_cache_dir
+from .config import (
+    CACHE_FILES, GOOGLE_DRIVE_FILES, RAW_DATA_FILES, RAW_TABLE_SPECS, DATA_MMAP, MMAP_TABLES, FILTERED_TABLES,
+    DOWNLOAD_WORKERS, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, RAW_DATA_CHECKSUMS, INGEST_WORKERS, INGEST_BENCHMARK,
+    INGEST_DIR, LAZY_TABLES, SOURCE_HASHES_FILE, table_columns, get_cache_dir
+)
 from .models import cache
+from .filters import prepare_filter_columns
+from .snapshot import read_manifest, read_table, write_snapshot
+from .compaction import compact_cache, compact_tables
+from .overview import materialize_overview
+from . import mmap_store
+from . import downloader
+from . import ingest
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def prepare_request_tables():
+    """Normalize, once after loading, the filter columns of the tables request paths filter"""
+    for key in FILTERED_TABLES:
+        prepare_filter_columns(cache.get(key))
 
 def check_raw_files_in_cache():
     """Check if raw data files exist in cache directory"""
@@ -40,149 +63,133 @@ def check_raw_files_in_cache():
     
     return len(missing_files) == 0
 
+def raw_table_path(key, cache_dir=None):
+    """
+    Path of the raw file behind RAW_TABLE_SPECS[key], or None when an optional
+    file is missing; raises FileNotFoundError for required ones.
+    """
+    spec = RAW_TABLE_SPECS[key]
+    path = os.path.join(cache_dir or get_cache_dir(), RAW_DATA_FILES[spec['file']])
+    if not os.path.exists(path):
+        if spec['required']:
+            raise FileNotFoundError(f"Required file not found: {path}")
+        print(f"   ⚠️ Optional {spec['label']} file not found: {path}")
+        return None
+    return path
+
+def _print_loaded(key, df, report):
+    """Log one loaded raw table"""
+    print(f"   ✅ Loaded {len(df):,} {RAW_TABLE_SPECS[key]['label']} "
+          f"({report['chunks']} chunks, peak RSS {report['peak_rss_mb']:,.0f} MB)")
+
+def load_raw_table(key, cache_dir=None):
+    """
+    Read one raw table described by RAW_TABLE_SPECS[key] (chunked, see ingest.read_table),
+    projected to the columns COLUMN_MANIFEST lists for it. Returns None when an
+    optional file is missing; raises FileNotFoundError for required ones.
+    """
+    path = raw_table_path(key, cache_dir)
+    if path is None:
+        return None
+    spec = RAW_TABLE_SPECS[key]
+    print(f"   Loading {spec['label']}...")
+    df, report = ingest.read_table(path, spec, columns=table_columns(key))
+    _print_loaded(key, df, report)
+    return df
+
+def raw_file_hashes(cache_dir=None):
+    """Content hash of every raw file present in the cache directory, keyed by table"""
+    hashes = {}
+    for key, spec in RAW_TABLE_SPECS.items():
+        path = os.path.join(cache_dir or get_cache_dir(), RAW_DATA_FILES[spec['file']])
+        if os.path.exists(path):
+            hashes[key] = downloader.file_sha256(path)
+    return hashes
+
+def read_source_hashes():
+    """Hashes of the raw files the cached data was last built from ({} when unknown)"""
+    path = os.path.join(get_cache_dir(), SOURCE_HASHES_FILE)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_source_hashes(hashes):
+    """Record the hashes of the raw files the cached data was built from"""
+    path = os.path.join(get_cache_dir(), SOURCE_HASHES_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(hashes, f, indent=2)
+    os.replace(tmp_path, path)
+
+def lazy_raw_table(key, cache_dir=None):
+    """Loader reading a raw table on first access (an empty frame when its optional file is missing)"""
+    def load():
+        df = load_raw_table(key, cache_dir)
+        if df is None:
+            return pd.DataFrame()
+        tables = {key: df}
+        compact_tables(tables)
+        return tables[key]
+    return load
+
 def load_raw_files_from_cache():
-    """Load data from raw files in cache directory"""
+    """
+    Load data from raw files in cache directory: one table at a time, or
+    INGEST_WORKERS tables at a time in worker processes (see ingest.read_tables_parallel).
+    LAZY_TABLES are only registered and read on first access.
+    """
     try:
         cache_dir = get_cache_dir()
         print("📁 Loading data from raw files in cache...")
         
-        # Load juvenile_history_cleaned.csv.gz (EXACTLY like notebook)
-        history_path = os.path.join(cache_dir, RAW_DATA_FILES['juvenile_history'])
-        if os.path.exists(history_path):
-            print("   Loading juvenile history...")
-            juvenile_history = pd.read_csv(
-                filepath_or_buffer=history_path,
-                compression="gzip",  # File is compressed
-                dtype={
-                    "idnJuvenileHistory": "Int64",
-                    "idnCase": "Int64",
-                    "idnProceeding": "Int64",
-                    "idnJuvenile": "category",
-                },
-                low_memory=True,  # Memory optimization
-            )
-            cache.set('juvenile_history', juvenile_history)
-            print(f"   ✅ Loaded {len(juvenile_history):,} juvenile history records")
-            del juvenile_history  # Free memory immediately
-            gc.collect()
-        else:
-            print(f"   ⚠️ Optional juvenile history file not found: {history_path}")
-            cache.set('juvenile_history', pd.DataFrame())
-        
-        # Load juvenile_cases_cleaned.csv.gz
-        cases_path = os.path.join(cache_dir, RAW_DATA_FILES['juvenile_cases'])
-        if os.path.exists(cases_path):
-            print("   Loading juvenile cases...")
-            dtype = {
-                "IDNCASE": "Int64",
-                "NAT": "category",
-                "LANG": "category", 
-                "CUSTODY": "category",
-                "CASE_TYPE": "category",
-                "LATEST_CAL_TYPE": "category",
-                "Sex": "category",
-            }
-            parse_dates = [
-                "LATEST_HEARING",
-                "DATE_OF_ENTRY", 
-                "C_BIRTHDATE",
-                "DATE_DETAINED",
-                "DATE_RELEASED",
-            ]
-            juvenile_cases = pd.read_csv(
-                cases_path, 
-                dtype=dtype,
-                parse_dates=parse_dates,
-                low_memory=True  # Memory optimization
-            )
-            cache.set('juvenile_cases', juvenile_cases)
-            print(f"   ✅ Loaded {len(juvenile_cases):,} juvenile cases")
-            del juvenile_cases  # Free memory immediately
-            gc.collect()
-        else:
-            raise FileNotFoundError(f"Required file not found: {cases_path}")
-        
-        # Load juvenile_reps_assigned.csv.gz
-        reps_path = os.path.join(cache_dir, RAW_DATA_FILES['juvenile_reps_assigned'])
-        if os.path.exists(reps_path):
-            print("   Loading representation assignments...")
-            reps_assigned = pd.read_csv(
-                reps_path,
-                dtype={
-                    "IDNREPSASSIGNED": "Int64",
-                    "IDNCASE": "int64",
-                    "STRATTYLEVEL": "category",
-                    "STRATTYTYPE": "category",
-                },
-                low_memory=True  # Memory optimization
-            )
-            # Convert date columns
-            if not reps_assigned.empty:
-                reps_assigned["E_28_DATE"] = pd.to_datetime(reps_assigned["E_28_DATE"], errors="coerce")
-                reps_assigned["E_27_DATE"] = pd.to_datetime(reps_assigned["E_27_DATE"], errors="coerce")
-            cache.set('reps_assigned', reps_assigned)
-            print(f"   ✅ Loaded {len(reps_assigned):,} representation assignments")
-            del reps_assigned  # Free memory immediately
-            gc.collect()
-        else:
-            raise FileNotFoundError(f"Required file not found: {reps_path}")
-        
-        # Load juvenile_proceedings_cleaned.csv.gz
-        proceedings_path = os.path.join(cache_dir, RAW_DATA_FILES['juvenile_proceedings'])
-        if os.path.exists(proceedings_path):
-            print("   Loading proceedings...")
-            proceedings = pd.read_csv(
-                proceedings_path,
-                dtype={
-                    "IDNPROCEEDING": "Int64",
-                    "IDNCASE": "Int64", 
-                    "ABSENTIA": "category",
-                    "DEC_CODE": "category",
-                },
-                low_memory=True  # Memory optimization
-            )
-            # Convert date columns
-            if not proceedings.empty:
-                date_cols = ["OSC_DATE", "INPUT_DATE", "COMP_DATE"]
-                for col in date_cols:
-                    if col in proceedings.columns:
-                        proceedings[col] = pd.to_datetime(proceedings[col], errors="coerce")
-            cache.set('proceedings', proceedings)
-            print(f"   ✅ Loaded {len(proceedings):,} proceedings")
-            del proceedings  # Free memory immediately
-            gc.collect()
-        else:
-            raise FileNotFoundError(f"Required file not found: {proceedings_path}")
-        
-        # Load tblDecCode.csv
-        lookup_decision_path = os.path.join(cache_dir, RAW_DATA_FILES['tblDecCode'])
-        if os.path.exists(lookup_decision_path):
-            print("   Loading decision codes...")
-            lookup_decisions = pd.read_csv(
-                lookup_decision_path,
-                delimiter="\t",
-                dtype={"strCode": "category"}
-            )
-            cache.set('lookup_decisions', lookup_decisions)
-            print(f"   ✅ Loaded {len(lookup_decisions)} decision codes")
-        else:
-            raise FileNotFoundError(f"Required file not found: {lookup_decision_path}")
-        
-        # Load tblLookup_Juvenile.csv (optional)
-        lookup_juvenile_path = os.path.join(cache_dir, RAW_DATA_FILES['tblLookup_Juvenile'])
-        if os.path.exists(lookup_juvenile_path):
-            print("   Loading juvenile lookup...")
-            lookup_juvenile = pd.read_csv(
-                lookup_juvenile_path,
-                delimiter="\t",
-                dtype={"idnJuvenile": "category"}
-            )
-            cache.set('lookup_juvenile', lookup_juvenile)
-            print(f"   ✅ Loaded {len(lookup_juvenile)} juvenile lookup entries")
-        else:
-            print("   ⚠️ Optional juvenile lookup file not found")
-            cache.set('lookup_juvenile', pd.DataFrame())
+        jobs = {}
+        for key, spec in RAW_TABLE_SPECS.items():
+            if key in LAZY_TABLES:
+                cache.set_loader(key, lazy_raw_table(key, cache_dir))
+                continue
+            path = raw_table_path(key, cache_dir)
+            if path is None:
+                cache.set(key, pd.DataFrame())
+            else:
+                jobs[key] = (path, spec, table_columns(key))
+        
+        parallel = INGEST_WORKERS > 1 and len(jobs) > 1 and ingest.ARROW_AVAILABLE
+        if INGEST_WORKERS > 1 and not ingest.ARROW_AVAILABLE:
+            print("   ⚠️ pyarrow not available, reading raw tables serially")
         
+        # Worker processes hand tables back through files in a scratch directory
+        out_dir = None
+        if parallel or (INGEST_BENCHMARK and ingest.ARROW_AVAILABLE):
+            out_dir = tempfile.mkdtemp(prefix=f"{INGEST_DIR}-", dir=cache_dir)
+        try:
+            if INGEST_BENCHMARK and out_dir:
+                result = ingest.benchmark(jobs, max(2, INGEST_WORKERS), out_dir)
+                print(f"⏱️ Ingestion benchmark ({result['tables']} tables): serial {result['serial_s']}s, "
+                      f"{result['workers']} workers {result['parallel_s']}s ({result['speedup']}x)")
+            
+            if parallel:
+                print(f"   Reading {len(jobs)} tables with {min(INGEST_WORKERS, len(jobs))} worker processes...")
+                for key, df, report in ingest.read_tables_parallel(jobs, INGEST_WORKERS, out_dir):
+                    _print_loaded(key, df, report)
+                    cache.set(key, df)
+                    del df
+            else:
+                for key, (path, spec, columns) in jobs.items():
+                    print(f"   Loading {spec['label']}...")
+                    df, report = ingest.read_table(path, spec, columns=columns)
+                    _print_loaded(key, df, report)
+                    cache.set(key, df)
+                    del df  # Free memory immediately
+                    gc.collect()
+        finally:
+            if out_dir:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        
+        prepare_request_tables()
+        compact_cache()
+        write_source_hashes(raw_file_hashes(cache_dir))
         cache.set_loaded(True)
         print("🚀 All data loaded from raw files successfully!")
         return True
@@ -191,8 +198,65 @@ def load_raw_files_from_cache():
         print(f"❌ Error loading from raw files: {e}")
         return False
 
-def load_from_cache():
-    """Load processed data from cache files"""
+def load_from_cache(columns=None):
+    """
+    Load processed data from the columnar snapshot, falling back to legacy pickle caches.
+    columns optionally maps a table key to the list of columns to read.
+    """
+    manifest = read_manifest()
+    if manifest is not None:
+        return load_from_snapshot(manifest, columns or {})
+    if load_from_pickle_cache():
+        print("📦 Migrating pickle cache to columnar snapshot...")
+        save_to_cache()
+        return True
+    return False
+
+def load_from_snapshot(manifest, columns):
+    """Load processed data from the columnar snapshot described by manifest"""
+    try:
+        print("🔍 Checking for columnar snapshot...")
+        
+        required_caches = ['juvenile_cases', 'proceedings', 'reps_assigned', 'lookup_decisions']
+        optional_caches = ['juvenile_history', 'lookup_juvenile', 'analysis_filtered']
+        missing = [key for key in required_caches if key not in manifest['tables']]
+        if missing:
+            print(f"❌ Snapshot is missing tables: {', '.join(missing)}")
+            return False
+        
+        print(f"✅ Loading data from snapshot created {manifest['created_at']}...")
+        
+        for key in required_caches + optional_caches:
+            if key in LAZY_TABLES:
+                cache.set_loader(key, lazy_snapshot_table(key, manifest))
+            elif key in manifest['tables']:
+                cache.set(key, read_table(key, columns.get(key, table_columns(key)), manifest))
+                print(f"   📁 Loaded {key} from snapshot")
+            elif key != 'analysis_filtered':
+                print(f"   ⚠️ Optional {key} snapshot not found")
+                cache.set(key, pd.DataFrame())
+        
+        prepare_request_tables()
+        compact_cache()
+        cache.set_loaded(True)
+        print("🚀 All data loaded from snapshot successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error loading from snapshot: {e}")
+        return False
+
+def lazy_snapshot_table(key, manifest):
+    """
+    Loader reading a table from the snapshot on first access, falling back to
+    its raw file (tables that were never accessed are not snapshotted)
+    """
+    if key not in manifest['tables']:
+        return lazy_raw_table(key)
+    return lambda: read_table(key, None, manifest)
+
+def load_from_pickle_cache():
+    """Load processed data from legacy pickle cache files"""
     try:
         cache_dir = get_cache_dir()
         print("🔍 Checking for cached processed data...")
@@ -236,6 +300,8 @@ def load_from_cache():
                 cache.set('analysis_filtered', pickle.load(f))
                 print("   📁 Loaded analysis_filtered from cache")
         
+        prepare_request_tables()
+        compact_cache()
         cache.set_loaded(True)
         print("🚀 All data loaded from processed cache successfully!")
         return True
@@ -245,19 +311,17 @@ def load_from_cache():
         return False
 
 def save_to_cache():
-    """Save processed data to cache files"""
+    """Save processed data to the columnar snapshot"""
     try:
-        cache_dir = get_cache_dir()
-        print("💾 Saving data to cache...")
+        print("💾 Saving data to snapshot...")
         
-        # Save each dataset to cache
+        # Persist every table that has a cache entry (merged_data is derived on demand)
         cache_data = cache.get_all()
-        for key, data in cache_data.items():
-            if key != 'data_loaded' and data is not None:
-                cache_file_path = os.path.join(cache_dir, CACHE_FILES[key])
-                with open(cache_file_path, 'wb') as f:
-                    pickle.dump(data, f)
-                    print(f"   💾 Saved {key} to cache")
+        tables = {
+            key: data for key, data in cache_data.items()
+            if key in CACHE_FILES and isinstance(data, pd.DataFrame)
+        }
+        write_snapshot(tables)
         
         print("✅ Data cached successfully for future use!")
         return True
@@ -266,15 +330,38 @@ def save_to_cache():
         print(f"❌ Error saving to cache: {e}")
         return False
 
-def download_from_google_drive(file_id, is_gzipped=True):
-    """Download a file from Google Drive using its file ID with virus scan handling"""
+def _peek_file(response, is_gzipped, min_size):
+    """
+    First chunk of a streamed response when it carries the file itself rather
+    than an HTML page (None otherwise); the rest of the body is left unread
+    """
+    content_type = response.headers.get('content-type', '').lower()
+    print(f"    Response: Content-Type={content_type}, Size={response.headers.get('content-length', 'unknown')}")
+    if 'text/html' in content_type:
+        return None
+    first_chunk = next(response.iter_content(DOWNLOAD_CHUNK_SIZE), b'')
+    if is_gzipped and first_chunk.startswith(GZIP_MAGIC):
+        return first_chunk
+    if not is_gzipped and len(first_chunk) > min_size:
+        return first_chunk
+    return None
+
+def download_from_google_drive(file_id, file_path, is_gzipped=True, expected_sha256=None):
+    """
+    Download a file from Google Drive using its file ID with virus scan handling.
+    The body is streamed to file_path (see downloader.stream_to_file); returns
+    the file size, or None when the download failed.
+    """
     try:
         print(f"  🌐 Downloading file {file_id}...")
         
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        session = downloader.new_session()
+        
+        def save(url, response, first_chunk):
+            return downloader.stream_to_file(
+                session, url, file_path, response=response, first_chunk=first_chunk,
+                expected_sha256=expected_sha256, magic=GZIP_MAGIC if is_gzipped else None
+            )
         
         # Try multiple URL patterns for Google Drive downloads
         download_urls = [
@@ -291,47 +378,26 @@ def download_from_google_drive(file_id, is_gzipped=True):
         for url_idx, download_url in enumerate(download_urls):
             try:
                 print(f"    Trying URL {url_idx + 1}...")
-                response = session.get(download_url, stream=True, timeout=120, allow_redirects=True)
+                response = session.get(download_url, stream=True, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
                 response.raise_for_status()
                 
-                content_type = response.headers.get('content-type', '').lower()
-                content_length = len(response.content) if response.content else 0
-                
-                print(f"    Response: Content-Type={content_type}, Size={content_length}")
-                
                 # Check if we got the file directly
-                if 'text/html' not in content_type:
-                    # Not HTML, likely the file
-                    if is_gzipped and response.content.startswith(b'\x1f\x8b'):
-                        print(f"  ✅ Downloaded gzipped file successfully")
-                        return response.content
-                    elif not is_gzipped and content_length > 100:
-                        print(f"  ✅ Downloaded file successfully")
-                        return response.content
+                first_chunk = _peek_file(response, is_gzipped, 100)
+                if first_chunk is not None:
+                    size = save(response.url, response, first_chunk)
+                    print(f"  ✅ Downloaded file successfully")
+                    return size
                 
                 # If we got HTML, check if it's a virus scan confirmation page
-                if 'text/html' in content_type and content_length > 500:
+                content_type = response.headers.get('content-type', '').lower()
+                html_content = response.text if 'text/html' in content_type else ''
+                response.close()
+                if len(html_content) > 500:
                     print(f"    Got HTML response, parsing for download links...")
-                    html_content = response.text
                     
                     # Look for the download confirmation link
                     import re
                     
-                    # Multiple patterns for Google Drive virus scan bypass
-                    patterns = [
-                        # Standard patterns
-                        r'href="(/uc\?export=download[^"]*)"',
-                        r'action="(/uc\?export=download[^"]*)"',
-                        # Drive content patterns
-                        r'https://drive\.usercontent\.google\.com/download\?id=' + file_id + r'[^"]*',
-                        # Confirm token patterns
-                        r'confirm=([a-zA-Z0-9\-_]+)',
-                        # UUID patterns
-                        r'uuid=([a-zA-Z0-9\-]+)',
-                        # AT token patterns
-                        r'at=([^"&\s]+)'
-                    ]
-                    
                     # Try to extract and build a proper download URL
                     confirm_match = re.search(r'confirm=([a-zA-Z0-9\-_]+)', html_content)
                     uuid_match = re.search(r'uuid=([a-zA-Z0-9\-]+)', html_content)
@@ -357,14 +423,15 @@ def download_from_google_drive(file_id, is_gzipped=True):
                         print(f"    Trying enhanced URL...")
                         
                         # Try the enhanced URL
-                        response2 = session.get(enhanced_url, stream=True, timeout=120, allow_redirects=True)
+                        response2 = session.get(enhanced_url, stream=True, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
                         response2.raise_for_status()
                         
-                        if response2.content and len(response2.content) > 1000:
-                            content_type2 = response2.headers.get('content-type', '').lower()
-                            if 'text/html' not in content_type2:
-                                print(f"  ✅ Enhanced URL download successful")
-                                return response2.content
+                        first_chunk = _peek_file(response2, is_gzipped, 1000)
+                        if first_chunk is not None:
+                            size = save(response2.url, response2, first_chunk)
+                            print(f"  ✅ Enhanced URL download successful")
+                            return size
+                        response2.close()
                     
                     # Look for direct download links in HTML
                     download_link_patterns = [
@@ -384,19 +451,24 @@ def download_from_google_drive(file_id, is_gzipped=True):
                             print(f"    Found direct link: {found_url[:100]}...")
                             
                             try:
-                                response3 = session.get(found_url, stream=True, timeout=120, allow_redirects=True)
+                                response3 = session.get(found_url, stream=True, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
                                 response3.raise_for_status()
                                 
-                                if response3.content and len(response3.content) > 1000:
-                                    content_type3 = response3.headers.get('content-type', '').lower()
-                                    if 'text/html' not in content_type3:
-                                        print(f"  ✅ Direct link download successful")
-                                        return response3.content
+                                first_chunk = _peek_file(response3, is_gzipped, 1000)
+                                if first_chunk is not None:
+                                    size = save(response3.url, response3, first_chunk)
+                                    print(f"  ✅ Direct link download successful")
+                                    return size
+                                response3.close()
+                            except downloader.DownloadError:
+                                raise
                             except:
                                 continue
                 
                 print(f"    URL {url_idx + 1} didn't provide valid file")
                 
+            except downloader.DownloadError:
+                raise
             except Exception as e:
                 print(f"    URL {url_idx + 1} failed: {e}")
                 continue
@@ -408,8 +480,12 @@ def download_from_google_drive(file_id, is_gzipped=True):
         print(f"  ❌ Error downloading file {file_id}: {e}")
         return None
 
-def download_raw_files_from_google_drive():
-    """Download raw data files from Google Drive and save to cache directory (skip existing files)"""
+def download_raw_files_from_google_drive(force=False):
+    """
+    Download missing raw data files from Google Drive into the cache directory,
+    DOWNLOAD_WORKERS files at a time. Existing files are skipped unless force
+    is set; a re-downloaded file only replaces the old one once it is verified.
+    """
     try:
         cache_dir = get_cache_dir()
         print("🌐 Checking and downloading missing raw data files from Google Drive...")
@@ -417,35 +493,42 @@ def download_raw_files_from_google_drive():
         downloaded_count = 0
         skipped_count = 0
         
-        # Download each file and save to cache (only if not already exists)
+        # Collect the files that are not in the cache yet
+        jobs = {}
         for file_key, filename in RAW_DATA_FILES.items():
             file_path = os.path.join(cache_dir, filename)
             
             # Skip if file already exists
-            if os.path.exists(file_path):
+            if os.path.exists(file_path) and not force:
                 print(f"📁 {filename} already exists in cache, skipping...")
                 skipped_count += 1
                 continue
                 
             if file_key in GOOGLE_DRIVE_FILES:
-                file_id = GOOGLE_DRIVE_FILES[file_key]
                 print(f"📊 Downloading {filename}...")
-                
                 # Determine if file is gzipped based on extension
-                is_gzipped = filename.endswith('.gz')
-                content = download_from_google_drive(file_id, is_gzipped)
-                
-                if content is not None:
-                    # Save raw file to cache directory
-                    with open(file_path, 'wb') as f:
-                        f.write(content)
-                    print(f"  ✅ Saved {filename} to cache ({len(content)} bytes)")
-                    downloaded_count += 1
-                else:
-                    print(f"  ❌ Failed to download {filename}")
+                jobs[filename] = (
+                    GOOGLE_DRIVE_FILES[file_key], file_path, filename.endswith('.gz'),
+                    RAW_DATA_CHECKSUMS.get(file_key)
+                )
             else:
                 print(f"  ⚠️ No Google Drive ID found for {filename}")
         
+        if jobs:
+            with ThreadPoolExecutor(max_workers=max(1, min(DOWNLOAD_WORKERS, len(jobs)))) as pool:
+                futures = {
+                    pool.submit(download_from_google_drive, *job): filename
+                    for filename, job in jobs.items()
+                }
+                for future in as_completed(futures):
+                    filename = futures[future]
+                    size = future.result()
+                    if size is not None:
+                        print(f"  ✅ Saved {filename} to cache ({size} bytes)")
+                        downloaded_count += 1
+                    else:
+                        print(f"  ❌ Failed to download {filename}")
+        
         print(f"📥 Summary: {downloaded_count} downloaded, {skipped_count} skipped (already in cache)")
         return (downloaded_count + skipped_count) > 0
         
@@ -453,11 +536,166 @@ def download_raw_files_from_google_drive():
         print(f"❌ Error downloading files from Google Drive: {e}")
         return False
 
-def load_data():
-    """Load and process datasets - only real data, no mock data"""
+# Single-flight loading: the load in flight (its Event) and load-state metrics
+_load_lock = threading.Lock()
+_load_done = None
+_load_stats = {
+    'state': 'idle',        # idle | loading | loaded | failed
+    'started_at': None,
+    'finished_at': None,
+    'duration_s': None,
+    'loads': 0,
+    'failures': 0,
+    'waiting': 0,
+    'waits': 0,
+    'wait_timeouts': 0,
+}
+
+# Memory-mapped mode: generation of the shared store whose tables this process serves
+# (None until mapped), and the lock serializing re-maps
+_shared_lock = threading.Lock()
+_remap_lock = threading.Lock()
+_shared_generation = None
+
+def load_status():
+    """Load state and counters of the single-flight loader"""
+    with _load_lock:
+        return dict(_load_stats)
+
+def load_data(timeout=None):
+    """
+    Load and process datasets - only real data, no mock data.
+    Single-flight: the first caller loads while concurrent callers wait for
+    that load (up to timeout seconds, None = until it finishes) instead of
+    starting their own. Returns whether the data is loaded.
+    """
+    global _load_done
     if cache.is_loaded():
         return True
+    with _load_lock:
+        # A request pinned to a version from before the data was published moves to the current one
+        cache.repin()
+        if cache.is_loaded():
+            return True
+        done = _load_done
+        leader = done is None
+        if leader:
+            done = _load_done = threading.Event()
+            _load_stats.update({
+                'state': 'loading', 'started_at': datetime.now().isoformat(),
+                'finished_at': None, 'duration_s': None, 'loads': _load_stats['loads'] + 1,
+            })
+        else:
+            _load_stats['waiting'] += 1
+            _load_stats['waits'] += 1
+    
+    if not leader:
+        finished = done.wait(timeout)
+        with _load_lock:
+            _load_stats['waiting'] -= 1
+            if not finished:
+                _load_stats['wait_timeouts'] += 1
+        cache.repin()
+        return finished and cache.is_loaded()
+    
+    started = time.perf_counter()
+    success = False
+    try:
+        success = load_shared_data() if DATA_MMAP else load_and_process_data()
+        if success:
+            materialize_overview()
+        return success
+    finally:
+        with _load_lock:
+            _load_done = None
+            _load_stats.update({
+                'state': 'loaded' if success else 'failed',
+                'finished_at': datetime.now().isoformat(),
+                'duration_s': round(time.perf_counter() - started, 2),
+            })
+            if not success:
+                _load_stats['failures'] += 1
+        done.set()
+
+def write_shared_tables(locked=False):
+    """Write the MMAP_TABLES of the cache to the shared store (locked: the caller holds the exclusive lock)"""
+    if not locked:
+        with mmap_store.store_lock(exclusive=True):
+            return write_shared_tables(locked=True)
+    global _shared_generation
+    for key, columns in MMAP_TABLES.items():
+        data = cache.get(key)
+        if data is None:
+            data = pd.DataFrame()
+        if columns is not None:
+            data = data[[col for col in columns if col in data.columns]]
+        mmap_store.write_table(key, data)
+        print(f"   🗺️ Wrote {key} to shared store")
+    # The cache of this process already holds what was just written
+    with _shared_lock:
+        _shared_generation = mmap_store.bump_generation()
+
+def map_shared_tables():
+    """The MMAP_TABLES mapped from the shared store, recording the store generation they come from"""
+    global _shared_generation
+    with mmap_store.store_lock():
+        tables = {key: mmap_store.map_table(key) for key in MMAP_TABLES}
+        with _shared_lock:
+            _shared_generation = mmap_store.read_generation()
+    return tables
+
+def remap_shared_tables():
+    """
+    Memory-mapped mode: when another worker has rewritten the shared store
+    since this process mapped it, map the new tables and drop everything
+    derived from the old ones (rebuilt on next use). Returns whether the
+    tables were re-mapped.
+    """
+    if not DATA_MMAP or _shared_generation is None or not cache.is_loaded():
+        return False
+    if mmap_store.read_generation() == _shared_generation:
+        return False
+    with _remap_lock:
+        # Another request thread may have re-mapped while we waited
+        if mmap_store.read_generation() == _shared_generation:
+            return False
+        print("🗺️ Shared store rewritten by another worker, re-mapping...")
+        stale = {key: None for key, value in cache.get_all().items() if key != 'data_loaded' and value is not None}
+        cache.publish({**stale, **map_shared_tables()})
+        return True
+
+def load_shared_data():
+    """
+    Memory-mapped mode: the first worker builds the shared column store, every
+    worker then maps it so the data is held once in the page cache
+    """
+    try:
+        keys = list(MMAP_TABLES)
+        if not mmap_store.has_tables(keys):
+            with mmap_store.store_lock(exclusive=True):
+                # Another worker may have built the store while we waited for the lock
+                if not mmap_store.has_tables(keys):
+                    print("🗺️ Building shared memory-mapped store...")
+                    if not load_and_process_data():
+                        return False
+                    write_shared_tables(locked=True)
+                    cache.clear()
+                    gc.collect()
+        
+        for key, data in map_shared_tables().items():
+            cache.set(key, data)
+            print(f"   🗺️ Mapped {key} from shared store")
+        cache.set_loaded(True)
+        print("🚀 Data mapped from shared store successfully!")
+        return True
         
+    except Exception as e:
+        print(f"❌ Error in load_shared_data: {e}")
+        traceback.print_exc()
+        return False
+
+def load_and_process_data():
+    """Load datasets into this process, processing analysis data when it is not cached"""
     try:
         # Strategy 1: Try to load from processed cache first (fastest)
         if load_from_cache():
@@ -4,12 +4,16 @@ Data processing and analysis functionality for the juvenile immigration API
 import pandas as pd
 import numpy as np
 import traceback
-from datetime import datetime
 
 # Local imports
-from .config import FAVORABLE_DECISIONS, UNFAVORABLE_DECISIONS, OTHER_DECISIONS
+from .config import FAVORABLE_DECISIONS, UNFAVORABLE_DECISIONS
 from .models import cache
-from .filters import apply_filters, Filters
+from .filters import prepare_filter_columns
+from .joins import left_join, lookup_codes, take_column
+from .compaction import compact_tables
+from .aggregates import build_aggregates
+from .quarter_index import build_quarter_index
+from .rep_summary import get_rep_summary
 
 def determine_policy_era(date):
     """Determine policy era based on date"""
@@ -57,23 +61,294 @@ def calculate_age(birthdate, hearing_date):
     age = (hearing_date - birthdate).days / 365.25
     return age
 
+def categorize_representation(level):
+    """Categorize legal representation based on REPRESENTATION_LEVEL"""
+    if level == "no_representation":
+        return "No Legal Representation"
+    elif level == "COURT" or level == "BOARD":
+        return "Has Legal Representation"
+    else:
+        return "Unknown"
+
+def _as_datetime(values):
+    """Return values as a datetime Series, coercing unparseable entries to NaT"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors="coerce")
+
+def _map_by_codes(values, classify):
+    """
+    Apply a scalar classifier once per distinct value and broadcast the labels
+    back through the factorized codes. Missing values follow Series.apply:
+    categorical columns keep NaN, other columns go through classify(NaN).
+    """
+    codes, uniques = pd.factorize(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        missing_label = np.nan
+    else:
+        missing_label = classify(np.nan)
+    labels = np.array([classify(value) for value in uniques] + [missing_label], dtype=object)
+    return pd.Series(labels[codes], index=values.index)
+
+def derive_age_at_filing(birthdates, hearing_dates):
+    """Vectorized calculate_age over two date columns"""
+    elapsed = _as_datetime(hearing_dates) - _as_datetime(birthdates)
+    return elapsed.dt.days / 365.25
+
+def derive_policy_era(dates):
+    """Vectorized determine_policy_era over a date column"""
+    dates = _as_datetime(dates)
+    year = dates.dt.year
+    conditions = [
+        (year >= 2018) & (year < 2021),
+        (year >= 2021) & (year < 2025),
+        (year >= 2025) & (dates <= pd.Timestamp.now()),
+    ]
+    choices = ["Trump Era I (2018-2020)", "Biden Era (2021-2024)", "Trump Era II (2025-)"]
+    eras = np.select(conditions, choices, default="other").astype(object)
+    return pd.Series(eras, index=dates.index)
+
+def derive_has_legal_rep(levels):
+    """Vectorized categorize_representation over REPRESENTATION_LEVEL"""
+    return _map_by_codes(levels, categorize_representation)
+
+def derive_binary_outcome(dec_codes):
+    """Vectorized categorize_outcome over DEC_CODE"""
+    return _map_by_codes(dec_codes, categorize_outcome)
+
+def build_proceedings_with_decisions(proceedings, lookup_decisions):
+    """Stage 1: proceedings joined to their decision descriptions"""
+    # Step 1: Merge proceedings data with decision description column from lookup_decisions
+    # Keep only relevant columns from proceedings that will be used in the analysis
+    proceedings_columns = proceedings[
+        [
+            "IDNCASE",
+            "COMP_DATE", 
+            "NAT",
+            "LANG",
+            "CASE_TYPE",
+            "DEC_CODE",
+        ]
+    ]
+
+    # tblDecCode is a small table with unique codes: look descriptions up through the
+    # DEC_CODE categorical codes instead of merging (same rows, order and dtypes)
+    positions = lookup_codes(proceedings_columns["DEC_CODE"], lookup_decisions["strCode"])
+    if positions is not None:
+        proceedings_with_decisions = proceedings_columns.reset_index(drop=True)
+        proceedings_with_decisions["decision_description"] = take_column(
+            lookup_decisions["strDescription"], positions, bool((positions < 0).any())
+        )
+        return proceedings_with_decisions
+
+    proceedings_with_decisions = proceedings_columns.merge(
+        lookup_decisions[["strCode", "strDescription"]],  # Use strCode from lookup table
+        how="left",
+        left_on="DEC_CODE",  # Column in proceedings table
+        right_on="strCode",  # Column in lookup table
+    )
+
+    # Drop the strCode column after merging because it contains same information as DEC_CODE
+    proceedings_with_decisions = proceedings_with_decisions.drop(columns=["strCode"])
+
+    # Rename the strDescription column to avoid conflict in later merges
+    proceedings_with_decisions = proceedings_with_decisions.rename(
+        columns={"strDescription": "decision_description"}
+    )
+
+    return proceedings_with_decisions
+
+def build_merged_data(juvenile_cases, proceedings_with_decisions, reps_assigned):
+    """Stage 2: cases joined to proceedings and representation, with the derived analysis columns"""
+    # Create a merged dataset: juvenile_cases + proceedings_with_decisions + reps_assigned
+    # Keep only relevant columns from each dataset
+
+    # First merge juvenile_cases with proceedings_with_decisions keep only relevant columns
+    merged_data = juvenile_cases[
+        [
+            "IDNCASE",
+            "NAT", 
+            "LANG",
+            "CASE_TYPE",
+            "Sex",
+            "C_BIRTHDATE",
+            "LATEST_HEARING",
+        ]
+    ]
+    # Left joins on IDNCASE run as sort-merge joins over int64 keys (see joins.left_join)
+    merged_data = left_join(
+        merged_data,
+        proceedings_with_decisions[
+            ["IDNCASE", "COMP_DATE", "DEC_CODE", "decision_description"]
+        ],
+        on="IDNCASE",
+    )
+
+    # Second: Merge with reps_assigned, keeping all rows from merged_data
+    if reps_assigned is not None and not reps_assigned.empty:
+        merged_data = left_join(
+            merged_data, reps_assigned[["IDNCASE", "STRATTYLEVEL"]], on="IDNCASE"
+        )
+    else:
+        # Add empty STRATTYLEVEL column if reps_assigned is empty
+        merged_data['STRATTYLEVEL'] = pd.Categorical([])
+
+    # Fill missing STRATTYLEVEL values with "no_representation"
+    # Add "no representation" as a valid category
+    if 'STRATTYLEVEL' in merged_data.columns:
+        # Convert to categorical if not already
+        if not isinstance(merged_data['STRATTYLEVEL'].dtype, pd.CategoricalDtype):
+            merged_data['STRATTYLEVEL'] = merged_data['STRATTYLEVEL'].astype('category')
+
+        merged_data["STRATTYLEVEL"] = merged_data["STRATTYLEVEL"].cat.add_categories(
+            ["no_representation"]
+        )
+        # Fill missing values in STRATTYLEVEL with "no_representation"
+        merged_data["STRATTYLEVEL"] = merged_data["STRATTYLEVEL"].fillna("no_representation")
+    else:
+        merged_data['STRATTYLEVEL'] = pd.Categorical(['no_representation'] * len(merged_data))
+
+    # Changing STRATTYLEVEL name to "REPRESENTATION_LEVEL"
+    merged_data = merged_data.rename(columns={"STRATTYLEVEL": "REPRESENTATION_LEVEL"})
+
+    print("Sample row from merged dataset:")
+    print(merged_data.head(5))
+
+    # Before creating hearing_date_combined, ensure both columns are datetime
+    # Check if COMP_DATE needs conversion
+    if merged_data["COMP_DATE"].dtype == "object":
+        merged_data["COMP_DATE"] = pd.to_datetime(merged_data["COMP_DATE"], errors="coerce")
+
+    # Check if LATEST_HEARING needs conversion  
+    if merged_data["LATEST_HEARING"].dtype == "object":
+        merged_data["LATEST_HEARING"] = pd.to_datetime(
+            merged_data["LATEST_HEARING"], errors="coerce"
+        )
+
+    # Now create the combined date field
+    merged_data["hearing_date_combined"] = merged_data["COMP_DATE"].fillna(
+        merged_data["LATEST_HEARING"]
+    )
+
+    # Calculate age (vectorized equivalent of calculate_age)
+    merged_data["AGE_AT_FILING"] = derive_age_at_filing(
+        merged_data["C_BIRTHDATE"], merged_data["hearing_date_combined"]
+    )
+
+    # Determine policy era (vectorized equivalent of determine_policy_era)
+    merged_data["POLICY_ERA"] = derive_policy_era(merged_data["hearing_date_combined"])
+
+    # NOTE: Detention duration calculation is skipped because the DATE_RELEASED column
+    # is empty or doesn't exist in the dataset
+    print(
+        "NOTE: Detention duration analysis skipped due to missing or empty DATE_RELEASED data"
+    )
+
+    # Create HAS_LEGAL_REP indicator EXACTLY like notebook
+    merged_data["HAS_LEGAL_REP"] = derive_has_legal_rep(merged_data["REPRESENTATION_LEVEL"])
+
+    # Display summary of the data we were able to analyze
+    print("\nSummary of available data:")
+    print(f"Total records: {len(merged_data):,}")
+    print(f"Records with age calculation: {merged_data['AGE_AT_FILING'].notna().sum():,}")
+    print(f"Policy era distribution:\n{merged_data['POLICY_ERA'].value_counts()}")
+    print(
+        f"Legal representation distribution:\n{merged_data['HAS_LEGAL_REP'].value_counts()}"
+    )
+
+    # Create binary outcome categories based on actual decision codes
+    merged_data["BINARY_OUTCOME"] = derive_binary_outcome(merged_data["DEC_CODE"])
+
+    # Using decision_description instead of DECISION_DESCRIPTION  
+    merged_data["CASE_OUTCOME"] = merged_data["decision_description"]
+
+    return merged_data
+
+def build_analysis_filtered(merged_data):
+    """Stage 3: analysis columns restricted to known representation status and outcomes"""
+    # Create an analysis dataset with key columns that exist
+    # Core analysis columns we want if they exist
+    available_columns = []
+    possible_columns = [
+        "IDNCASE",
+        "hearing_date_combined",
+        "C_BIRTHDATE", 
+        "Sex",
+        "AGE_AT_FILING",
+        "POLICY_ERA",
+        "HAS_LEGAL_REP", 
+        "DEC_CODE",
+        "CASE_OUTCOME",
+        "BINARY_OUTCOME",
+        "REPRESENTATION_LEVEL"
+    ]
+
+    # Add columns that exist to our selection list
+    for column in possible_columns:
+        if column in merged_data.columns:
+            available_columns.append(column)
+
+    # Create the analysis dataframe with only available columns
+    analysis_df = merged_data[available_columns]
+
+    # Examine the analysis dataset
+    print("First 5 rows of the analysis dataset:")
+    print(analysis_df.head(5))
+
+    # Filter to cases with known representation status and outcomes for analysis
+    analysis_filtered = analysis_df[
+        (analysis_df["HAS_LEGAL_REP"] != "Unknown")
+        & (analysis_df["BINARY_OUTCOME"] != "Unknown")
+        & (analysis_df["BINARY_OUTCOME"] != "Other")
+    ].copy()
+
+    # Check the distribution of representation after filtering
+    print("Legal representation distribution (filtered dataset):")
+    rep_counts = analysis_filtered["HAS_LEGAL_REP"].value_counts()
+    print(rep_counts)
+
+    # Calculate overall representation rate
+    if len(analysis_filtered) > 0:
+        rep_rate = rep_counts.get("Has Legal Representation", 0) / len(analysis_filtered) * 100
+        print(f"\nLegal Representation Rate: {rep_rate:.2f}%")
+    else:
+        print("\nNo filtered data available for representation rate calculation")
+
+    # Examine the relationship between legal representation and case outcomes
+    print("\nOutcome Distribution by Legal Representation:")
+    if len(analysis_filtered) > 0:
+        outcome_by_rep = pd.crosstab(
+            analysis_filtered["BINARY_OUTCOME"], analysis_filtered["HAS_LEGAL_REP"]
+        )
+        print(outcome_by_rep)
+
+        # Calculate percentages
+        outcome_by_rep_pct = (
+            pd.crosstab(
+                analysis_filtered["BINARY_OUTCOME"],
+                analysis_filtered["HAS_LEGAL_REP"],
+                normalize="columns",  # Normalize by columns to get percentages within each representation category
+            )
+            * 100
+        )
+
+        print("\nOutcome Percentages by Legal Representation:")
+        print(outcome_by_rep_pct)
+
+    prepare_filter_columns(analysis_filtered)
+    return analysis_filtered
+
 def process_analysis_data():
     """Process data for analysis exactly like in the notebook - load data with correct dtypes"""
     try:
         print("Loading data with proper dtypes EXACTLY like notebook...")
         
-        # Load juvenile history data EXACTLY like notebook
-        juvenile_history = cache.get('juvenile_history')
-        if juvenile_history is None:
-            print("⚠️ Juvenile history data not available, skipping")
-            juvenile_history = pd.DataFrame()
-        
         # Load juvenile cases with EXACT dtype specification from notebook
+        # (juvenile_history and lookup_juvenile are not used by the analysis and stay unloaded)
         juvenile_cases = cache.get('juvenile_cases')
         proceedings = cache.get('proceedings') 
         reps_assigned = cache.get('reps_assigned')
         lookup_decisions = cache.get('lookup_decisions')
-        lookup_juvenile = cache.get('lookup_juvenile')
         
         if (juvenile_cases is None or 
             proceedings is None or 
@@ -83,10 +358,6 @@ def process_analysis_data():
         
         # Print data types for all tables EXACTLY like notebook
         print("### Data Types for All Tables")
-        if not juvenile_history.empty:
-            print("**Juvenile History Data Types:**")
-            print(juvenile_history.dtypes.to_frame("dtype"))
-        
         print("**Cases Data Types:**")
         print(juvenile_cases.dtypes.to_frame("dtype"))
         
@@ -99,215 +370,30 @@ def process_analysis_data():
         
         print("\nStarting clean process EXACTLY like notebook...")
         
-        # Step 1: Merge proceedings data with decision description column from lookup_decisions
-        # Keep only relevant columns from proceedings that will be used in the analysis
-        proceedings_with_decisions = proceedings[
-            [
-                "IDNCASE",
-                "COMP_DATE", 
-                "NAT",
-                "LANG",
-                "CASE_TYPE",
-                "DEC_CODE",
-            ]
-        ].merge(
-            lookup_decisions[["strCode", "strDescription"]],  # Use strCode from lookup table
-            how="left",
-            left_on="DEC_CODE",  # Column in proceedings table
-            right_on="strCode",  # Column in lookup table
-        )
-
-        # Drop the strCode column after merging because it contains same information as DEC_CODE
-        proceedings_with_decisions = proceedings_with_decisions.drop(columns=["strCode"])
+        proceedings_with_decisions = build_proceedings_with_decisions(proceedings, lookup_decisions)
+        merged_data = build_merged_data(juvenile_cases, proceedings_with_decisions, reps_assigned)
+        analysis_filtered = build_analysis_filtered(merged_data)
 
-        # Rename the strDescription column to avoid conflict in later merges
-        proceedings_with_decisions = proceedings_with_decisions.rename(
-            columns={"strDescription": "decision_description"}
-        )
-
-        # Create a merged dataset: juvenile_cases + proceedings_with_decisions + reps_assigned
-        # Keep only relevant columns from each dataset
-
-        # First merge juvenile_cases with proceedings_with_decisions keep only relevant columns
-        merged_data = juvenile_cases[
-            [
-                "IDNCASE",
-                "NAT", 
-                "LANG",
-                "CASE_TYPE",
-                "Sex",
-                "C_BIRTHDATE",
-                "LATEST_HEARING",
-            ]
-        ].merge(
-            proceedings_with_decisions[
-                ["IDNCASE", "COMP_DATE", "DEC_CODE", "decision_description"]
-            ],
-            left_on="IDNCASE",
-            right_on="IDNCASE",
-            how="left",
-        )
-
-        # Second: Merge with reps_assigned, keeping all rows from merged_data
-        if reps_assigned is not None and not reps_assigned.empty:
-            merged_data = merged_data.merge(
-                reps_assigned[["IDNCASE", "STRATTYLEVEL"]], on="IDNCASE", how="left"
-            )
-        else:
-            # Add empty STRATTYLEVEL column if reps_assigned is empty
-            merged_data['STRATTYLEVEL'] = pd.Categorical([])
-
-        # Fill missing STRATTYLEVEL values with "no_representation"
-        # Add "no representation" as a valid category
-        if 'STRATTYLEVEL' in merged_data.columns:
-            # Convert to categorical if not already
-            if not pd.api.types.is_categorical_dtype(merged_data['STRATTYLEVEL']):
-                merged_data['STRATTYLEVEL'] = merged_data['STRATTYLEVEL'].astype('category')
-            
-            merged_data["STRATTYLEVEL"] = merged_data["STRATTYLEVEL"].cat.add_categories(
-                ["no_representation"]
-            )
-            # Fill missing values in STRATTYLEVEL with "no_representation"
-            merged_data["STRATTYLEVEL"] = merged_data["STRATTYLEVEL"].fillna("no_representation")
-        else:
-            merged_data['STRATTYLEVEL'] = pd.Categorical(['no_representation'] * len(merged_data))
-
-        # Changing STRATTYLEVEL name to "REPRESENTATION_LEVEL"
-        merged_data = merged_data.rename(columns={"STRATTYLEVEL": "REPRESENTATION_LEVEL"})
-
-        print("Sample row from merged dataset:")
-        print(merged_data.head(5))
-
-        # Before creating hearing_date_combined, ensure both columns are datetime
-        # Check if COMP_DATE needs conversion
-        if merged_data["COMP_DATE"].dtype == "object":
-            merged_data["COMP_DATE"] = pd.to_datetime(merged_data["COMP_DATE"], errors="coerce")
-
-        # Check if LATEST_HEARING needs conversion  
-        if merged_data["LATEST_HEARING"].dtype == "object":
-            merged_data["LATEST_HEARING"] = pd.to_datetime(
-                merged_data["LATEST_HEARING"], errors="coerce"
-            )
-        
-        # Now create the combined date field
-        merged_data["hearing_date_combined"] = merged_data["COMP_DATE"].fillna(
-            merged_data["LATEST_HEARING"]
-        )
-
-        # Calculate age using the enhanced function
-        merged_data["AGE_AT_FILING"] = merged_data.apply(
-            lambda row: calculate_age(row["C_BIRTHDATE"], row["hearing_date_combined"]), axis=1
-        )
-
-        # Determine policy era
-        merged_data["POLICY_ERA"] = merged_data["hearing_date_combined"].apply(
-            determine_policy_era
-        )
-
-        # NOTE: Detention duration calculation is skipped because the DATE_RELEASED column
-        # is empty or doesn't exist in the dataset
-        print(
-            "NOTE: Detention duration analysis skipped due to missing or empty DATE_RELEASED data"
-        )
-        
-        # Create HAS_LEGAL_REP indicator EXACTLY like notebook
-        merged_data["HAS_LEGAL_REP"] = merged_data["REPRESENTATION_LEVEL"].apply(
-            lambda x: "No Legal Representation"
-            if x == "no_representation"
-            else ("Has Legal Representation" if x == "COURT" or x == "BOARD" else "Unknown")
-        )
-
-        # Display summary of the data we were able to analyze
-        print("\nSummary of available data:")
-        print(f"Total records: {len(merged_data):,}")
-        print(f"Records with age calculation: {merged_data['AGE_AT_FILING'].notna().sum():,}")
-        print(f"Policy era distribution:\n{merged_data['POLICY_ERA'].value_counts()}")
-        print(
-            f"Legal representation distribution:\n{merged_data['HAS_LEGAL_REP'].value_counts()}"
-        )
-
-        # Create binary outcome categories based on actual decision codes
-        merged_data["BINARY_OUTCOME"] = merged_data["DEC_CODE"].apply(categorize_outcome)
-
-        # Using decision_description instead of DECISION_DESCRIPTION  
-        merged_data["CASE_OUTCOME"] = merged_data["decision_description"]
-
-        # Create an analysis dataset with key columns that exist
-        # Core analysis columns we want if they exist
-        available_columns = []
-        possible_columns = [
-            "IDNCASE",
-            "hearing_date_combined",
-            "C_BIRTHDATE", 
-            "Sex",
-            "AGE_AT_FILING",
-            "POLICY_ERA",
-            "HAS_LEGAL_REP", 
-            "DEC_CODE",
-            "CASE_OUTCOME",
-            "BINARY_OUTCOME",
-            "REPRESENTATION_LEVEL"
-        ]
-
-        # Add columns that exist to our selection list
-        for column in possible_columns:
-            if column in merged_data.columns:
-                available_columns.append(column)
-
-        # Create the analysis dataframe with only available columns
-        analysis_df = merged_data[available_columns]
-
-        # Examine the analysis dataset
-        print("First 5 rows of the analysis dataset:")
-        print(analysis_df.head(5))
-
-        # Filter to cases with known representation status and outcomes for analysis
-        analysis_filtered = analysis_df[
-            (analysis_df["HAS_LEGAL_REP"] != "Unknown")
-            & (analysis_df["BINARY_OUTCOME"] != "Unknown")
-            & (analysis_df["BINARY_OUTCOME"] != "Other")
-        ].copy()
-
-        # Check the distribution of representation after filtering
-        print("Legal representation distribution (filtered dataset):")
-        rep_counts = analysis_filtered["HAS_LEGAL_REP"].value_counts()
-        print(rep_counts)
-
-        # Calculate overall representation rate
-        if len(analysis_filtered) > 0:
-            rep_rate = rep_counts.get("Has Legal Representation", 0) / len(analysis_filtered) * 100
-            print(f"\nLegal Representation Rate: {rep_rate:.2f}%")
-        else:
-            print("\nNo filtered data available for representation rate calculation")
-
-        # Examine the relationship between legal representation and case outcomes
-        print("\nOutcome Distribution by Legal Representation:")
-        if len(analysis_filtered) > 0:
-            outcome_by_rep = pd.crosstab(
-                analysis_filtered["BINARY_OUTCOME"], analysis_filtered["HAS_LEGAL_REP"]
-            )
-            print(outcome_by_rep)
-
-            # Calculate percentages
-            outcome_by_rep_pct = (
-                pd.crosstab(
-                    analysis_filtered["BINARY_OUTCOME"],
-                    analysis_filtered["HAS_LEGAL_REP"],
-                    normalize="columns",  # Normalize by columns to get percentages within each representation category
-                )
-                * 100
-            )
-
-            print("\nOutcome Percentages by Legal Representation:")
-            print(outcome_by_rep_pct)
-
-        # Store processed data
-        cache.set('merged_data', merged_data)
-        cache.set('analysis_filtered', analysis_filtered)
+        # Store processed data, compacted before the cache holds it
+        processed = {
+            'proceedings_with_decisions': proceedings_with_decisions,
+            'merged_data': merged_data,
+            'analysis_filtered': analysis_filtered,
+        }
+        compact_tables(processed)
+        for key, df in processed.items():
+            cache.set(key, df)
+        analysis_filtered = processed['analysis_filtered']
+        build_aggregates(analysis_filtered)
+        build_quarter_index(analysis_filtered)
         
         print(f"Analysis data processed successfully!")
         print(f"Total merged records: {len(merged_data):,}")
         print(f"Filtered analysis records: {len(analysis_filtered):,}")
+
+        # The request paths only read analysis_filtered: release the intermediates
+        from .pipeline import release_intermediates
+        release_intermediates()
         
         return True
         
@@ -325,16 +411,18 @@ def process_analysis_data():
         
         return True  # Return True to prevent further explosions
 
-def get_data_statistics(juvenile_cases_data=None):
-    """Calculate real statistics from the loaded data or provided data"""
+def get_data_statistics(juvenile_cases_data=None, reps_assigned_data=None, rep_summary=None):
+    """
+    Calculate real statistics from the loaded data or provided data (reps default
+    to the cached ones; rep_summary, when given, is the summary of those reps)
+    """
     if juvenile_cases_data is None:
         if not cache.is_loaded() or cache.get('juvenile_cases') is None:
             return None
         juvenile_cases = cache.get('juvenile_cases')
-        reps_assigned = cache.get('reps_assigned')
     else:
         juvenile_cases = juvenile_cases_data
-        reps_assigned = cache.get('reps_assigned')  # Use cached reps data
+    reps_assigned = reps_assigned_data if reps_assigned_data is not None else cache.get('reps_assigned')
     
     try:
         
@@ -359,13 +447,21 @@ def get_data_statistics(juvenile_cases_data=None):
         # Calculate representation statistics
         rep_stats = {}
         if reps_assigned is not None:
-            # Merge with reps data to get representation info
-            cases_with_rep = juvenile_cases.merge(reps_assigned, on='IDNCASE', how='left')
-            has_representation = (~cases_with_rep['STRATTYLEVEL'].isna()).sum()
+            # Look the cases up in the representation summary of the reps
+            if rep_summary is None:
+                rep_summary = get_rep_summary(reps_assigned)
+            counts = rep_summary.case_counts(juvenile_cases['IDNCASE']) if rep_summary is not None else None
+            if counts is not None:
+                has_representation, atty_type_counts = counts
+            else:
+                # Merge with reps data to get representation info
+                cases_with_rep = juvenile_cases.merge(reps_assigned, on='IDNCASE', how='left')
+                has_representation = (~cases_with_rep['STRATTYLEVEL'].isna()).sum()
+                atty_type_counts = cases_with_rep['STRATTYTYPE'].value_counts()
             rep_rate = (has_representation / total_cases) * 100 if total_cases > 0 else 0
             
             # Attorney type distribution
-            atty_type_counts = cases_with_rep['STRATTYTYPE'].value_counts().to_dict()
+            atty_type_counts = atty_type_counts.to_dict()
             rep_stats = {
                 'representation_rate': round(rep_rate, 1),
                 'attorney_types': atty_type_counts
@@ -392,48 +488,3 @@ def get_data_statistics(juvenile_cases_data=None):
     except Exception as e:
         print(f"Error calculating statistics: {str(e)}")
         return None
-
-def apply_filters(data, filters):
-    """Apply filters to the dataset"""
-    try:
-        if data is None or data.empty:
-            return None
-        
-        filtered_data = data.copy()
-        
-        # Apply time period filter
-        if filters.get('time_period') != 'all' and 'LATEST_HEARING' in filtered_data.columns:
-            time_period = filters['time_period']
-            if time_period == 'trump1':
-                # Trump I (2018-2020)
-                mask = (filtered_data['LATEST_HEARING'].dt.year >= 2018) & (filtered_data['LATEST_HEARING'].dt.year <= 2020)
-                filtered_data = filtered_data[mask]
-            elif time_period == 'biden':
-                # Biden (2021-2024)
-                mask = (filtered_data['LATEST_HEARING'].dt.year >= 2021) & (filtered_data['LATEST_HEARING'].dt.year <= 2024)
-                filtered_data = filtered_data[mask]
-            elif time_period == 'trump2':
-                # Trump II (2025+)
-                mask = filtered_data['LATEST_HEARING'].dt.year >= 2025
-                filtered_data = filtered_data[mask]
-        
-        # Apply representation filter
-        if filters.get('representation') != 'all' and 'HAS_LEGAL_REP' in filtered_data.columns:
-            representation = filters['representation']
-            if representation == 'represented':
-                filtered_data = filtered_data[filtered_data['HAS_LEGAL_REP'] == 'Has Legal Representation']
-            elif representation == 'unrepresented':
-                filtered_data = filtered_data[filtered_data['HAS_LEGAL_REP'] == 'No Legal Representation']
-        
-        # Apply case type filter (if we have case type data)
-        if filters.get('case_type') != 'all':
-            case_type = filters['case_type']
-            # This would require mapping case types to decision codes or case categories
-            # For now, we'll skip this filter until we have proper case type categorization
-            pass
-        
-        return filtered_data
-        
-    except Exception as e:
-        print(f"Error applying filters: {str(e)}")
-        return None
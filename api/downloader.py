@@ -0,0 +1,205 @@
+"""
+Streaming, resumable file downloads
+Responses are written chunk by chunk to a .part file next to the target and
+renamed into place only once the size (and checksum, when known) has been
+verified; an interrupted transfer is resumed with an HTTP Range request
+instead of starting over. The validator (ETag or Last-Modified) of the
+partial download is kept next to it and sent as If-Range, so a file that
+changed upstream in the meantime is downloaded again from byte 0
+"""
+import hashlib
+import os
+
+import requests
+
+# Local imports
+from .config import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_RETRIES, DOWNLOAD_TIMEOUT
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+class DownloadError(Exception):
+    """A download could not be completed or failed verification"""
+
+class _IncompleteDownload(Exception):
+    """The connection ended before the announced size was received"""
+
+def new_session():
+    """HTTP session used for one download"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+def part_path(file_path):
+    """Temporary path a download is streamed to before being renamed into place"""
+    return f"{file_path}.part"
+
+def validator_path(file_path):
+    """File holding the validator of the version a .part file was downloaded from"""
+    return f"{part_path(file_path)}.validator"
+
+def _validator(response):
+    """Strong ETag, else Last-Modified, of the version of the file a response serves (None if neither)"""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+def _read_validator(file_path):
+    try:
+        with open(validator_path(file_path)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _write_validator(file_path, validator):
+    path = validator_path(file_path)
+    if validator is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, 'w') as f:
+        f.write(validator)
+
+def discard_part(file_path):
+    """Remove the .part file of a download and its validator"""
+    for path in (part_path(file_path), validator_path(file_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _range_total(response):
+    """Complete size from the Content-Range of a 206 or 416 response (None if absent or "*")"""
+    total = response.headers.get('Content-Range', '').rsplit('/', 1)[-1]
+    return int(total) if total.isdigit() else None
+
+def _expected_size(response, offset):
+    """Total size of the file announced by a response starting at offset (None if unknown)"""
+    if response.headers.get('Content-Encoding', 'identity') != 'identity':
+        return None  # Content-Length counts encoded bytes
+    if response.status_code == 206:
+        total = _range_total(response)
+        if total is not None:
+            return total
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit():
+        return offset + int(length)
+    return None
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stream_to_file(session, url, file_path, response=None, first_chunk=b'',
+                   expected_sha256=None, magic=None):
+    """
+    Stream url into file_path and return the size of the completed file.
+
+    response/first_chunk hand over a response the caller already opened and
+    peeked at. A .part file left by an earlier attempt or run is resumed
+    with a Range request conditional on its validator (If-Range); it is
+    restarted when the server ignores the range or the file has changed,
+    and discarded up front when its validator is unknown. magic is the byte
+    prefix the file must start with.
+
+    Raises DownloadError when verification fails (nothing is left behind)
+    or after DOWNLOAD_RETRIES failed resumes (the .part file and its
+    validator are kept for the next run to resume).
+    """
+    tmp_path = part_path(file_path)
+    failures = 0
+    started_here = False  # the .part file was begun by this call
+    while True:
+        offset = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
+        validator = _read_validator(file_path) if offset else None
+        if offset and validator is None and not started_here:
+            # No way to tell whether the remote file is still the one it was cut from
+            print("    ⚠️ Discarding a partial download of unknown version...")
+            discard_part(file_path)
+            offset = 0
+        try:
+            if response is not None and offset:
+                # The handed-over response starts at byte 0: ask for the rest only when it
+                # serves the version the .part file was cut from, else start over with it
+                if _validator(response) == validator:
+                    response.close()
+                    response, first_chunk = None, b''
+                else:
+                    print("    ⚠️ Remote file changed since the partial download, restarting...")
+                    discard_part(file_path)
+                    offset = 0
+            if response is None:
+                headers = {}
+                if offset:
+                    headers['Range'] = f'bytes={offset}-'
+                    if validator is not None:
+                        headers['If-Range'] = validator
+                response = session.get(url, headers=headers, stream=True,
+                                       timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
+                if response.status_code == 416 and offset:
+                    # The range starts at or past the end of the file. The .part file is only
+                    # complete if the server's total size says so (the checksum is still verified
+                    # below); a stale or oversized one is discarded and the download restarted.
+                    total = _range_total(response)
+                    if total == offset:
+                        expected = offset
+                        break
+                    print(f"    ⚠️ Server rejected resuming at byte {offset} (file size {total or 'unknown'}), restarting...")
+                    discard_part(file_path)
+                    continue
+                response.raise_for_status()
+
+            resumed = offset > 0 and response.status_code == 206
+            if resumed and _validator(response) not in (None, validator):
+                # A server ignoring If-Range sent part of a different version
+                print("    ⚠️ Remote file changed since the partial download, restarting...")
+                discard_part(file_path)
+                continue
+            if not resumed:
+                offset = 0
+                _write_validator(file_path, _validator(response))
+                started_here = True
+            expected = _expected_size(response, offset)
+
+            with open(tmp_path, 'ab' if resumed else 'wb') as f:
+                if first_chunk:
+                    f.write(first_chunk)
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+            size = os.path.getsize(tmp_path)
+            if expected is not None and size < expected:
+                raise _IncompleteDownload(f"received {size} of {expected} bytes")
+            break
+
+        except (requests.RequestException, OSError, _IncompleteDownload) as e:
+            failures += 1
+            if failures > DOWNLOAD_RETRIES:
+                raise DownloadError(f"download failed after {failures} attempts: {e}")
+            print(f"    ⚠️ Transfer interrupted ({e}), resuming (attempt {failures + 1})...")
+        finally:
+            if response is not None:
+                response.close()
+            response, first_chunk = None, b''
+
+    # Verify before the file becomes visible under its real name
+    size = os.path.getsize(tmp_path)
+    if expected is not None and size != expected:
+        discard_part(file_path)
+        raise DownloadError(f"size mismatch: got {size} bytes, expected {expected}")
+    if magic is not None:
+        with open(tmp_path, 'rb') as f:
+            if f.read(len(magic)) != magic:
+                discard_part(file_path)
+                raise DownloadError("downloaded file has an unexpected format")
+    sha256 = file_sha256(tmp_path)
+    if expected_sha256 is not None and sha256 != expected_sha256.lower():
+        discard_part(file_path)
+        raise DownloadError(f"checksum mismatch: got {sha256}, expected {expected_sha256}")
+    print(f"    🔏 sha256 {sha256}")
+
+    os.replace(tmp_path, file_path)
+    _write_validator(file_path, None)
+    return size
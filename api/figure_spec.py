@@ -0,0 +1,49 @@
+"""
+Plain-dict Plotly figure specs for the chart endpoints
+Figures are written directly in the JSON form plotly.graph_objects serializes
+them to, so requests build no graph objects and each response is encoded
+exactly once (by Flask)
+"""
+import json
+import math
+from datetime import date
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.utils
+
+# Default layout template as Plotly serializes it, captured once at import
+# (shared by every spec, so it must be treated as read-only)
+LAYOUT_TEMPLATE = json.loads(plotly.utils.PlotlyJSONEncoder().encode(go.Figure().layout.template))
+
+# Plotly config sent with every chart
+CHART_CONFIG = {
+    'responsive': True,
+    'displayModeBar': True,
+    'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
+    'displaylogo': False
+}
+
+def json_value(value):
+    """A scalar as PlotlyJSONEncoder writes it (dates in ISO format, NaN and infinities as null)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def json_values(values):
+    """A Series, array or list as the JSON list Plotly would write for a data array"""
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    return [json_value(value) for value in values]
+
+def figure_spec(data, layout):
+    """Figure dict with the default template and chart config, ready to return from a view"""
+    return {
+        'data': data,
+        'layout': {**layout, 'template': LAYOUT_TEMPLATE},
+        'config': dict(CHART_CONFIG, modeBarButtonsToRemove=list(CHART_CONFIG['modeBarButtonsToRemove']))
+    }
@@ -10,8 +10,13 @@ Aligned with 4_data_analysis.ipynb:
 - Representation normalization identical to the notebook.
 """
 from __future__ import annotations
+import threading
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, Tuple, List
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple, List, Union
+import numpy as np
 import pandas as pd
 
 # Time ranges (inclusive start, exclusive end when present)
@@ -27,6 +32,17 @@ REPRESENTATION_VALUES = {
     "unrepresented": {"No Legal Representation", "No", "N", "0", 0, False}
 }
 
+# Normalized representation stored as int8 codes
+REP_CODES = {
+    "Has Legal Representation": 1,
+    "No Legal Representation": 0,
+    "Unknown": -1,
+}
+
+# Columns precomputed at load time by prepare_filter_columns
+REP_CODE_COLUMN = "REP_CODE"
+CASE_TYPE_KEY_COLUMN = "CASE_TYPE_KEY"
+
 # Priority of date columns (first existing will be used)
 DATE_COLUMNS_PRIORITY: List[str] = [
     "hearing_date_combined",
@@ -80,70 +96,241 @@ def _pick_date_col(df: pd.DataFrame) -> Optional[str]:
             return col
     return None
 
-def _ensure_datetime(df: pd.DataFrame, col: str) -> pd.DataFrame:
-    out = df.copy()
-    out[col] = pd.to_datetime(out[col], errors="coerce", utc=False)
-    return out
+def _date_values(df: pd.DataFrame, col: str) -> pd.Series:
+    """Date column as datetime; columns prepared at load time are used as-is"""
+    values = df[col]
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors="coerce", utc=False)
+
+def _representation_code(x) -> int:
+    """REP_CODES value of a HAS_LEGAL_REP entry"""
+    if pd.isna(x):
+        return REP_CODES["Unknown"]
+    xv = str(x).strip()
+    if xv in REPRESENTATION_VALUES["represented"] or xv.lower() in {"has legal representation", "true"}:
+        return REP_CODES["Has Legal Representation"]
+    if xv in REPRESENTATION_VALUES["unrepresented"] or xv.lower() in {"no legal representation", "false"}:
+        return REP_CODES["No Legal Representation"]
+    return REP_CODES["Unknown"]
+
+def _representation_level_code(x) -> int:
+    """REP_CODES value of a REPRESENTATION_LEVEL entry"""
+    x = str(x).strip().upper()
+    if x in {"COURT", "BOARD"}:
+        return REP_CODES["Has Legal Representation"]
+    if x == "NO_REPRESENTATION":
+        return REP_CODES["No Legal Representation"]
+    return REP_CODES["Unknown"]
 
-def _normalize_representation_column(df: pd.DataFrame) -> pd.Series:
+def _case_type_key(x) -> str:
+    """Case type compared case- and whitespace-insensitively (NaN becomes "nan" like astype(str))"""
+    return str(x).strip().lower()
+
+def _map_distinct(values: pd.Series, func) -> Tuple[np.ndarray, list]:
     """
-    Normalized values:
-      "Has Legal Representation" | "No Legal Representation" | "Unknown"
+    func evaluated once per distinct value instead of once per row.
+    Returns the row codes and the mapped value of every code, with the
+    mapped missing value last so that code -1 selects it.
     """
+    codes, uniques = pd.factorize(values)
+    return codes, [func(value) for value in uniques] + [func(np.nan)]
+
+def _representation_codes(df: pd.DataFrame) -> np.ndarray:
+    """REP_CODES of every row (precomputed by prepare_filter_columns when present)"""
+    if REP_CODE_COLUMN in df.columns:
+        return df[REP_CODE_COLUMN].to_numpy()
     if "HAS_LEGAL_REP" in df.columns:
-        s = df["HAS_LEGAL_REP"]
-        def map_val(x):
-            if pd.isna(x):
-                return "Unknown"
-            xv = str(x).strip()
-            if xv in REPRESENTATION_VALUES["represented"] or xv.lower() in {"has legal representation", "true"}:
-                return "Has Legal Representation"
-            if xv in REPRESENTATION_VALUES["unrepresented"] or xv.lower() in {"no legal representation", "false"}:
-                return "No Legal Representation"
-            return "Unknown"
-        return s.map(map_val)
-    if "REPRESENTATION_LEVEL" in df.columns:
-        s = df["REPRESENTATION_LEVEL"].astype(str).str.strip().str.upper()
-        return s.map(
-            lambda x: "Has Legal Representation" if x in {"COURT","BOARD"}
-            else ("No Legal Representation" if x == "NO_REPRESENTATION" else "Unknown")
-        )
-    return pd.Series(["Unknown"] * len(df), index=df.index)
+        codes, mapped = _map_distinct(df["HAS_LEGAL_REP"], _representation_code)
+    elif "REPRESENTATION_LEVEL" in df.columns:
+        codes, mapped = _map_distinct(df["REPRESENTATION_LEVEL"], _representation_level_code)
+    else:
+        return np.full(len(df), REP_CODES["Unknown"], dtype=np.int8)
+    return np.asarray(mapped, dtype=np.int8)[codes]
 
-def apply_filters(df: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+def _case_type_keys(values: pd.Series) -> pd.Categorical:
+    """Normalized case type of every row as a categorical"""
+    codes, mapped = _map_distinct(values, _case_type_key)
+    keys = np.asarray(mapped, dtype=object)[codes]
+    # factorize folds None into NaN but astype(str) tells them apart
+    missing = codes == -1
+    if missing.any():
+        keys[missing] = [_case_type_key(value) for value in values.to_numpy()[missing]]
+    return pd.Categorical(keys)
+
+def prepare_filter_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize, once at load time, the columns apply_filters reads so that
+    requests only evaluate predicates (modifies df in place and returns it):
+    the date column is converted to datetime, REP_CODE holds the normalized
+    representation as int8 REP_CODES and CASE_TYPE_KEY the normalized case
+    type as a categorical, so both filters become integer comparisons
+    """
     if df is None or df.empty:
         return df
-    data = df.copy()
+    date_col = _pick_date_col(df)
+    if date_col and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce", utc=False)
+    if REP_CODE_COLUMN not in df.columns and (
+        "HAS_LEGAL_REP" in df.columns or "REPRESENTATION_LEVEL" in df.columns
+    ):
+        df[REP_CODE_COLUMN] = _representation_codes(df)
+    if CASE_TYPE_KEY_COLUMN not in df.columns and "CASE_TYPE" in df.columns:
+        df[CASE_TYPE_KEY_COLUMN] = _case_type_keys(df["CASE_TYPE"])
+    return df
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """
+    Filters compiled into the normalized values the predicates compare
+    against (None = predicate inactive). Plans are immutable and hashable,
+    so the rows they select are memoized per table by FilterIndex.
+    """
+    time_period: Optional[str] = None
+    rep_code: Optional[int] = None
+    case_type_key: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.time_period is None and self.rep_code is None and self.case_type_key is None
+
+@lru_cache(maxsize=256)
+def _compile(filters: Filters) -> FilterPlan:
+    rep_code = None
+    if filters.representation == "represented":
+        rep_code = REP_CODES["Has Legal Representation"]
+    elif filters.representation == "unrepresented":
+        rep_code = REP_CODES["No Legal Representation"]
+    return FilterPlan(
+        time_period=None if filters.time_period == "all" else filters.time_period,
+        rep_code=rep_code,
+        case_type_key=None if filters.case_type == "all" else _case_type_key(filters.case_type),
+    )
+
+def compile_filters(filters: Union[FilterPlan, Filters, Dict[str, Any], None]) -> FilterPlan:
+    """Compile Filters (or a query-style dict) into a FilterPlan, parsed once per distinct value"""
+    if isinstance(filters, FilterPlan):
+        return filters
+    if filters is None:
+        filters = Filters()
+    elif isinstance(filters, dict):
+        filters = Filters.from_query(filters)
+    return _compile(filters)
+
+def _has_representation(df: pd.DataFrame) -> bool:
+    return any(col in df.columns for col in (REP_CODE_COLUMN, "HAS_LEGAL_REP", "REPRESENTATION_LEVEL"))
+
+def filter_mask(df: pd.DataFrame, filters) -> Optional[np.ndarray]:
+    """
+    All active predicates combined into one boolean row mask (None when none
+    applies). Predicates whose column df does not have are skipped.
+    """
+    plan = compile_filters(filters)
+    masks: List[np.ndarray] = []
 
     # Time period
-    date_col = _pick_date_col(data)
-    if date_col:
-        data = _ensure_datetime(data, date_col)
-        if filters.time_period != "all":
-            start, end = TIME_PERIODS[filters.time_period]  # type: ignore
-            mask = pd.Series(True, index=data.index)
-            if start is not None:
-                mask &= data[date_col] >= start
-            if end is not None:
-                mask &= data[date_col] < end
-            data = data[mask]
+    date_col = _pick_date_col(df)
+    if date_col and plan.time_period is not None:
+        start, end = TIME_PERIODS[plan.time_period]  # type: ignore
+        dates = _date_values(df, date_col)
+        if start is not None:
+            masks.append((dates >= start).to_numpy())
+        if end is not None:
+            masks.append((dates < end).to_numpy())
 
     # Representation
-    if filters.representation != "all":
-        rep_norm = _normalize_representation_column(data)
-        if filters.representation == "represented":
-            data = data[rep_norm == "Has Legal Representation"]
-        else:
-            data = data[rep_norm == "No Legal Representation"]
+    if plan.rep_code is not None and _has_representation(df):
+        masks.append(_representation_codes(df) == plan.rep_code)
 
     # Case type
-    if filters.case_type != "all" and "CASE_TYPE" in data.columns:
-        data = data[
-            data["CASE_TYPE"].astype(str).str.strip().str.lower()
-            == str(filters.case_type).strip().lower()
-        ]
+    if plan.case_type_key is not None and "CASE_TYPE" in df.columns:
+        wanted = plan.case_type_key
+        if CASE_TYPE_KEY_COLUMN in df.columns:
+            keys = df[CASE_TYPE_KEY_COLUMN].cat
+            if wanted in keys.categories:
+                masks.append(keys.codes.to_numpy() == keys.categories.get_loc(wanted))
+            else:
+                masks.append(np.zeros(len(df), dtype=bool))
+        else:
+            masks.append((df["CASE_TYPE"].astype(str).str.strip().str.lower() == wanted).to_numpy())
+
+    if not masks:
+        return None
+    return np.logical_and.reduce(masks)
+
+class FilterIndex:
+    """
+    Row positions selected by each plan on one table, computed on first use
+    and then reused by every request with the same filters. The most
+    recently used MAX_PLANS position arrays are kept.
+    """
+    MAX_PLANS = 32
+
+    def __init__(self, df: pd.DataFrame):
+        self._frame = weakref.ref(df)
+        self._rows: "OrderedDict[FilterPlan, Optional[np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
 
-    return data
+    def frame(self) -> Optional[pd.DataFrame]:
+        return self._frame()
+
+    def rows(self, plan: FilterPlan) -> Optional[np.ndarray]:
+        """Positions of the rows plan selects (None when no predicate applies)"""
+        if plan.is_empty:
+            return None
+        with self._lock:
+            if plan in self._rows:
+                self._rows.move_to_end(plan)
+                return self._rows[plan]
+        mask = filter_mask(self.frame(), plan)
+        rows = None if mask is None else np.flatnonzero(mask)
+        if rows is not None and len(mask) < np.iinfo(np.int32).max:
+            rows = rows.astype(np.int32)
+        with self._lock:
+            self._rows[plan] = rows
+            while len(self._rows) > self.MAX_PLANS:
+                self._rows.popitem(last=False)
+        return rows
+
+_indexes: Dict[int, FilterIndex] = {}
+_indexes_lock = threading.Lock()
+
+def filter_index(df: pd.DataFrame) -> FilterIndex:
+    """FilterIndex of df, created on first use and dropped with the frame"""
+    key = id(df)
+    index = _indexes.get(key)
+    if index is not None and index.frame() is df:
+        return index
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or index.frame() is not df:
+            index = FilterIndex(df)
+            _indexes[key] = index
+            weakref.finalize(df, _drop_index, key, index)
+    return index
+
+def _drop_index(key: int, index: FilterIndex) -> None:
+    with _indexes_lock:
+        if _indexes.get(key) is index:
+            del _indexes[key]
+
+def apply_filters(df: pd.DataFrame, filters,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Rows of df matching filters (Filters, a query-style dict or a FilterPlan),
+    restricted to columns when given.
+    Only the selected rows and columns are materialized; with no active
+    filter and no projection df itself is returned, so callers must not
+    modify the result in place.
+    """
+    if df is None or df.empty:
+        return df
+    rows = filter_index(df).rows(compile_filters(filters))
+    if rows is None:
+        return df if columns is None else df[columns]
+    if columns is None:
+        return df.take(rows)
+    return df.iloc[rows, [df.columns.get_loc(col) for col in columns]]
 
 def filter_options(df: pd.DataFrame) -> Dict[str, Any]:
     opts: Dict[str, Any] = {
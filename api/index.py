@@ -2,15 +2,15 @@
 Docker entry point for the Juvenile Immigration API
 """
 import os
+import sys
 import threading
-import time
 from flask import Flask
 from flask_cors import CORS
 
 from api.api_routes import (
-    health, get_overview, representation_outcomes, 
+    require_data, refresh_shared_data, health, get_overview, representation_outcomes, 
     time_series_analysis, chi_square_analysis, outcome_percentages, countries_chart,
-    meta_options, get_filtered_overview, data_status, force_reload_data, contact
+    get_all_findings_data, meta_options, get_filtered_overview, data_status, force_reload_data, contact
 )
 from api.basic_stats import get_basic_statistics
 from api.models import cache
@@ -61,41 +61,39 @@ if _env_bool(os.getenv("ENABLE_BACKEND_CORS"), default=False):
 else:
     print("🔐 Flask CORS disabled (handled by Nginx)")
 
-# Data loading management
-_data_loading_lock = threading.Lock()
-_data_loaded = False
-
 def initialize_data():
-    """Initialize data loading in background thread with memory optimization"""
-    global _data_loaded
-    with _data_loading_lock:
-        if not _data_loaded:
-            print("🚀 Initializing data loading...")
-            try:
-                # Check if data is already cached to avoid reload
-                if cache.is_loaded():
-                    print("✅ Data already loaded from cache")
-                    _data_loaded = True
-                    return
-                
-                # Load data with timeout protection
-                load_data()
-                _data_loaded = True
-                print("✅ Data initialization completed")
-                
-                # Force garbage collection after data loading
-                import gc
-                gc.collect()
-                
-            except Exception as e:
-                print(f"❌ Data initialization failed: {e}")
-                # Don't exit, let the app start anyway
-                time.sleep(5)  # Wait before potential retry
+    """Start loading data in a background thread (single-flight with request-triggered loads, see load_data)"""
+    print("🚀 Initializing data loading...")
+    try:
+        if load_data():
+            print("✅ Data initialization completed")
+        else:
+            print("❌ Data initialization failed, requests will retry the load")
+        
+        # Force garbage collection after data loading
+        import gc
+        gc.collect()
+        
+    except Exception as e:
+        print(f"❌ Data initialization failed: {e}")
+
+def is_pool_worker():
+    """True while an ingestion pool worker re-imports the entry script (run as __mp_main__)"""
+    return getattr(sys.modules.get('__mp_main__'), '__name__', None) == '__mp_main__'
+
+# Start data loading in background thread, in the serving process only
+if not is_pool_worker():
+    print("🔄 Starting background data initialization...")
+    data_thread = threading.Thread(target=initialize_data, daemon=True)
+    data_thread.start()
 
-# Start data loading in background thread
-print("🔄 Starting background data initialization...")
-data_thread = threading.Thread(target=initialize_data, daemon=True)
-data_thread.start()
+# Every request reads one dataset version from start to finish, even when a reload publishes a new one
+app.before_request(cache.pin)
+app.teardown_request(cache.unpin)
+# Memory-mapped mode: re-map the shared store when another worker has rewritten it
+app.before_request(refresh_shared_data)
+# Requests arriving while the data loads wait for that one load, or get a 503 with Retry-After
+app.before_request(require_data)
 
 app.add_url_rule('/health', 'health', health, methods=['GET'])
 app.add_url_rule('/api/overview', 'get_overview', get_overview, methods=['GET'])
@@ -106,6 +104,7 @@ app.add_url_rule('/api/findings/time-series', 'time_series_analysis', time_serie
 app.add_url_rule('/api/findings/chi-square', 'chi_square_analysis', chi_square_analysis, methods=['GET'])
 app.add_url_rule('/api/findings/outcome-percentages', 'outcome_percentages', outcome_percentages, methods=['GET'])
 app.add_url_rule('/api/findings/countries', 'countries_chart', countries_chart, methods=['GET'])
+app.add_url_rule('/api/findings/all', 'get_all_findings_data', get_all_findings_data, methods=['GET'])
 app.add_url_rule('/api/meta/options', 'meta_options', meta_options, methods=['GET'])
 app.add_url_rule('/api/data-status', 'data_status', data_status, methods=['GET'])
 app.add_url_rule('/api/force-reload-data', 'force_reload_data', force_reload_data, methods=['POST'])
@@ -0,0 +1,213 @@
+"""
+Chunked CSV ingestion of the raw data files
+Each table is read as described by its RAW_TABLE_SPECS entry in chunks of
+INGEST_CHUNK_ROWS rows, projected to the needed columns and converted (dates,
+categoricals) chunk by chunk. Chunks are kept as per-column pieces and
+assembled one column at a time, so peak memory stays close to the size of the
+final table instead of text buffers + parsed frame + conversions at once.
+Independent tables can be parsed concurrently in a process pool; workers hand
+their table back as an Arrow file that the parent memory-maps.
+"""
+import multiprocessing
+import os
+import pickle
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Local imports
+from .config import INGEST_CHUNK_ROWS, INGEST_MIN_CHUNK_ROWS, INGEST_MEMORY_LIMIT_MB
+
+# pyarrow is optional: without it tables are always read serially
+try:
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Pool workers are never forked from the serving process: it runs request and reload
+# threads, and a fork can inherit locks those threads hold at that moment
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Peak resident set size in MB (since the last reset_peak_rss when supported)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def reset_peak_rss():
+    """Reset the kernel's RSS high-water mark so the next peak is per table (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def _read_arguments(spec, columns):
+    """read_csv arguments of a spec projected to columns (None = every column)"""
+    arguments = dict(spec.get('read_csv', {}))
+    if columns is not None:
+        columns = list(columns)
+        arguments['usecols'] = lambda col: col in columns
+        if 'parse_dates' in arguments:
+            arguments['parse_dates'] = [col for col in arguments['parse_dates'] if col in columns]
+    return arguments
+
+def _convert_chunk(chunk, spec):
+    """Conversions applied to every chunk after parsing"""
+    if not chunk.empty:
+        for col in spec.get('coerce_dates', []):
+            if col in chunk.columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors="coerce")
+    return chunk
+
+def _combine(pieces):
+    """One column from its per-chunk pieces; categoricals get the union of the chunk categories"""
+    if len(pieces) == 1:
+        return pieces[0].reset_index(drop=True)
+    if all(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+        return pd.Series(union_categoricals(pieces, sort_categories=True), name=pieces[0].name)
+    return pd.concat(pieces, ignore_index=True)
+
+def read_table(path, spec, columns=None, chunk_rows=None, memory_limit_mb=None):
+    """
+    Read one raw table following its spec, returning (DataFrame, report).
+    columns projects the read (usecols) to the columns consumers need.
+    chunk_rows=0 reads the file in one go. When the process RSS exceeds
+    memory_limit_mb the chunk size is halved (down to INGEST_MIN_CHUNK_ROWS).
+    The report holds rows, chunks, the final chunk size and peak RSS in MB.
+    """
+    chunk_rows = INGEST_CHUNK_ROWS if chunk_rows is None else chunk_rows
+    memory_limit_mb = INGEST_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+    arguments = _read_arguments(spec, columns)
+    reset_peak_rss()
+    peak = current_rss_mb()
+
+    if not chunk_rows:
+        df = _convert_chunk(pd.read_csv(path, **arguments), spec)
+        peak = max(peak, current_rss_mb(), peak_rss_mb())
+        return df, {'rows': len(df), 'chunks': 1, 'chunk_rows': len(df), 'peak_rss_mb': round(peak, 1)}
+
+    pieces = {}
+    chunks = 0
+    with pd.read_csv(path, iterator=True, **arguments) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(chunk_rows)
+            except StopIteration:
+                break
+            chunk = _convert_chunk(chunk, spec)
+            for col in chunk.columns:
+                pieces.setdefault(col, []).append(chunk[col])
+            chunks += 1
+            del chunk
+
+            rss = current_rss_mb()
+            peak = max(peak, rss)
+            if memory_limit_mb and rss > memory_limit_mb and chunk_rows > INGEST_MIN_CHUNK_ROWS:
+                chunk_rows = max(INGEST_MIN_CHUNK_ROWS, chunk_rows // 2)
+                print(f"   ⚠️ RSS {rss:.0f} MB above {memory_limit_mb} MB, reading {chunk_rows:,} rows per chunk")
+
+    if not pieces:
+        # Header-only file: keep the columns and dtypes
+        df = _convert_chunk(pd.read_csv(path, nrows=0, **arguments), spec)
+    else:
+        # Assemble column by column, releasing each column's pieces as soon as it is built
+        columns_out = {}
+        for col in list(pieces):
+            columns_out[col] = _combine(pieces.pop(col))
+        df = pd.DataFrame(columns_out, copy=False)
+        del columns_out
+    peak = max(peak, current_rss_mb(), peak_rss_mb())
+    return df, {'rows': len(df), 'chunks': chunks, 'chunk_rows': chunk_rows, 'peak_rss_mb': round(peak, 1)}
+
+def _read_table_to_file(key, path, spec, columns, out_dir):
+    """
+    Process-pool worker: read one table and write it to out_dir, returning
+    (file, format, report). Tables go out as uncompressed Arrow; columns
+    Arrow cannot represent (mixed-type objects) fall back to a pickle file.
+    """
+    df, report = read_table(path, spec, columns=columns)
+    out_path = os.path.join(out_dir, f"{key}.arrow")
+    try:
+        feather.write_feather(df, out_path, compression='uncompressed')
+        return out_path, 'arrow', report
+    except Exception:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    out_path = os.path.join(out_dir, f"{key}.pkl")
+    with open(out_path, 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return out_path, 'pickle', report
+
+def _read_result_file(out_path, fmt):
+    """Load a table written by _read_table_to_file and delete its file"""
+    try:
+        if fmt == 'arrow':
+            return feather.read_table(out_path, memory_map=True).to_pandas()
+        with open(out_path, 'rb') as f:
+            return pickle.load(f)
+    finally:
+        os.remove(out_path)
+
+def read_tables_parallel(jobs, workers, out_dir):
+    """
+    Read several tables concurrently in a pool of worker processes.
+    jobs maps a cache key to (path, spec, columns). Workers write their table
+    to out_dir instead of pickling it back, and the parent maps the file, so
+    no frame crosses the process boundary. Workers start from a fork server
+    (spawned where unavailable), not a fork of this process, so they re-import
+    the entry script: it must not load data at import (see index.py).
+    Yields (key, df, report) in completion order.
+    """
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs))),
+                             mp_context=multiprocessing.get_context(_START_METHOD)) as pool:
+        futures = {
+            pool.submit(_read_table_to_file, key, path, spec, columns, out_dir): key
+            for key, (path, spec, columns) in jobs.items()
+        }
+        for future in as_completed(futures):
+            out_path, fmt, report = future.result()
+            yield futures[future], _read_result_file(out_path, fmt), report
+
+def benchmark(jobs, workers, out_dir):
+    """
+    Time serial against parallel ingestion of the same tables.
+    Returns seconds for each mode, the worker count and the speedup.
+    """
+    start = time.perf_counter()
+    for path, spec, columns in jobs.values():
+        read_table(path, spec, columns=columns)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in read_tables_parallel(jobs, workers, out_dir):
+        pass
+    parallel = time.perf_counter() - start
+
+    return {
+        'tables': len(jobs),
+        'workers': workers,
+        'serial_s': round(serial, 2),
+        'parallel_s': round(parallel, 2),
+        'speedup': round(serial / parallel, 2) if parallel else None,
+    }
@@ -0,0 +1,166 @@
+"""
+Memory-mapped column store shared by all gunicorn workers
+Each table is written once as one .npy file per column buffer; every worker
+maps the same files copy-on-write, so the page cache holds a single physical
+copy of the data no matter how many processes serve requests. Every complete
+write stamps a new generation, which tells workers their mapping is stale.
+"""
+import fcntl
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .config import MMAP_DIR, get_cache_dir
+
+META_FILE = 'meta.pkl'
+GENERATION_FILE = 'generation'
+
+def get_store_dir():
+    """Get the memory-mapped store directory path"""
+    store_dir = os.path.join(get_cache_dir(), MMAP_DIR)
+    os.makedirs(store_dir, exist_ok=True)
+    return store_dir
+
+@contextmanager
+def store_lock(exclusive=False):
+    """
+    Cross-process lock on the store: writers take it exclusively, readers
+    shared, so no worker maps a table while another one is rewriting it
+    """
+    with open(os.path.join(get_store_dir(), '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def has_tables(keys):
+    """Check that every table in keys has been written to the store"""
+    store_dir = get_store_dir()
+    return all(os.path.exists(os.path.join(store_dir, key, META_FILE)) for key in keys)
+
+def read_generation():
+    """Stamp of the last complete write of the store ('' before the first one)"""
+    try:
+        with open(os.path.join(get_store_dir(), GENERATION_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ''
+
+def bump_generation():
+    """Stamp a complete write of the store (the caller holds the exclusive lock) and return the new stamp"""
+    generation = f"{time.time_ns()}-{os.getpid()}"
+    path = os.path.join(get_store_dir(), GENERATION_FILE)
+    with open(f"{path}.tmp{os.getpid()}", 'w') as f:
+        f.write(generation)
+    os.replace(f"{path}.tmp{os.getpid()}", path)
+    return generation
+
+def invalidate():
+    """Remove every stored table (workers that already mapped them keep their view)"""
+    store_dir = get_store_dir()
+    with store_lock(exclusive=True):
+        for name in os.listdir(store_dir):
+            path = os.path.join(store_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+def _column_buffers(series):
+    """Split a column into plain numpy buffers and the metadata needed to rebuild it"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'codes': series.cat.codes.to_numpy()}, {
+            'kind': 'categorical', 'categories': dtype.categories, 'ordered': dtype.ordered
+        }
+    if isinstance(dtype, pd.core.arrays.masked.BaseMaskedDtype):
+        values = series.array
+        return {'data': values._data, 'mask': values._mask}, {'kind': 'masked', 'dtype': str(dtype)}
+    if pd.api.types.is_datetime64_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        return {'data': series.to_numpy().view('i8')}, {'kind': 'datetime', 'dtype': str(dtype)}
+    if dtype == object:
+        # Strings are dictionary-encoded; only the codes are shared between workers
+        codes, uniques = pd.factorize(series)
+        return {'codes': codes.astype(np.int32)}, {'kind': 'object', 'categories': uniques}
+    return {'data': series.to_numpy()}, {'kind': 'numpy'}
+
+def write_table(key, df):
+    """Write a DataFrame to the store, replacing any previous version of the table"""
+    store_dir = get_store_dir()
+    tmp_dir = os.path.join(store_dir, f".{key}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    meta = {'columns': [], 'index': None}
+    for position, (name, series) in enumerate(df.items()):
+        buffers, column_meta = _column_buffers(series)
+        column_meta['name'] = name
+        column_meta['buffers'] = {}
+        for part, array in buffers.items():
+            filename = f"{position}.{part}.npy"
+            np.save(os.path.join(tmp_dir, filename), np.ascontiguousarray(array))
+            column_meta['buffers'][part] = filename
+        meta['columns'].append(column_meta)
+
+    if isinstance(df.index, pd.RangeIndex):
+        meta['range_index'] = (df.index.start, df.index.stop, df.index.step, df.index.name)
+    elif df.index.dtype == object:
+        meta['index'] = {'values': df.index}
+    else:
+        np.save(os.path.join(tmp_dir, 'index.npy'), df.index.to_numpy())
+        meta['index'] = {'file': 'index.npy', 'name': df.index.name}
+
+    with open(os.path.join(tmp_dir, META_FILE), 'wb') as f:
+        pickle.dump(meta, f)
+
+    table_dir = os.path.join(store_dir, key)
+    shutil.rmtree(table_dir, ignore_errors=True)
+    os.replace(tmp_dir, table_dir)
+
+def _map_column(table_dir, column_meta):
+    """Rebuild one column on top of memory-mapped buffers"""
+    buffers = {
+        part: np.load(os.path.join(table_dir, filename), mmap_mode='c')
+        for part, filename in column_meta['buffers'].items()
+    }
+    kind = column_meta['kind']
+    if kind == 'categorical':
+        return pd.Categorical.from_codes(
+            buffers['codes'], categories=column_meta['categories'], ordered=column_meta['ordered']
+        )
+    if kind == 'masked':
+        array_type = pd.api.types.pandas_dtype(column_meta['dtype']).construct_array_type()
+        return array_type(buffers['data'], buffers['mask'])
+    if kind == 'datetime':
+        return buffers['data'].view(column_meta['dtype'])
+    if kind == 'object':
+        # Object columns need real Python objects, so only pointers are materialized
+        labels = np.append(np.asarray(column_meta['categories'], dtype=object), np.nan)
+        return labels[buffers['codes']]
+    return buffers['data']
+
+def map_table(key):
+    """Map a stored table as a DataFrame whose columns share the page cache"""
+    table_dir = os.path.join(get_store_dir(), key)
+    with open(os.path.join(table_dir, META_FILE), 'rb') as f:
+        meta = pickle.load(f)
+
+    columns = {}
+    for column_meta in meta['columns']:
+        columns[column_meta['name']] = _map_column(table_dir, column_meta)
+
+    if meta['index'] is not None and 'values' in meta['index']:
+        index = meta['index']['values']
+    elif meta['index'] is not None:
+        index_values = np.load(os.path.join(table_dir, meta['index']['file']), mmap_mode='c')
+        index = pd.Index(index_values, name=meta['index']['name'], copy=False)
+    else:
+        start, stop, step, name = meta['range_index']
+        index = pd.RangeIndex(start, stop, step, name=name)
+
+    return pd.DataFrame(columns, index=index, copy=False)
@@ -1,76 +1,237 @@
 """
 Data models and cache management for the juvenile immigration API
 """
+import threading
+
 import pandas as pd
 
+# Local imports
+from .config import MEMORY_BUDGET_MB, RESIDENCY_POLICY
+from .snapshot import spill_table
+
+def _empty_data():
+    """Entries of a dataset version before anything is loaded"""
+    return {
+        'juvenile_cases': None,
+        'proceedings': None,
+        'reps_assigned': None,
+        'lookup_decisions': None,
+        'lookup_juvenile': None,
+        'analysis_filtered': None,
+        'proceedings_with_decisions': None,
+        'merged_data': None,
+        'aggregates': None,
+        'quarter_index': None,
+        'rep_summary': None,
+        'overview': None,
+        'data_loaded': False
+    }
+
+class DatasetVersion:
+    """
+    One generation of cached data with its pending lazy loaders.
+    A published version is only extended in place (lazy loads, derived caches
+    such as the aggregate cube); replacing data means publishing a new version.
+    """
+    __slots__ = ('number', 'data', 'loaders')
+
+    def __init__(self, number, data, loaders=None):
+        self.number = number
+        self.data = data
+        self.loaders = loaders if loaders is not None else {}
+
 class DataCache:
-    """Singleton class to manage data cache"""
+    """
+    Singleton class to manage data cache
+    The data lives in a DatasetVersion that publish() replaces by swapping one
+    reference. Each request pins the version it started with (pin/unpin), so
+    a reload never changes data under a running request, and an old version
+    is freed once the last request holding it has finished.
+    """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DataCache, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
-    
+
     def __init__(self):
         if self._initialized:
             return
-        
-        self._data = {
-            'juvenile_cases': None,
-            'proceedings': None,
-            'reps_assigned': None, 
-            'lookup_decisions': None,
-            'lookup_juvenile': None,
-            'analysis_filtered': None,
-            'merged_data': None,
-            'data_loaded': False
-        }
+
+        self._current = DatasetVersion(0, _empty_data())
+        self._pinned = threading.local()
+        self._lock = threading.RLock()
+        # (version number, {key: bytes}) of the last deep memory measurement
+        self._measured = None
         self._initialized = True
-    
+
+    def _active(self):
+        """Version pinned by this thread, else the current one"""
+        return getattr(self._pinned, 'version', None) or self._current
+
+    def pin(self):
+        """Read the current version from this thread until unpin() (done per request)"""
+        self._pinned.version = self._current
+
+    def unpin(self, *args):
+        """Release the version pinned by this thread (usable as a teardown handler)"""
+        self._pinned.version = None
+
+    def repin(self):
+        """Move this thread's pin, if any, to the current version"""
+        if getattr(self._pinned, 'version', None) is not None:
+            self._pinned.version = self._current
+
     def get(self, key):
-        """Get data from cache"""
-        return self._data.get(key)
-    
+        """Get data from cache (running its lazy loader on first access)"""
+        active = self._active()
+        value = active.data.get(key)
+        if value is None and key in active.loaders:
+            return self._load(active, key)
+        return value
+
+    def peek(self, key):
+        """Get data from cache without triggering a lazy load"""
+        return self._active().data.get(key)
+
     def set(self, key, value):
-        """Set data in cache"""
-        self._data[key] = value
-    
+        """Set data in cache (under the lock, so a lazy load of the same key never overwrites it)"""
+        with self._lock:
+            active = self._active()
+            active.loaders.pop(key, None)
+            active.data[key] = value
+            self._measured = None
+
+    def set_loader(self, key, loader):
+        """Register a function producing the data of key when it is first read"""
+        with self._lock:
+            active = self._active()
+            active.data[key] = None
+            active.loaders[key] = loader
+
+    def _load(self, version, key):
+        """Run the lazy loader of key once, even when several threads ask at the same time"""
+        with self._lock:
+            loader = version.loaders.get(key)
+            if loader is None:
+                return version.data.get(key)
+            if hasattr(loader, 'residency'):
+                print(f"♻️ Reloading {key} ({loader.residency})...")
+            else:
+                print(f"💤 Loading {key} on first access...")
+            value = loader()
+            version.data[key] = value
+            del version.loaders[key]
+            self._measured = None
+            return value
+
+    def memory_usage(self):
+        """Deep memory usage in bytes of every resident DataFrame"""
+        return {
+            key: int(data.memory_usage(deep=True).sum())
+            for key, data in self._active().data.items()
+            if isinstance(data, pd.DataFrame)
+        }
+
+    def resident_memory(self):
+        """
+        memory_usage() of the version in use as last measured: recorded by
+        enforce_budget and measured again only once the resident tables change
+        """
+        with self._lock:
+            active = self._active()
+            measured = self._measured
+            if measured is None or measured[0] != active.number:
+                measured = self._measured = (active.number, self.memory_usage())
+            return dict(measured[1])
+
+    def enforce_budget(self, rebuilders, budget_mb=None):
+        """
+        Evict the tables of rebuilders ({key: function recomputing it}),
+        largest first, while the resident tables use more than budget_mb
+        (MEMORY_BUDGET_MB by default). Evicted tables are spilled to disk or
+        dropped following RESIDENCY_POLICY and come back on their next get().
+        Returns the evicted keys.
+        """
+        budget = (MEMORY_BUDGET_MB if budget_mb is None else budget_mb) * 1024 * 1024
+        with self._lock:
+            active = self._active()
+            usage = self.memory_usage()
+            total = sum(usage.values())
+            evicted = []
+            for key in sorted((key for key in rebuilders if key in usage), key=usage.get, reverse=True):
+                if total <= budget:
+                    break
+                active.loaders[key] = self._evicted_loader(active, key, rebuilders[key])
+                active.data[key] = None
+                total -= usage[key]
+                evicted.append(key)
+                print(f"🧊 {key} {active.loaders[key].residency} ({usage[key] / 1024 / 1024:.1f} MB)")
+            self._measured = (active.number, {key: size for key, size in usage.items() if key not in evicted})
+            return evicted
+
+    def _evicted_loader(self, version, key, rebuild):
+        """Loader bringing an evicted table back: from its spill file, else by recomputing it"""
+        read_back = None
+        if RESIDENCY_POLICY == 'spill':
+            try:
+                read_back = spill_table(key, version.data[key], version.number)
+            except Exception as e:
+                print(f"⚠️ Could not spill {key} ({e}), dropping it instead")
+
+        def loader():
+            value = read_back() if read_back is not None else None
+            return value if value is not None else rebuild()
+        loader.residency = 'spilled' if read_back is not None else 'dropped'
+        return loader
+
+    def _swap(self, data, loaders):
+        """Make a new version current; the calling thread sees it right away"""
+        with self._lock:
+            self._current = DatasetVersion(self._current.number + 1, data, loaders)
+            self.repin()
+
+    def publish(self, tables):
+        """Publish a new version with several entries replaced, so readers see either all old or all new values"""
+        with self._lock:
+            current = self._current
+            loaders = {key: loader for key, loader in current.loaders.items() if key not in tables}
+            self._swap({**current.data, **tables}, loaders)
+
     def get_all(self):
         """Get all cached data"""
-        return self._data
-    
+        return self._active().data
+
     def clear(self):
         """Clear all cached data"""
-        self._data = {
-            'juvenile_cases': None,
-            'proceedings': None,
-            'reps_assigned': None, 
-            'lookup_decisions': None,
-            'lookup_juvenile': None,
-            'analysis_filtered': None,
-            'merged_data': None,
-            'data_loaded': False
-        }
-    
+        self._swap(_empty_data(), {})
+
     def is_loaded(self):
         """Check if data is loaded"""
-        return self._data.get('data_loaded', False)
-    
+        return self._active().data.get('data_loaded', False)
+
     def set_loaded(self, status=True):
         """Set data loaded status"""
-        self._data['data_loaded'] = status
-    
+        self.publish({'data_loaded': status})
+
+    def version(self):
+        """Number of the version in use, bumped whenever data is loaded, published or cleared"""
+        return self._active().number
+
     def get_stats(self):
         """Get basic statistics about cached data"""
+        active = self._active()
         stats = {}
-        for key, data in self._data.items():
+        for key, data in active.data.items():
             if key != 'data_loaded' and data is not None:
                 if isinstance(data, pd.DataFrame):
                     stats[key] = len(data)
                 else:
                     stats[key] = "loaded"
+        for key, loader in active.loaders.items():
+            stats[key] = getattr(loader, 'residency', "lazy")
         return stats
 
 # Global cache instance
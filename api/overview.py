@@ -0,0 +1,99 @@
+"""
+Materialized /api/overview payload
+The overview only depends on the loaded cases and reps and on the current
+day (historical trends, ages), so it is computed once when data loads and
+kept in the cache until a reload publishes new tables or the day changes.
+Requests are served from memory with an ETag, so clients revalidating an
+unchanged overview get a 304.
+"""
+import hashlib
+import json
+import threading
+
+import pandas as pd
+
+# Local imports
+from .models import cache
+from .data_processor import get_data_statistics
+
+_build_lock = threading.Lock()
+
+class OverviewView:
+    """Overview payload of one day, with the statistics it was built from and its ETag"""
+
+    def __init__(self, day, stats, payload):
+        self.day = day
+        self.stats = stats
+        self.payload = payload
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+        self.etag = hashlib.sha1(body).hexdigest()
+
+    def is_stale(self):
+        """Trends and ages are relative to the build day"""
+        return self.day != pd.Timestamp.now().normalize()
+
+def monthly_trends(juvenile_cases, current_date):
+    """Cases per month of the last 12 months with a historical LATEST_HEARING"""
+    if juvenile_cases is None or 'LATEST_HEARING' not in juvenile_cases.columns:
+        return {}
+    try:
+        # Filter only historical data (not future scheduled hearings)
+        hearings = juvenile_cases['LATEST_HEARING']
+        historical = hearings[hearings.notna() & (hearings <= current_date)]
+        if len(historical) == 0:
+            return {"monthly_cases": {}}
+        monthly_counts = historical.groupby(historical.dt.to_period('M')).size()
+        return {
+            "monthly_cases": {
+                str(month): count for month, count in monthly_counts.tail(12).items()
+            }
+        }
+    except Exception as e:
+        print(f"Error calculating trends: {str(e)}")
+        return {"monthly_cases": {}}
+
+def build_overview(juvenile_cases, reps_assigned, rep_summary=None):
+    """Overview of the given tables as of today (None when the statistics cannot be computed)"""
+    current_date = pd.Timestamp.now()
+    stats = get_data_statistics(juvenile_cases, reps_assigned, rep_summary)
+    if stats is None:
+        return None
+
+    # Structure the response to match frontend expectations
+    payload = {
+        "total_cases": stats['total_cases'],
+        "average_age": stats.get('average_age'),
+        "representation_rate": stats.get('representation_rate', 0),
+        "top_nationalities": stats['nationalities'],
+        "demographic_breakdown": {
+            "by_gender": stats['gender'],
+            "by_custody": stats['custody'],
+            "by_case_type": stats['case_types']
+        },
+        "representation_breakdown": stats.get('attorney_types', {}),
+        "language_breakdown": stats['languages'],
+        "trends": monthly_trends(juvenile_cases, current_date)
+    }
+    return OverviewView(current_date.normalize(), stats, payload)
+
+def materialize_overview():
+    """Build the overview of the cached tables and store it in the cache"""
+    juvenile_cases = cache.get('juvenile_cases')
+    if not cache.is_loaded() or juvenile_cases is None:
+        return None
+    view = build_overview(juvenile_cases, cache.get('reps_assigned'))
+    if view is not None:
+        cache.set('overview', view)
+        print(f"📋 Materialized overview ({view.etag[:8]})")
+    return view
+
+def get_overview_view():
+    """Cached overview, built on first use after loading and rebuilt on a day change"""
+    view = cache.get('overview')
+    if view is not None and not view.is_stale():
+        return view
+    with _build_lock:
+        view = cache.get('overview')
+        if view is None or view.is_stale():
+            view = materialize_overview()
+    return view
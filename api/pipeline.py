@@ -0,0 +1,193 @@
+"""
+Incremental rebuild of the cached datasets
+Raw tables are tracked by the content hash of their file and derived
+artifacts by the stage graph below, so a reload re-reads only the raw files
+that changed and recomputes only the stages downstream of them. Everything
+is built off to the side and published in one step: requests keep being
+served from the previous data until the new version is complete.
+"""
+import gc
+import threading
+import time
+import traceback
+from datetime import datetime
+
+import pandas as pd
+
+# Local imports
+from .config import RAW_TABLE_SPECS, LAZY_TABLES, FILTERED_TABLES, DATA_MMAP, INTERMEDIATE_TABLES
+from .models import cache
+from .response_cache import response_cache
+from .filters import prepare_filter_columns
+from .aggregates import AggregateCube
+from .quarter_index import QuarterIndex
+from .rep_summary import RepresentationSummary
+from .overview import build_overview
+from .compaction import compact_tables
+from .data_processor import build_proceedings_with_decisions, build_merged_data, build_analysis_filtered
+from . import data_loader
+
+# Derived artifacts in dependency order: key -> (builder, input keys).
+# Inputs are raw tables (RAW_TABLE_SPECS keys) or earlier stages.
+STAGES = {
+    'proceedings_with_decisions': (build_proceedings_with_decisions, ('proceedings', 'lookup_decisions')),
+    'merged_data': (build_merged_data, ('juvenile_cases', 'proceedings_with_decisions', 'reps_assigned')),
+    'analysis_filtered': (build_analysis_filtered, ('merged_data',)),
+    'aggregates': (AggregateCube.from_frame, ('analysis_filtered',)),
+    'quarter_index': (QuarterIndex.from_frame, ('analysis_filtered',)),
+    'rep_summary': (RepresentationSummary.from_frame, ('reps_assigned',)),
+    'overview': (build_overview, ('juvenile_cases', 'reps_assigned', 'rep_summary')),
+}
+
+def _stage_rebuilder(key):
+    """Function recomputing a stage from the cached values of its inputs"""
+    builder, inputs = STAGES[key]
+    return lambda: builder(*[cache.get(name) for name in inputs])
+
+def release_intermediates():
+    """Spill or drop the intermediate stages the cached tables have no budget for"""
+    return cache.enforce_budget({key: _stage_rebuilder(key) for key in INTERMEDIATE_TABLES})
+
+def changed_sources(previous, current):
+    """Raw tables whose file hash differs from the one the cached data was built from"""
+    return [key for key in RAW_TABLE_SPECS if previous.get(key) != current.get(key)]
+
+def dirty_keys(changed):
+    """Changed raw tables plus every stage downstream of them"""
+    dirty = set(changed)
+    for stage, (_, inputs) in STAGES.items():
+        if any(key in dirty for key in inputs):
+            dirty.add(stage)
+    return dirty
+
+class _Build:
+    """Tables of one rebuild, resolved from the cache unless dirty or missing"""
+
+    def __init__(self, dirty, cache_dir):
+        self.dirty = dirty
+        self.cache_dir = cache_dir
+        self.tables = {}
+
+    def resolve(self, key):
+        """Current value of key, (re)computing or re-reading it when needed"""
+        if key in self.tables:
+            return self.tables[key]
+        if key not in self.dirty:
+            value = cache.get(key)
+            if value is not None:
+                return value
+        if key in STAGES:
+            builder, inputs = STAGES[key]
+            values = [self.resolve(name) for name in inputs]
+            print(f"🔁 Recomputing {key}...")
+            started = time.perf_counter()
+            value = builder(*values)
+            print(f"   ✅ {key} ready in {time.perf_counter() - started:.2f}s")
+        else:
+            value = data_loader.load_raw_table(key, self.cache_dir)
+            if value is None:
+                value = pd.DataFrame()
+            if key in FILTERED_TABLES:
+                prepare_filter_columns(value)
+        self.tables[key] = value
+        return value
+
+def rebuild():
+    """
+    Bring the cached data up to date with the raw files in the cache directory.
+    Returns the list of keys that were rebuilt, or None when the rebuild failed
+    (the previous data then stays in place).
+    """
+    try:
+        cache_dir = data_loader.get_cache_dir()
+        current = data_loader.raw_file_hashes(cache_dir)
+        previous = data_loader.read_source_hashes() if cache.is_loaded() else {}
+        changed = changed_sources(previous, current)
+        if not changed:
+            print("✅ Raw files unchanged, keeping the loaded data")
+            return []
+        print(f"🔎 Changed raw tables: {', '.join(changed)}")
+
+        build = _Build(dirty_keys(changed), cache_dir)
+        for key in list(RAW_TABLE_SPECS) + list(STAGES):
+            if key in build.dirty and key not in LAZY_TABLES:
+                build.resolve(key)
+
+        compact_tables(build.tables)
+
+        # Swap the new tables in at once; changed lazy tables are re-read on next access
+        cache.publish({**build.tables, 'data_loaded': True})
+        for key in LAZY_TABLES:
+            if key in changed:
+                cache.set_loader(key, data_loader.lazy_raw_table(key, cache_dir))
+        data_loader.save_to_cache()
+        data_loader.write_source_hashes(current)
+        if DATA_MMAP:
+            _republish_shared_tables()
+        release_intermediates()
+
+        rebuilt = sorted(build.tables)
+        del build
+        gc.collect()
+        print(f"🚀 Rebuilt {', '.join(rebuilt)}")
+        return rebuilt
+
+    except Exception as e:
+        print(f"❌ Incremental rebuild failed, keeping the previous data: {e}")
+        traceback.print_exc()
+        return None
+
+def _republish_shared_tables():
+    """
+    Memory-mapped mode: rewrite the shared store and serve its tables mapped
+    again; the derived tables just built stay published. The other workers
+    re-map on their next request (see data_loader.remap_shared_tables).
+    """
+    data_loader.write_shared_tables()
+    cache.publish(data_loader.map_shared_tables())
+
+# State of the background reload started by start_reload
+_reload_lock = threading.Lock()
+_reload_status = {'state': 'idle', 'started_at': None, 'finished_at': None, 'rebuilt': None, 'error': None}
+
+def reload_status():
+    """State of the last background reload, for the status endpoints"""
+    with _reload_lock:
+        return dict(_reload_status)
+
+def _run_reload(fetch):
+    """Background reload: fetch the raw files, rebuild, and publish the new version"""
+    rebuilt, error = None, None
+    try:
+        if fetch is not None and not fetch():
+            error = "Failed to download raw data files"
+        else:
+            rebuilt = rebuild()
+            if rebuilt is None:
+                error = "Rebuild failed, previous data kept"
+            else:
+                response_cache.clear()
+    except Exception as e:
+        error = str(e)
+    with _reload_lock:
+        _reload_status.update({
+            'state': 'failed' if error else 'done',
+            'finished_at': datetime.now().isoformat(),
+            'rebuilt': rebuilt,
+            'error': error,
+        })
+
+def start_reload(fetch=None):
+    """
+    Start a reload in a background thread (fetch, when given, first refreshes
+    the raw files and returns success). Returns False when one is already running.
+    """
+    with _reload_lock:
+        if _reload_status['state'] == 'running':
+            return False
+        _reload_status.update({
+            'state': 'running', 'started_at': datetime.now().isoformat(),
+            'finished_at': None, 'rebuilt': None, 'error': None,
+        })
+    threading.Thread(target=_run_reload, args=(fetch,), daemon=True).start()
+    return True
@@ -0,0 +1,239 @@
+"""
+Quarter-bucket index of the representation time series.
+Holds, for every filter slice (time period x representation x case type),
+the per-quarter counts of historical analysis rows as dense NumPy arrays, so
+the time series chart is one array lookup. Rows dated after the index's
+as-of time are kept aside sorted by date; when the day changes, the rows that
+became historical are added to the counts instead of rebuilding the index.
+A reload builds a new index from the new analysis rows (published indexes
+only ever roll forward).
+
+Counts per quarter (the KINDS axis):
+    rows        - every historical row (decides which quarters are shown)
+    total       - rows with a non-missing HAS_LEGAL_REP
+    represented - rows with HAS_LEGAL_REP == "Has Legal Representation"
+"""
+from __future__ import annotations
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .models import cache
+from .filters import (
+    TIME_PERIODS, REP_CODES, CASE_TYPE_KEY_COLUMN, compile_filters, _pick_date_col, _representation_codes,
+)
+from .aggregates import _time_period_keys
+
+KINDS: List[str] = ["rows", "total", "represented"]
+
+# Time period slots: every TIME_PERIODS key, then rows outside all of them
+PERIOD_SLOTS: List[Optional[str]] = [key for key, bounds in TIME_PERIODS.items() if bounds is not None] + [None]
+# Representation slots: REP_CODES value + 1
+REP_SLOTS = len(REP_CODES)
+
+_build_lock = threading.Lock()
+
+class _Rows:
+    """Encoded analysis rows: date, slot of every filter axis, quarter ordinal and kind flags"""
+
+    def __init__(self, dates, periods, reps, case_types, quarters, total, represented):
+        self.dates = dates
+        self.periods = periods
+        self.reps = reps
+        self.case_types = case_types
+        self.quarters = quarters
+        self.total = total
+        self.represented = represented
+
+    def take(self, positions) -> "_Rows":
+        return _Rows(*(values[positions] for values in self.__dict__.values()))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+class QuarterIndex:
+    """Per-quarter counts of historical analysis rows for every filter slice"""
+
+    def __init__(self, has_case_types: bool, as_of: pd.Timestamp):
+        self.has_case_types = has_case_types
+        self.as_of = as_of
+        self._lock = threading.Lock()
+        # Published together so readers never see counts and labels of different updates:
+        # (counts [period, rep, case type, kind, quarter], the same with a trailing "all"
+        # slot on each filter axis, first quarter ordinal, case type slots)
+        counts = np.zeros((len(PERIOD_SLOTS), REP_SLOTS, 1, len(KINDS), 0), dtype=np.int64)
+        self._state = (counts, self._with_all_slots(counts), 0, {})
+        self._pending = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> "QuarterIndex":
+        has_case_types = CASE_TYPE_KEY_COLUMN in df.columns or "CASE_TYPE" in df.columns
+        index = cls(has_case_types, as_of if as_of is not None else pd.Timestamp.now())
+        if not df.empty:
+            index._count(df)
+        return index
+
+    def _encode(self, df: pd.DataFrame, case_type_slots: Dict) -> _Rows:
+        """Encode the rows of df (case_type_slots is extended with new case types)"""
+        date_col = _pick_date_col(df)
+        if date_col is not None:
+            dates = pd.to_datetime(df[date_col], errors="coerce")
+        else:
+            dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+
+        period_codes, period_labels = pd.factorize(_time_period_keys(dates))
+        period_slots = np.array([PERIOD_SLOTS.index(label) for label in period_labels] + [len(PERIOD_SLOTS) - 1])
+
+        if self.has_case_types:
+            if CASE_TYPE_KEY_COLUMN in df.columns:
+                keys = df[CASE_TYPE_KEY_COLUMN]
+            else:
+                keys = df["CASE_TYPE"].astype(str).str.strip().str.lower()
+            case_codes, case_labels = pd.factorize(keys)
+            slots = [case_type_slots.setdefault(label, len(case_type_slots)) for label in case_labels]
+            case_types = np.array(slots + [case_type_slots.setdefault(None, len(case_type_slots))])[case_codes]
+        else:
+            case_types = np.zeros(len(df), dtype=np.int64)
+
+        labels = df["HAS_LEGAL_REP"]
+        reps = _representation_codes(pd.DataFrame({"HAS_LEGAL_REP": labels})).astype(np.int64) + 1
+        return _Rows(
+            dates=dates.to_numpy(dtype="datetime64[ns]"),
+            periods=period_slots[period_codes],
+            reps=reps,
+            case_types=case_types,
+            quarters=dates.dt.to_period("Q").array.asi8,
+            total=labels.notna().to_numpy(),
+            represented=(labels == "Has Legal Representation").to_numpy(),
+        )
+
+    @staticmethod
+    def _with_all_slots(counts: np.ndarray) -> np.ndarray:
+        """counts with an extra trailing "all" slot on each filter axis"""
+        for axis in range(3):
+            counts = np.concatenate([counts, counts.sum(axis=axis, keepdims=True)], axis=axis)
+        return counts
+
+    def _add(self, rows: _Rows, case_type_slots: Dict) -> None:
+        """Add historical rows to the counts and publish the new state"""
+        counts, _, first, _ = self._state
+        dated = rows.quarters != pd.NaT.value
+        rows = rows.take(np.flatnonzero(dated))
+
+        # Widen the quarter axis to the quarters of the new rows
+        before, after = 0, 0
+        if len(rows):
+            low, high = int(rows.quarters.min()), int(rows.quarters.max())
+            if counts.shape[-1] == 0:
+                first, after = low, high - low + 1
+            else:
+                last = first + counts.shape[-1] - 1
+                before, after = max(0, first - low), max(0, high - last)
+                first = min(first, low)
+        grow = len(case_type_slots) - counts.shape[2] if self.has_case_types else 0
+        counts = np.pad(counts, [(0, 0), (0, 0), (0, grow), (0, 0), (before, after)])
+
+        if len(rows):
+            shape = counts.shape[:3] + (counts.shape[-1],)
+            flat = np.ravel_multi_index((rows.periods, rows.reps, rows.case_types, rows.quarters - first), shape)
+            size = int(np.prod(shape))
+            for kind, weights in enumerate((None, rows.total, rows.represented)):
+                selected = flat if weights is None else flat[weights]
+                counts[:, :, :, kind, :] += np.bincount(selected, minlength=size).reshape(shape)
+
+        self._state = (counts, self._with_all_slots(counts), first, dict(case_type_slots))
+
+    def _count(self, df: pd.DataFrame) -> None:
+        """
+        Count the analysis rows of a new index: rows dated up to as_of right
+        away, later ones kept aside until roll_forward reaches their date
+        """
+        case_type_slots = {}
+        rows = self._encode(df, case_type_slots)
+        as_of = np.datetime64(self.as_of.to_datetime64(), "ns")
+        future = rows.dates > as_of
+        self._add(rows.take(np.flatnonzero(~future)), case_type_slots)
+        later = rows.take(np.flatnonzero(future))
+        self._pending = later.take(np.argsort(later.dates, kind="stable"))
+
+    def roll_forward(self, as_of: Optional[pd.Timestamp] = None) -> int:
+        """Count the kept-aside rows dated up to as_of (now by default); returns how many were added"""
+        as_of = as_of if as_of is not None else pd.Timestamp.now()
+        with self._lock:
+            pending = self._pending
+            cut = 0
+            if pending is not None and len(pending):
+                cut = int(np.searchsorted(pending.dates, np.datetime64(as_of.to_datetime64(), "ns"), side="right"))
+            if cut:
+                self._add(pending.take(np.arange(cut)), dict(self._state[3]))
+                self._pending = pending.take(np.arange(cut, len(pending)))
+            self.as_of = as_of
+            return cut
+
+    @property
+    def quarters(self) -> int:
+        """Length of the quarter axis"""
+        return self._state[0].shape[-1]
+
+    def is_stale(self) -> bool:
+        """Historical means dated up to the as-of time, which moves forward once a day"""
+        return self.as_of.normalize() != pd.Timestamp.now().normalize()
+
+    def quarterly_representation(self, filters=None) -> pd.DataFrame:
+        """
+        Historical rows per quarter of the filter slice: total_cases (non-missing
+        HAS_LEGAL_REP) and represented_cases, indexed by quarter like a groupby
+        on the period column (quarters without rows in the slice are left out)
+        """
+        plan = compile_filters(filters)
+        _, slices, first, case_type_slots = self._state
+        all_slot = -1
+
+        period = all_slot if plan.time_period is None else PERIOD_SLOTS.index(plan.time_period)
+        rep = all_slot if plan.rep_code is None else plan.rep_code + 1
+        case_type = all_slot
+        if plan.case_type_key is not None and self.has_case_types:
+            case_type = case_type_slots.get(plan.case_type_key)
+
+        if case_type is None:
+            total = represented = np.zeros(0, dtype=np.int64)
+            quarters = np.zeros(0, dtype=np.int64)
+        else:
+            series = slices[period, rep, case_type]
+            keep = np.flatnonzero(series[KINDS.index("rows")] > 0)
+            total = series[KINDS.index("total")][keep]
+            represented = series[KINDS.index("represented")][keep]
+            quarters = keep + first
+
+        return pd.DataFrame({
+            "total_cases": total.astype(np.int64),
+            "represented_cases": represented.astype(np.int64),
+        }, index=pd.PeriodIndex.from_ordinals(quarters, freq="Q", name="YEAR_QUARTER"))
+
+def build_quarter_index(analysis_filtered: Optional[pd.DataFrame] = None) -> Optional[QuarterIndex]:
+    """Build the quarter index from analysis_filtered and store it in the cache"""
+    if analysis_filtered is None:
+        analysis_filtered = cache.get('analysis_filtered')
+    if analysis_filtered is None or analysis_filtered.empty:
+        return None
+    index = QuarterIndex.from_frame(analysis_filtered)
+    cache.set('quarter_index', index)
+    print(f"📅 Built quarter index over {index.quarters} quarters from {len(analysis_filtered):,} rows")
+    return index
+
+def get_quarter_index() -> Optional[QuarterIndex]:
+    """Cached quarter index, built on first use after loading from cache and rolled forward on a day change"""
+    index = cache.get('quarter_index')
+    if index is None:
+        with _build_lock:
+            index = cache.get('quarter_index')
+            if index is None:
+                index = build_quarter_index()
+    if index is not None and index.is_stale():
+        added = index.roll_forward()
+        if added:
+            print(f"📅 Quarter index rolled forward with {added:,} newly historical rows")
+    return index
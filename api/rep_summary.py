@@ -0,0 +1,137 @@
+"""
+Representation summary index of reps_assigned
+Holds the distinct IDNCASE keys of the reps table sorted as int64, the number
+of rows with a STRATTYLEVEL for each key, and the (key, STRATTYTYPE) row counts,
+so the representation statistics of any set of cases come from a binary search
+of their IDNCASEs instead of a cases x reps merge. The counts match the merge
+exactly: a case counts once per matching reps row, and NA keys match NA keys.
+"""
+from __future__ import annotations
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .models import cache
+from .joins import _key_values, _stable_sort
+
+# Key standing in for a missing IDNCASE
+NA_KEY = np.iinfo(np.int64).min
+
+_build_lock = threading.Lock()
+
+def _case_keys(values) -> Optional[np.ndarray]:
+    """IDNCASE values as int64 with missing ones set to NA_KEY, or None when not integer-typed"""
+    encoded = _key_values(values)
+    if encoded is None:
+        return None
+    keys, missing = encoded
+    if (keys[~missing] == NA_KEY).any():
+        return None
+    if missing.any():
+        keys = keys.copy()
+        keys[missing] = NA_KEY
+    return keys
+
+class RepresentationSummary:
+    """Represented rows and attorney type counts of every IDNCASE of the reps table"""
+
+    def __init__(self, keys, represented, pair_keys, pair_types, pair_counts, attorney_types):
+        self.keys = keys
+        self.represented = represented
+        self.pair_keys = pair_keys
+        self.pair_types = pair_types
+        self.pair_counts = pair_counts
+        self.attorney_types = attorney_types
+
+    @classmethod
+    def from_frame(cls, reps_assigned: pd.DataFrame) -> Optional["RepresentationSummary"]:
+        """
+        Summary of reps_assigned, or None when its IDNCASE is not integer-typed or
+        STRATTYTYPE is not categorical (value_counts order is then first appearance
+        in the merged frame, which only the merge itself reproduces)
+        """
+        if reps_assigned is None or not {'IDNCASE', 'STRATTYLEVEL', 'STRATTYTYPE'} <= set(reps_assigned.columns):
+            return None
+        attorney_types = reps_assigned['STRATTYTYPE']
+        if not isinstance(attorney_types.dtype, pd.CategoricalDtype):
+            return None
+        keys = _case_keys(reps_assigned['IDNCASE'])
+        if keys is None:
+            return None
+
+        sorted_keys, order = _stable_sort(keys)
+        boundaries = np.empty(len(sorted_keys), dtype=bool)
+        boundaries[:1] = True
+        boundaries[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        distinct = sorted_keys[boundaries]
+        slots = np.cumsum(boundaries) - 1
+
+        has_level = reps_assigned['STRATTYLEVEL'].notna().to_numpy()[order]
+        represented = np.bincount(slots[has_level], minlength=len(distinct))
+
+        categories = attorney_types.cat.categories
+        codes = attorney_types.cat.codes.to_numpy()[order].astype(np.int64)
+        typed = codes >= 0
+        pairs, pair_counts = np.unique(slots[typed] * max(len(categories), 1) + codes[typed], return_counts=True)
+        return cls(
+            keys=distinct,
+            represented=represented,
+            pair_keys=pairs // max(len(categories), 1),
+            pair_types=pairs % max(len(categories), 1),
+            pair_counts=pair_counts,
+            attorney_types=categories,
+        )
+
+    def case_counts(self, case_ids: pd.Series) -> Optional[Tuple[int, pd.Series]]:
+        """
+        For the cases with these IDNCASEs, the number of matching reps rows with a
+        STRATTYLEVEL and the STRATTYTYPE value_counts of the matching rows (None
+        when the IDNCASEs are not integer-typed)
+        """
+        keys = _case_keys(case_ids)
+        if keys is None:
+            return None
+        positions = np.searchsorted(self.keys, keys)
+        inside = positions < len(self.keys)
+        found = np.zeros(len(keys), dtype=bool)
+        found[inside] = self.keys[positions[inside]] == keys[inside]
+        matched = positions[found]
+
+        has_representation = self.represented[matched].sum()
+        # Every reps row counts once for each case with its key
+        cases_per_key = np.bincount(matched, minlength=len(self.keys))
+        weights = self.pair_counts * cases_per_key[self.pair_keys]
+        type_counts = np.bincount(self.pair_types, weights=weights, minlength=len(self.attorney_types)).astype(np.int64)
+
+        # value_counts of a categorical: every category, then sorted by count
+        counts = pd.Series(type_counts, index=self.attorney_types, name='count')
+        return has_representation, counts.sort_values(ascending=False)
+
+def build_rep_summary(reps_assigned: Optional[pd.DataFrame] = None) -> Optional[RepresentationSummary]:
+    """Build the summary of reps_assigned and store it in the cache"""
+    if reps_assigned is None:
+        reps_assigned = cache.get('reps_assigned')
+    summary = RepresentationSummary.from_frame(reps_assigned)
+    if summary is not None:
+        cache.set('rep_summary', summary)
+        print(f"🧾 Built representation summary of {len(summary.keys):,} cases from {len(reps_assigned):,} reps")
+    return summary
+
+def get_rep_summary(reps_assigned: Optional[pd.DataFrame] = None) -> Optional[RepresentationSummary]:
+    """
+    Summary of reps_assigned: the cached one (built on first use) for the cached
+    reps table, a fresh one for any other frame
+    """
+    cached_reps = cache.get('reps_assigned')
+    if reps_assigned is not None and reps_assigned is not cached_reps:
+        return RepresentationSummary.from_frame(reps_assigned)
+    summary = cache.get('rep_summary')
+    if summary is None:
+        with _build_lock:
+            summary = cache.get('rep_summary')
+            if summary is None:
+                summary = build_rep_summary(cached_reps)
+    return summary
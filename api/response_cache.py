@@ -0,0 +1,104 @@
+"""
+Server-side cache of serialized API responses
+Findings responses only change when the data is reloaded, so the JSON bytes
+of each (endpoint, Filters, data version) are kept and hot requests are
+answered without touching pandas, Plotly or the JSON encoder
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+from flask import request, make_response
+
+# Local imports
+from .config import RESPONSE_CACHE_MAX_BYTES
+from .models import cache
+from .filters import Filters
+
+class ResponseCache:
+    """LRU of serialized responses bounded by the total size of their bodies"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached (body, status, content_type) for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key, body, status, content_type):
+        """Store a response body, evicting the least recently used ones over the budget"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = (body, status, content_type)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Entry count, size and hit ratio for the status endpoint"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+# Global response cache instance
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+def data_version():
+    """
+    Version of the data responses are computed from: bumped by every load and
+    clear of the data cache; the day is included because the quarter index
+    (and with it the historical time series) rolls forward on a day change
+    """
+    return (cache.version(), date.today().isoformat())
+
+def cached_response(endpoint):
+    """
+    Cache the JSON responses of a Filters-driven GET endpoint.
+    Only successful responses produced while the data is loaded are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (endpoint, Filters.from_query(request.args), data_version())
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, status, content_type = entry
+                return make_response(body, status, {'Content-Type': content_type})
+
+            response = make_response(view(*args, **kwargs))
+            # The version is re-read so a reload during the view is never cached as current
+            if (response.status_code == 200 and response.is_json and cache.is_loaded()
+                    and key[2] == data_version()):
+                response_cache.put(key, response.get_data(), response.status_code, response.content_type)
+            return response
+        return wrapper
+    return decorator
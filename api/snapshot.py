@@ -0,0 +1,193 @@
+"""
+Columnar on-disk snapshots of the cached datasets
+One Arrow IPC (Feather v2) file per table plus a JSON manifest, so restarts
+only read the tables and columns they need instead of unpickling everything
+"""
+import json
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .config import SNAPSHOT_DIR, SNAPSHOT_MANIFEST, SNAPSHOT_COMPRESSION, SPILL_DIR, get_cache_dir
+
+# pyarrow is optional: without it tables are snapshotted with pickle
+try:
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+    ARROW_AVAILABLE = True
+except ImportError:
+    print("⚠️  pyarrow not available, snapshots fall back to pickle")
+    ARROW_AVAILABLE = False
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+def get_snapshot_dir():
+    """Get the snapshot directory path"""
+    snapshot_dir = os.path.join(get_cache_dir(), SNAPSHOT_DIR)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    return snapshot_dir
+
+def read_manifest():
+    """Read the snapshot manifest, or None when no complete snapshot exists"""
+    manifest_path = os.path.join(get_snapshot_dir(), SNAPSHOT_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Unreadable snapshot manifest: {e}")
+        return None
+    if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        print("⚠️ Snapshot manifest has an unsupported format version")
+        return None
+    return manifest
+
+def _write_atomic(path, write):
+    """Write a file through a temporary path and rename it into place"""
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _write_table(key, df, snapshot_dir, arrow=True):
+    """Write one table and return its manifest entry (arrow=False always pickles)"""
+    entry = {
+        'rows': len(df),
+        'columns': [str(col) for col in df.columns],
+        'dtypes': {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    if arrow and ARROW_AVAILABLE:
+        filename = f"{key}.arrow"
+        try:
+            _write_atomic(
+                os.path.join(snapshot_dir, filename),
+                lambda path: feather.write_feather(df, path, compression=SNAPSHOT_COMPRESSION)
+            )
+            entry.update({'file': filename, 'format': 'arrow'})
+            return entry
+        except Exception as e:
+            # Mixed-type object columns cannot be represented in Arrow
+            print(f"   ⚠️ {key} is not Arrow-compatible ({e}), using pickle")
+
+    filename = f"{key}.pkl"
+    def write_pickle(path):
+        with open(path, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    _write_atomic(os.path.join(snapshot_dir, filename), write_pickle)
+    entry.update({'file': filename, 'format': 'pickle'})
+    return entry
+
+def write_snapshot(tables):
+    """
+    Write a snapshot of the given {key: DataFrame} tables.
+    Table files are written first and the manifest last, so a crash mid-write
+    never leaves a manifest pointing at partial files.
+    """
+    snapshot_dir = get_snapshot_dir()
+    manifest = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'tables': {},
+    }
+    for key, df in tables.items():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        manifest['tables'][key] = _write_table(key, df, snapshot_dir)
+        print(f"   💾 Saved {key} to snapshot ({manifest['tables'][key]['format']})")
+
+    def write_manifest(path):
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(os.path.join(snapshot_dir, SNAPSHOT_MANIFEST), write_manifest)
+    return manifest
+
+def _index_columns(path):
+    """Names of the stored index columns of an Arrow file (read from the footer only)"""
+    schema = ipc.open_file(path).schema
+    metadata = schema.pandas_metadata or {}
+    return [col for col in metadata.get('index_columns', []) if isinstance(col, str)]
+
+def read_table(key, columns=None, manifest=None):
+    """
+    Read one table from the snapshot.
+    columns projects the read to a subset of columns; the stored index,
+    categorical and nullable integer dtypes are restored either way.
+    """
+    manifest = manifest or read_manifest()
+    if manifest is None or key not in manifest['tables']:
+        return None
+    entry = manifest['tables'][key]
+    path = os.path.join(get_snapshot_dir(), entry['file'])
+    if entry['format'] == 'arrow' and columns is not None and ARROW_AVAILABLE:
+        columns = [col for col in columns if col in entry['columns']] + _index_columns(path)
+    return _read_file(key, path, entry['format'], columns)
+
+def _read_file(key, path, fmt, columns=None):
+    """Read a table file written by _write_table"""
+    if fmt == 'arrow':
+        if not ARROW_AVAILABLE:
+            raise RuntimeError(f"pyarrow is required to read snapshot table {key}")
+        # Uncompressed columns are read from the mapped page cache and copied once by
+        # to_pandas; compressed ones are decompressed into memory first
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    with open(path, 'rb') as f:
+        df = pickle.load(f)
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+def get_spill_dir():
+    """Get the directory of tables spilled out of memory"""
+    spill_dir = os.path.join(get_cache_dir(), SPILL_DIR)
+    os.makedirs(spill_dir, exist_ok=True)
+    return spill_dir
+
+def _nan_object_columns(df):
+    """
+    Object columns whose missing values are all NaN, which an Arrow round trip
+    turns into None; None when a column mixes kinds of missing values (only
+    pickle brings those back exactly)
+    """
+    columns = []
+    for col, series in df.items():
+        if series.dtype != object:
+            continue
+        missing = series[series.isna()]
+        if all(value is None for value in missing):
+            continue
+        if not all(isinstance(value, float) for value in missing):
+            return None
+        columns.append(col)
+    return columns
+
+def spill_table(key, df, version):
+    """
+    Write a table evicted from memory to the spill directory as an Arrow file
+    and return a function reading it back (None once the file is gone).
+    NaN missing values of object columns are restored on read; tables Arrow
+    cannot bring back exactly are pickled. Spill files of older versions of
+    the same table are removed.
+    """
+    spill_dir = get_spill_dir()
+    name = f"{key}.v{version}"
+    for filename in os.listdir(spill_dir):
+        if filename.startswith(f"{key}.v") and not filename.startswith(f"{name}."):
+            os.remove(os.path.join(spill_dir, filename))
+    nan_columns = _nan_object_columns(df)
+    entry = _write_table(name, df, spill_dir, arrow=nan_columns is not None)
+    path = os.path.join(spill_dir, entry['file'])
+
+    def read_back():
+        if not os.path.exists(path):
+            return None
+        df = _read_file(key, path, entry['format'])
+        if entry['format'] == 'arrow':
+            for col in nan_columns:
+                df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+    return read_back
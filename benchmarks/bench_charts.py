@@ -0,0 +1,64 @@
+"""
+Per-chart cost of a findings request: building the plain-dict figure spec and
+encoding it once, vs the previous path that built the same figure as Plotly
+graph objects, encoded it with PlotlyJSONEncoder, decoded it and encoded the
+response again
+
+Usage: python benchmarks/bench_charts.py [cases]
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import timeit
+
+import plotly.graph_objects as go
+import plotly.utils
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import load_synthetic  # noqa: E402
+from api import chart_generator  # noqa: E402
+from api.filters import Filters  # noqa: E402
+
+CHARTS = [
+    'generate_representation_outcomes_chart',
+    'generate_outcome_percentages_chart',
+    'generate_time_series_chart',
+    'generate_countries_chart',
+]
+
+def through_plotly(spec):
+    """The figure round-trip every chart used to make before returning"""
+    layout = {key: value for key, value in spec['layout'].items() if key != 'template'}
+    fig = go.Figure(data=spec['data'], layout=layout)
+    chart_data = {**spec, 'data': fig.data, 'layout': fig.layout}
+    return json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
+
+def best_ms(fn, number=10):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    load_synthetic(cases)
+    app = Flask(__name__)
+    filters = Filters('biden', 'represented', 'all')
+    print(f"{cases:,} synthetic cases, filters {filters.to_dict()}")
+
+    for name in CHARTS:
+        generate = getattr(chart_generator, name)
+        with contextlib.redirect_stdout(io.StringIO()), app.app_context():
+            def spec_path():
+                return app.json.response(generate(filters)).get_data()
+
+            def plotly_path():
+                return app.json.response(through_plotly(generate(filters))).get_data()
+            same = json.loads(spec_path()) == json.loads(plotly_path())
+            new = best_ms(spec_path)
+            old = best_ms(plotly_path)
+        print(f"{name:40} via Plotly {old:7.2f} ms  plain spec {new:7.2f} ms  "
+              f"{'same JSON' if same else 'DIFFERENT JSON'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Derived columns of process_analysis_data: row-wise helpers vs the vectorized versions
+
+Usage: python benchmarks/bench_derived_columns.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.data_processor import (  # noqa: E402
+    calculate_age, categorize_outcome, categorize_representation, determine_policy_era,
+    derive_age_at_filing, derive_binary_outcome, derive_has_legal_rep, derive_policy_era,
+)
+
+def synthetic_columns(rows, seed=1):
+    """Birth dates, hearing dates, representation levels and decision codes with ~10% missing"""
+    rng = np.random.default_rng(seed)
+    hearings = pd.Series(pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 365 * 20, rows), "D"))
+    hearings[rng.random(rows) < 0.1] = pd.NaT
+    births = pd.Series(pd.Timestamp("1995-01-01") + pd.to_timedelta(rng.integers(0, 365 * 30, rows), "D"))
+    births[rng.random(rows) < 0.1] = pd.NaT
+    levels = pd.Series(pd.Categorical(rng.choice(["COURT", "BOARD", "OTHER", "no_representation"], rows)))
+    codes = pd.Series(pd.Categorical(rng.choice(["A", "C", "D", "X", "O", "W", "Q"], rows)))
+    codes[rng.random(rows) < 0.1] = np.nan
+    return births, hearings, levels, codes
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    births, hearings, levels, codes = synthetic_columns(rows)
+    frame = pd.DataFrame({"C_BIRTHDATE": births, "hearing_date_combined": hearings})
+
+    cases = {
+        "AGE_AT_FILING": (
+            lambda: frame.apply(lambda row: calculate_age(row["C_BIRTHDATE"], row["hearing_date_combined"]), axis=1),
+            lambda: derive_age_at_filing(births, hearings),
+        ),
+        "POLICY_ERA": (lambda: hearings.apply(determine_policy_era), lambda: derive_policy_era(hearings)),
+        "HAS_LEGAL_REP": (lambda: levels.apply(categorize_representation), lambda: derive_has_legal_rep(levels)),
+        "BINARY_OUTCOME": (lambda: codes.apply(categorize_outcome), lambda: derive_binary_outcome(codes)),
+    }
+    print(f"{rows:,} rows")
+    for column, (row_wise, vectorized) in cases.items():
+        expected, old = timed(row_wise)
+        result, new = timed(vectorized)
+        same = expected.astype(object).where(expected.notna(), None).equals(result.astype(object).where(result.notna(), None))
+        print(f"{column:15} row-wise {old * 1000:9.1f} ms  vectorized {new * 1000:7.1f} ms  "
+              f"x{old / max(new, 1e-9):6.0f}  {'same values' if same else 'DIFFERENT VALUES'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request filter cost: the previous copy-per-request apply_filters vs the
+compiled, memoized engine (first request for a plan and repeated requests)
+
+Usage: python benchmarks/bench_filters.py [rows]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.filters import (  # noqa: E402
+    REPRESENTATION_VALUES, TIME_PERIODS, Filters, apply_filters, compile_filters, filter_index, prepare_filter_columns,
+)
+
+def synthetic_analysis(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.Timestamp("2014-01-01") + pd.to_timedelta(rng.integers(0, 365 * 13, rows), "D"))
+    dates[rng.random(rows) < 0.05] = pd.NaT
+    return pd.DataFrame({
+        "hearing_date_combined": dates,
+        "HAS_LEGAL_REP": rng.choice(["Has Legal Representation", "No Legal Representation", "Unknown"], rows),
+        "BINARY_OUTCOME": rng.choice(["Favorable", "Unfavorable", "Other"], rows),
+        "CASE_TYPE": rng.choice(["RMV", "AOC", " rmv", "DEP"], rows),
+    })
+
+def previous_apply_filters(df, filters):
+    """apply_filters before the compiled engine: copies and re-normalizes on every call"""
+    data = df.copy()
+    date_col = "hearing_date_combined"
+    data[date_col] = pd.to_datetime(data[date_col], errors="coerce")
+    if filters.time_period != "all":
+        start, end = TIME_PERIODS[filters.time_period]
+        mask = pd.Series(True, index=data.index)
+        if start is not None:
+            mask &= data[date_col] >= start
+        if end is not None:
+            mask &= data[date_col] < end
+        data = data[mask]
+    if filters.representation != "all":
+        def normalize(x):
+            if pd.isna(x):
+                return "Unknown"
+            xv = str(x).strip()
+            if xv in REPRESENTATION_VALUES["represented"] or xv.lower() in {"has legal representation", "true"}:
+                return "Has Legal Representation"
+            if xv in REPRESENTATION_VALUES["unrepresented"] or xv.lower() in {"no legal representation", "false"}:
+                return "No Legal Representation"
+            return "Unknown"
+        wanted = "Has Legal Representation" if filters.representation == "represented" else "No Legal Representation"
+        data = data[data["HAS_LEGAL_REP"].map(normalize) == wanted]
+    if filters.case_type != "all":
+        data = data[data["CASE_TYPE"].astype(str).str.strip().str.lower() == filters.case_type.strip().lower()]
+    return data
+
+def best_ms(fn, number=5):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = prepare_filter_columns(synthetic_analysis(rows))
+    print(f"{rows:,} rows")
+    for filters in (Filters("biden"), Filters("trump1", "represented"), Filters("biden", "represented", "RMV")):
+        old = best_ms(lambda: previous_apply_filters(df, filters))
+        plan = compile_filters(filters)
+
+        def first_request():
+            filter_index(df)._rows.pop(plan, None)
+            return apply_filters(df, filters)
+        cold = best_ms(first_request)
+        warm = best_ms(lambda: apply_filters(df, filters))
+        same = previous_apply_filters(df, filters).index.equals(apply_filters(df, filters).index)
+        print(f"{filters.time_period:7} {filters.representation:12} {filters.case_type:4} "
+              f"previous {old:8.2f} ms  first {cold:7.2f} ms  repeated {warm:6.2f} ms  "
+              f"{'same rows' if same else 'DIFFERENT ROWS'}")
+
+if __name__ == "__main__":
+    main()
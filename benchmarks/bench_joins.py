@@ -0,0 +1,118 @@
+"""
+Join cost of the proceedings_with_decisions and merged_data stages: the
+previous DataFrame.merge path vs the int64 sort-merge left_join and the
+dense decision-code lookup, per join and for the two stages end to end, at
+1x, 10x and 100x a base number of cases unless scales are given
+
+Usage: python benchmarks/bench_joins.py [cases ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import pandas as pd
+
+BASE_CASES = 20_000
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import read_raw_tables, write_raw_files  # noqa: E402
+from api import data_processor  # noqa: E402
+from api.joins import left_join, lookup_codes, take_column  # noqa: E402
+
+def merge_join(left, right, on):
+    return left.merge(right, on=on, how="left")
+
+def merge_decisions(proceedings, lookup_decisions):
+    """Decision descriptions through DataFrame.merge, as the stage did before the dense lookup"""
+    result = proceedings.merge(lookup_decisions[["strCode", "strDescription"]], how="left",
+                               left_on="DEC_CODE", right_on="strCode")
+    return result.drop(columns=["strCode"]).rename(columns={"strDescription": "decision_description"})
+
+def lookup_decisions_column(proceedings, lookup_decisions):
+    positions = lookup_codes(proceedings["DEC_CODE"], lookup_decisions["strCode"])
+    result = proceedings.reset_index(drop=True)
+    result["decision_description"] = take_column(lookup_decisions["strDescription"], positions,
+                                                 bool((positions < 0).any()))
+    return result
+
+@contextlib.contextmanager
+def merge_stages():
+    """Run the stage builders with DataFrame.merge in place of left_join and the dense lookup"""
+    saved = data_processor.left_join, data_processor.lookup_codes
+    data_processor.left_join = merge_join
+    data_processor.lookup_codes = lambda values, keys: None
+    try:
+        yield
+    finally:
+        data_processor.left_join, data_processor.lookup_codes = saved
+
+def build_stages(tables):
+    with contextlib.redirect_stdout(io.StringIO()):
+        decisions = data_processor.build_proceedings_with_decisions(tables["proceedings"], tables["lookup_decisions"])
+        return data_processor.build_merged_data(tables["juvenile_cases"], decisions, tables["reps_assigned"])
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def best_ms(fn, number=3):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+def same(a, b):
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+        return "same frame"
+    except AssertionError:
+        return "DIFFERENT FRAME"
+
+def report(name, old_fn, new_fn):
+    old, new = best_ms(old_fn), best_ms(new_fn)
+    print(f"{name:28} merge {old:8.2f} ms  new {new:8.2f} ms  {same(old_fn(), new_fn())}")
+    print(f"{'':28} merge {peak_mb(old_fn):8.1f} MB  new {peak_mb(new_fn):8.1f} MB  peak memory")
+
+def run(cases):
+    with tempfile.TemporaryDirectory() as raw_dir:
+        write_raw_files(raw_dir, cases)
+        tables = read_raw_tables(raw_dir)
+    print(f"{cases:,} synthetic cases, {len(tables['proceedings']):,} proceedings, "
+          f"{len(tables['reps_assigned']):,} reps")
+
+    proceedings = tables["proceedings"][["IDNCASE", "COMP_DATE", "NAT", "LANG", "CASE_TYPE", "DEC_CODE"]]
+    report("decision descriptions",
+           lambda: merge_decisions(proceedings, tables["lookup_decisions"]),
+           lambda: lookup_decisions_column(proceedings, tables["lookup_decisions"]))
+
+    cases_columns = tables["juvenile_cases"][["IDNCASE", "NAT", "LANG", "CASE_TYPE", "Sex", "C_BIRTHDATE", "LATEST_HEARING"]]
+    decisions = lookup_decisions_column(proceedings, tables["lookup_decisions"])
+    decisions = decisions[["IDNCASE", "COMP_DATE", "DEC_CODE", "decision_description"]]
+    report("cases x proceedings",
+           lambda: merge_join(cases_columns, decisions, "IDNCASE"),
+           lambda: left_join(cases_columns, decisions, "IDNCASE"))
+
+    with_decisions = left_join(cases_columns, decisions, "IDNCASE")
+    reps = tables["reps_assigned"][["IDNCASE", "STRATTYLEVEL"]]
+    report("merged x reps",
+           lambda: merge_join(with_decisions, reps, "IDNCASE"),
+           lambda: left_join(with_decisions, reps, "IDNCASE"))
+
+    def merge_path():
+        with merge_stages():
+            return build_stages(tables)
+    report("both stages", merge_path, lambda: build_stages(tables))
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [BASE_CASES * factor for factor in (1, 10, 100)]
+    for i, cases in enumerate(scales):
+        if i:
+            print()
+        run(cases)
+
+if __name__ == "__main__":
+    main()
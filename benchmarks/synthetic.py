@@ -0,0 +1,120 @@
+"""
+Synthetic EOIR-shaped raw files for the benchmarks, and a loader that runs
+them through the same ingestion and stage builders as a reload and publishes
+the result in the in-process cache (api/cache is never touched)
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.config import FILTERED_TABLES, LAZY_TABLES, RAW_TABLE_SPECS  # noqa: E402
+
+NATIONALITIES = ['GT', 'HO', 'MX', 'ES', 'CU', 'NU', 'BR', 'VE', 'CO', 'EC', 'PE', 'HA', 'CH', 'IN', 'XX', 'YY']
+DECISION_CODES = ['A', 'C', 'G', 'R', 'S', 'T', 'D', 'E', 'V', 'X', 'O', 'W', 'Z']
+
+def write_raw_files(out_dir, n_cases=20000, seed=0):
+    """Write the six raw files (cases, ~1.4 proceedings and ~0.6 reps per case) into out_dir"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    ids = np.arange(1, n_cases + 1)
+
+    hearing = pd.Series(pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 365 * 13, n_cases), 'D'))
+    hearing[rng.random(n_cases) < 0.05] = pd.NaT
+    birth = pd.Series(pd.Timestamp('1998-01-01') + pd.to_timedelta(rng.integers(0, 365 * 20, n_cases), 'D'))
+    birth[rng.random(n_cases) < 0.1] = pd.NaT
+    cases = pd.DataFrame({
+        'IDNCASE': ids,
+        'NAT': rng.choice(NATIONALITIES, n_cases, p=rng.dirichlet(np.ones(len(NATIONALITIES)))),
+        'LANG': rng.choice(['SP', 'ENG', 'POR', 'KIC'], n_cases),
+        'CUSTODY': rng.choice(['D', 'N', 'R'], n_cases),
+        'CASE_TYPE': rng.choice(['RMV', 'AOC', ' rmv', 'DEP'], n_cases),
+        'LATEST_CAL_TYPE': rng.choice(['I', 'M'], n_cases),
+        'Sex': rng.choice(['M', 'F'], n_cases),
+        'LATEST_HEARING': hearing.dt.strftime('%Y-%m-%d'),
+        'DATE_OF_ENTRY': birth.dt.strftime('%Y-%m-%d'),
+        'C_BIRTHDATE': birth.dt.strftime('%Y-%m-%d'),
+        'DATE_DETAINED': '',
+        'DATE_RELEASED': '',
+    })
+
+    n_proceedings = int(n_cases * 1.4)
+    completed = pd.Series(pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 365 * 12, n_proceedings), 'D'))
+    completed[rng.random(n_proceedings) < 0.3] = pd.NaT
+    decisions = pd.Series(rng.choice(DECISION_CODES, n_proceedings))
+    decisions[rng.random(n_proceedings) < 0.1] = None
+    proceedings = pd.DataFrame({
+        'IDNPROCEEDING': np.arange(n_proceedings),
+        'IDNCASE': rng.choice(ids, n_proceedings),
+        'NAT': rng.choice(NATIONALITIES, n_proceedings),
+        'LANG': 'SP',
+        'CASE_TYPE': 'RMV',
+        'DEC_CODE': decisions,
+        'ABSENTIA': rng.choice(['Y', 'N'], n_proceedings),
+        'OSC_DATE': '',
+        'INPUT_DATE': '',
+        'COMP_DATE': completed.dt.strftime('%Y-%m-%d'),
+    })
+
+    n_reps = int(n_cases * 0.6)
+    reps = pd.DataFrame({
+        'IDNREPSASSIGNED': np.arange(n_reps),
+        'IDNCASE': rng.choice(ids, n_reps),
+        'STRATTYLEVEL': rng.choice(['COURT', 'BOARD', 'OTHER'], n_reps, p=[.6, .3, .1]),
+        'STRATTYTYPE': rng.choice(['ALIEN', 'GOV', None], n_reps),
+        'E_28_DATE': '',
+        'E_27_DATE': '2019-01-01',
+    })
+
+    history = pd.DataFrame({
+        'idnJuvenileHistory': np.arange(100), 'idnCase': np.arange(100), 'idnProceeding': np.arange(100),
+        'idnJuvenile': rng.choice(['1', '2'], 100),
+    })
+    lookup_decisions = pd.DataFrame({'strCode': DECISION_CODES, 'strDescription': [f'desc {c}' for c in DECISION_CODES]})
+    lookup_juvenile = pd.DataFrame({'idnJuvenile': ['1', '2'], 'strDescription': ['a', 'b']})
+
+    cases.to_csv(os.path.join(out_dir, 'juvenile_cases_cleaned.csv.gz'), index=False)
+    proceedings.to_csv(os.path.join(out_dir, 'juvenile_proceedings_cleaned.csv.gz'), index=False)
+    reps.to_csv(os.path.join(out_dir, 'juvenile_reps_assigned.csv.gz'), index=False)
+    history.to_csv(os.path.join(out_dir, 'juvenile_history_cleaned.csv.gz'), index=False)
+    lookup_decisions.to_csv(os.path.join(out_dir, 'tblDecCode.csv'), index=False, sep='\t')
+    lookup_juvenile.to_csv(os.path.join(out_dir, 'tblLookup_Juvenile.csv'), index=False, sep='\t')
+
+def read_raw_tables(raw_dir):
+    """Raw tables of raw_dir read as a load would (projected, typed), lazy tables excepted"""
+    from api import data_loader
+    from api.filters import prepare_filter_columns
+
+    tables = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for key in RAW_TABLE_SPECS:
+            if key in LAZY_TABLES:
+                continue
+            tables[key] = data_loader.load_raw_table(key, raw_dir)
+            if key in FILTERED_TABLES and tables[key] is not None:
+                prepare_filter_columns(tables[key])
+    return tables
+
+def load_synthetic(n_cases=20000, seed=0):
+    """
+    Build every table and stage from synthetic raw files and publish them in
+    the cache, as a reload would. Returns the published tables.
+    """
+    from api.compaction import compact_tables
+    from api.models import cache
+    from api.pipeline import STAGES
+
+    with tempfile.TemporaryDirectory() as raw_dir:
+        write_raw_files(raw_dir, n_cases, seed)
+        tables = read_raw_tables(raw_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for key, (builder, inputs) in STAGES.items():
+            tables[key] = builder(*[tables[name] for name in inputs])
+        compact_tables(tables)
+        cache.publish({**tables, 'data_loaded': True})
+    return tables
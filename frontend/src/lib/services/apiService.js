@@ -239,37 +239,20 @@ class ApiService {
   }
 
   /**
-   * Load all chart data for findings page
+   * Load all chart data for findings page (one request, filtered once on the server)
    */
   async getAllChartData(customFilters = null) {
     try {
-      const [
-        representationOutcomes,
-        timeSeriesAnalysis,
-        chiSquareAnalysis,
-        outcomePercentages,
-        countriesChart
-      ] = await Promise.allSettled([
-        this.getRepresentationOutcomes(customFilters),
-        this.getTimeSeriesAnalysis(customFilters),
-        this.getChiSquareAnalysis(customFilters),
-        this.getOutcomePercentages(customFilters),
-        this.getCountriesChart(customFilters)
-      ]);
+      const url = this.buildUrlWithFilters('/findings/all', customFilters);
+      const data = await this.fetchWithRetry(url);
 
       return {
-        representationOutcomes: representationOutcomes.status === 'fulfilled' ? representationOutcomes.value : null,
-        timeSeriesAnalysis: timeSeriesAnalysis.status === 'fulfilled' ? timeSeriesAnalysis.value : null,
-        chiSquareAnalysis: chiSquareAnalysis.status === 'fulfilled' ? chiSquareAnalysis.value : null,
-        outcomePercentages: outcomePercentages.status === 'fulfilled' ? outcomePercentages.value : null,
-        countriesChart: countriesChart.status === 'fulfilled' ? countriesChart.value : null,
-        errors: [
-          ...(representationOutcomes.status === 'rejected' ? [representationOutcomes.reason] : []),
-          ...(timeSeriesAnalysis.status === 'rejected' ? [timeSeriesAnalysis.reason] : []),
-          ...(chiSquareAnalysis.status === 'rejected' ? [chiSquareAnalysis.reason] : []),
-          ...(outcomePercentages.status === 'rejected' ? [outcomePercentages.reason] : []),
-          ...(countriesChart.status === 'rejected' ? [countriesChart.reason] : [])
-        ]
+        representationOutcomes: data.representationOutcomes ?? null,
+        timeSeriesAnalysis: data.timeSeriesAnalysis ?? null,
+        chiSquareAnalysis: data.chiSquareAnalysis ?? null,
+        outcomePercentages: data.outcomePercentages ?? null,
+        countriesChart: data.countriesChart ?? null,
+        errors: data.errors ?? []
       };
     } catch (error) {
       console.error('Error loading chart data:', error);
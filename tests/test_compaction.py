@@ -0,0 +1,93 @@
+"""
+Dtype compaction works on copies before publishing: published frames are
+never modified, and every chart reads the same figures from compacted tables
+as from the tables as loaded
+"""
+import contextlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import chart_generator
+from api.compaction import compact_cache, compact_frame, compact_tables
+from api.filters import Filters
+from api.models import cache
+from api.pipeline import STAGES
+from benchmarks.synthetic import read_raw_tables, write_raw_files
+
+CHARTS = [
+    'generate_representation_outcomes_chart',
+    'generate_outcome_percentages_chart',
+    'generate_time_series_chart',
+    'generate_chi_square_analysis',
+    'generate_countries_chart',
+]
+FILTERS = [Filters(), Filters('biden', 'represented'), Filters('trump1', 'unrepresented', 'RMV')]
+
+def sample():
+    return pd.DataFrame({
+        'NAT': ['GT', 'HO', 'GT', None] * 3,
+        'IDNCASE': np.arange(12, dtype=np.int64),
+        'AGE_AT_FILING': np.linspace(1, 17, 12),
+    })
+
+def test_compact_frame_leaves_its_input_untouched():
+    df = sample()
+    original = df.copy()
+    compacted, before, after = compact_frame(df)
+    pd.testing.assert_frame_equal(df, original)
+    assert compacted is not df and after < before
+    assert compacted['NAT'].dtype == 'category'
+    assert compacted['IDNCASE'].dtype == np.int8
+    assert compacted['AGE_AT_FILING'].dtype == np.float32
+    pd.testing.assert_frame_equal(compacted.drop(columns='NAT'), original.drop(columns='NAT'), check_dtype=False)
+    assert compacted['NAT'].astype(object).fillna('missing').tolist() == original['NAT'].fillna('missing').tolist()
+
+def test_compact_cache_publishes_copies():
+    df = sample()
+    cache.publish({'juvenile_cases': df, 'data_loaded': True})
+    published = cache.get_all()
+    try:
+        compact_cache()
+        # Requests still on the previous version read its frames unchanged
+        assert published['juvenile_cases'] is df
+        assert df['NAT'].dtype == object
+        assert cache.get('juvenile_cases') is not df
+        assert cache.get('juvenile_cases')['NAT'].dtype == 'category'
+    finally:
+        cache.clear()
+
+@pytest.fixture(scope='module')
+def raw_tables(tmp_path_factory):
+    raw_dir = tmp_path_factory.mktemp('raw')
+    write_raw_files(str(raw_dir), n_cases=3000, seed=7)
+    return read_raw_tables(str(raw_dir))
+
+def chart_outputs(raw_tables, compact):
+    """Every chart under FILTERS, from the raw tables built and published with or without compaction"""
+    tables = {key: df.copy() for key, df in raw_tables.items()}
+    outputs = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        if compact:
+            compact_tables(tables)
+        for key, (builder, inputs) in STAGES.items():
+            tables[key] = builder(*[tables[name] for name in inputs])
+        if compact:
+            compact_tables(tables)
+        cache.publish({**tables, 'data_loaded': True})
+        try:
+            for name in CHARTS:
+                for filters in FILTERS:
+                    outputs[name, filters] = json.loads(json.dumps(getattr(chart_generator, name)(filters), default=str))
+        finally:
+            cache.clear()
+    return outputs
+
+def test_charts_match_between_compacted_and_loaded_tables(raw_tables):
+    loaded = chart_outputs(raw_tables, compact=False)
+    compacted = chart_outputs(raw_tables, compact=True)
+    for key, output in loaded.items():
+        assert compacted[key] == output, key
@@ -0,0 +1,70 @@
+"""
+ContingencyStats reproduces scipy.stats.chi2_contingency: the same statistic,
+p-value, degrees of freedom and expected frequencies, and the same error for
+tables with a zero expected frequency
+"""
+import numpy as np
+import pytest
+from scipy import stats
+from scipy.stats.contingency import association
+
+from api.contingency import ContingencyStats, row_percentages
+
+TABLES = {
+    '2x2': [[120, 45], [80, 95]],
+    '2x2 small cells': [[3, 1], [1, 4]],
+    '2x2 within half a count': [[10, 10], [10, 11]],
+    '3x2': [[210, 90], [150, 160], [40, 70]],
+    '4x3': [[12, 30, 7], [25, 18, 9], [3, 40, 22], [16, 16, 16]],
+}
+
+def assert_matches_scipy(observed, correction=True):
+    ours = ContingencyStats(observed, correction=correction)
+    expected = stats.chi2_contingency(observed, correction=correction)
+    assert ours.chi2 == expected.statistic
+    assert ours.p_value == expected.pvalue
+    assert ours.dof == expected.dof
+    np.testing.assert_array_equal(ours.expected, expected.expected_freq)
+    return ours
+
+@pytest.mark.parametrize('name', ['2x2', '2x2 small cells', '2x2 within half a count'])
+@pytest.mark.parametrize('correction', [True, False])
+def test_two_by_two_matches_scipy(name, correction):
+    ours = assert_matches_scipy(np.array(TABLES[name]), correction=correction)
+    assert ours.dof == 1
+
+@pytest.mark.parametrize('name', ['3x2', '4x3'])
+def test_r_by_c_matches_scipy(name):
+    observed = np.array(TABLES[name])
+    ours = assert_matches_scipy(observed)
+    # No Yates' correction beyond one degree of freedom: Cramer's V as scipy computes it
+    assert ours.cramer_v == pytest.approx(association(observed, method='cramer'))
+    assert ours.significant == (ours.p_value < 0.05)
+
+@pytest.mark.parametrize('observed', [[[5, 9, 2]], [[5], [9], [2]], [[7]]])
+def test_single_row_or_column_has_no_degrees_of_freedom(observed):
+    ours = assert_matches_scipy(np.array(observed))
+    assert (ours.dof, ours.chi2, ours.p_value) == (0, 0.0, 1.0)
+
+@pytest.mark.parametrize('observed', [[[0, 0], [4, 6]], [[3, 0], [5, 0]]])
+def test_zero_expected_frequency_raises_as_scipy(observed):
+    with pytest.raises(ValueError) as expected:
+        stats.chi2_contingency(np.array(observed))
+    with pytest.raises(ValueError) as ours:
+        ContingencyStats(np.array(observed))
+    assert str(ours.value) == str(expected.value)
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_empty_table_is_nan_as_in_scipy():
+    # 0/0 expected frequencies are NaN, not zero: neither raises
+    observed = np.zeros((2, 2), dtype=np.int64)
+    expected = stats.chi2_contingency(observed)
+    ours = ContingencyStats(observed)
+    assert np.isnan(ours.chi2) and np.isnan(expected.statistic)
+    assert np.isnan(ours.p_value) and np.isnan(expected.pvalue)
+    assert ours.dof == expected.dof
+
+def test_row_percentages_sum_to_100():
+    percentages = row_percentages(np.array([[1, 3], [0, 0], [2, 2]]))
+    np.testing.assert_allclose(percentages[[0, 2]].sum(axis=1), 100)
+    assert np.isnan(percentages[1]).all()
@@ -0,0 +1,107 @@
+"""
+Dataset versions and the single-flight loader: a request keeps the version it
+pinned while a newer one is published, concurrent load_data() callers share
+one load, and requests past LOAD_WAIT_TIMEOUT get a 503 with Retry-After
+"""
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+from api import api_routes, data_loader
+from api.models import cache
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+def test_pinned_request_keeps_its_version_while_a_new_one_is_published():
+    cache.publish({'merged_data': 'version N', 'data_loaded': True})
+    pinned, published, seen = threading.Event(), threading.Event(), {}
+
+    def request():
+        cache.pin()
+        try:
+            seen['number'] = cache.version()
+            pinned.set()
+            published.wait(5)
+            seen['during'] = cache.get('merged_data'), cache.version()
+        finally:
+            cache.unpin()
+        seen['after'] = cache.get('merged_data')
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    assert pinned.wait(5)
+    cache.publish({'merged_data': 'version N+1'})
+    published.set()
+    thread.join(5)
+    assert seen['during'] == ('version N', seen['number'])
+    assert seen['after'] == 'version N+1'
+    assert cache.version() == seen['number'] + 1
+
+@pytest.fixture
+def slow_load(monkeypatch):
+    """load_and_process_data replaced by a load that runs until release is set"""
+    release, calls = threading.Event(), []
+
+    def load():
+        calls.append(threading.current_thread().name)
+        release.wait(10)
+        cache.set_loaded(True)
+        return True
+    monkeypatch.setattr(data_loader, 'DATA_MMAP', False)
+    monkeypatch.setattr(data_loader, 'load_and_process_data', load)
+    monkeypatch.setattr(data_loader, 'materialize_overview', lambda: None)
+    yield release, calls
+    release.set()
+
+def wait_for_state(state, waiting=0):
+    for _ in range(500):
+        status = data_loader.load_status()
+        if status['state'] == state and status['waiting'] >= waiting:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"load never reached {state} with {waiting} waiting")
+
+def test_concurrent_callers_share_one_load(slow_load):
+    release, calls = slow_load
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(data_loader.load_data())) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    wait_for_state('loading', waiting=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [True] * 6
+    assert len(calls) == 1
+    assert data_loader.load_status()['state'] == 'loaded'
+    # Loaded: later callers return right away
+    assert data_loader.load_data() and len(calls) == 1
+
+def test_requests_past_the_wait_timeout_get_503_with_retry_after(slow_load, monkeypatch):
+    release, calls = slow_load
+    monkeypatch.setattr(api_routes, 'LOAD_WAIT_TIMEOUT', 0.05)
+    monkeypatch.setattr(api_routes, 'LOAD_RETRY_AFTER', 7)
+    app = Flask(__name__)
+    app.before_request(api_routes.require_data)
+    app.add_url_rule('/findings', 'findings', lambda: jsonify({'ok': True}))
+    app.add_url_rule('/health', 'health', lambda: jsonify({'ok': True}))
+
+    leader = threading.Thread(target=data_loader.load_data)
+    leader.start()
+    wait_for_state('loading')
+    with app.test_client() as client:
+        response = client.get('/findings')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '7'
+        assert response.get_json()['load']['state'] == 'loading'
+        # Endpoints that need no data answer during the load
+        assert client.get('/health').status_code == 200
+        release.set()
+        leader.join(5)
+        assert client.get('/findings').status_code == 200
+    assert len(calls) == 1
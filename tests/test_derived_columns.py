@@ -0,0 +1,71 @@
+"""
+Parity of the vectorized derived columns of process_analysis_data with the
+scalar helpers they replaced (applied row by row as the pipeline used to)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.data_processor import (
+    calculate_age, categorize_outcome, categorize_representation, determine_policy_era,
+    derive_age_at_filing, derive_binary_outcome, derive_has_legal_rep, derive_policy_era,
+)
+
+def _dates(values):
+    return pd.Series(pd.to_datetime(values, format="ISO8601"))
+
+def _row_wise_age(birthdates, hearing_dates):
+    frame = pd.DataFrame({"C_BIRTHDATE": birthdates, "hearing_date_combined": hearing_dates})
+    return frame.apply(lambda row: calculate_age(row["C_BIRTHDATE"], row["hearing_date_combined"]), axis=1)
+
+@pytest.mark.parametrize("birthdates, hearing_dates", [
+    # Missing birth date, missing hearing date, both missing
+    (["2005-03-01", None, "2006-07-15", None], ["2019-05-01", "2020-01-01", None, None]),
+    # Leap days, birth after hearing, same day
+    (["2004-02-29", "2021-06-01", "2010-10-10"], ["2020-02-28", "2019-06-01", "2010-10-10"]),
+    # Every birth date missing
+    ([None, None], ["2019-05-01", "2020-01-01"]),
+])
+def test_age_at_filing_matches_calculate_age(birthdates, hearing_dates):
+    birthdates, hearing_dates = _dates(birthdates), _dates(hearing_dates)
+    expected = _row_wise_age(birthdates, hearing_dates).astype("float64")
+    pd.testing.assert_series_equal(derive_age_at_filing(birthdates, hearing_dates), expected, check_names=False)
+
+def test_age_at_filing_parses_strings_like_calculate_age():
+    birthdates = pd.Series(["2005-03-01", "not a date", None, "2001-12-31"])
+    hearing_dates = pd.Series(["2019-05-01", "2020-01-01", "2020-01-01", "2019-01-01"])
+    expected = _row_wise_age(birthdates, hearing_dates).astype("float64")
+    pd.testing.assert_series_equal(derive_age_at_filing(birthdates, hearing_dates), expected, check_names=False)
+
+def test_policy_era_boundaries_match_determine_policy_era():
+    today = pd.Timestamp.now().normalize()
+    dates = _dates([
+        "2017-12-31 23:59:59.999999", "2018-01-01", "2020-12-31 23:59:59", "2021-01-01",
+        "2024-12-31 23:59:59", "2025-01-01", None, "1999-06-01",
+    ])
+    dates = pd.concat([dates, pd.Series([today - pd.Timedelta(days=1), today + pd.Timedelta(days=1)])],
+                      ignore_index=True)
+    expected = dates.apply(determine_policy_era)
+    pd.testing.assert_series_equal(derive_policy_era(dates), expected, check_names=False)
+
+def test_policy_era_of_an_all_missing_column():
+    dates = pd.Series([pd.NaT, pd.NaT], dtype="datetime64[ns]")
+    pd.testing.assert_series_equal(derive_policy_era(dates), dates.apply(determine_policy_era), check_names=False)
+
+@pytest.mark.parametrize("codes", [
+    pd.Series(["A", "D", "O", "Q", "", "a", None, np.nan, "X", "W"], dtype=object),
+    pd.Series(pd.Categorical(["A", "Q", None, "E", "Z"], categories=["A", "E", "Q", "Z", "unused"])),
+    pd.Series([None, None], dtype=object),
+])
+def test_binary_outcome_matches_categorize_outcome(codes):
+    expected = codes.apply(categorize_outcome).astype(object)
+    pd.testing.assert_series_equal(derive_binary_outcome(codes), expected, check_names=False)
+
+@pytest.mark.parametrize("levels", [
+    pd.Series(["COURT", "BOARD", "no_representation", "OTHER", "", None], dtype=object),
+    pd.Series(pd.Categorical(["COURT", "OTHER", "no_representation", None],
+                             categories=["BOARD", "COURT", "OTHER", "no_representation"])),
+])
+def test_has_legal_rep_matches_categorize_representation(levels):
+    expected = levels.apply(categorize_representation).astype(object)
+    pd.testing.assert_series_equal(derive_has_legal_rep(levels), expected, check_names=False)
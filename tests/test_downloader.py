@@ -0,0 +1,248 @@
+"""
+stream_to_file against a local HTTP stand-in: resumed, restarted, truncated,
+changed and corrupted transfers must end either in the exact file or in a
+DownloadError. A failed verification leaves neither the target nor a .part
+file behind; running out of retries keeps the .part file and its validator
+for the next run to resume. Also covers the bounded download pool.
+"""
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import data_loader, downloader
+from api.downloader import DownloadError, part_path, stream_to_file, validator_path
+
+PAYLOAD = bytes(range(256)) * 1200  # 300 KiB
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+CHANGED = bytes(reversed(range(256))) * 1300
+
+def etag(payload):
+    return f'"{hashlib.sha256(payload).hexdigest()[:16]}"'
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    Serves server.payload with its ETag; the server's mode picks the behaviour:
+    'range' honours Range and If-Range (206, or 416 with the total size),
+    'ignore_range' always answers 200, 'no_total' answers 416 without a size,
+    'no_validator' sends no ETag. server.truncate cuts the first N responses
+    short after half their announced body.
+    """
+    def do_GET(self):
+        server = self.server
+        payload = server.payload
+        server.ranges.append(self.headers.get('Range'))
+        server.if_ranges.append(self.headers.get('If-Range'))
+        start = 0
+        if_range = self.headers.get('If-Range')
+        if (self.headers.get('Range') and server.mode != 'ignore_range'
+                and (if_range is None or if_range == etag(payload))):
+            start = int(self.headers['Range'].split('=')[1].rstrip('-'))
+            if start >= len(payload):
+                self.send_response(416)
+                if server.mode != 'no_total':
+                    self.send_header('Content-Range', f'bytes */{len(payload)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        body = payload[start:]
+        if start:
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(payload) - 1}/{len(payload)}')
+        else:
+            self.send_response(200)
+        if server.mode != 'no_validator':
+            self.send_header('ETag', etag(payload))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if server.truncate > 0:
+            server.truncate -= 1
+            body = body[:len(body) // 2]
+            if server.change_after_truncate:
+                server.payload = CHANGED
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    httpd.mode, httpd.truncate, httpd.ranges, httpd.if_ranges = 'range', 0, [], []
+    httpd.payload, httpd.change_after_truncate = PAYLOAD, False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}/file.zip'
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def session():
+    session = downloader.new_session()
+    session.trust_env = False  # no proxy between the test and the stand-in
+    yield session
+    session.close()
+
+@pytest.fixture
+def target(tmp_path):
+    return str(tmp_path / 'file.zip')
+
+def write_part(target, data, validator=etag(PAYLOAD)):
+    """A .part file left by an earlier run, cut from the version validator identifies"""
+    with open(part_path(target), 'wb') as f:
+        f.write(data)
+    if validator is not None:
+        with open(validator_path(target), 'w') as f:
+            f.write(validator)
+
+def assert_downloaded(target, payload=PAYLOAD):
+    with open(target, 'rb') as f:
+        assert f.read() == payload
+    assert not os.path.exists(part_path(target))
+    assert not os.path.exists(validator_path(target))
+
+def assert_nothing_left(target):
+    assert not os.path.exists(target)
+    assert not os.path.exists(part_path(target))
+    assert not os.path.exists(validator_path(target))
+
+def test_resumes_a_part_file_with_a_range_request(server, session, target):
+    write_part(target, PAYLOAD[:100_000])
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges == ['bytes=100000-']
+    assert server.if_ranges == [etag(PAYLOAD)]
+    assert_downloaded(target)
+
+def test_restarts_when_the_server_ignores_the_range(server, session, target):
+    server.mode = 'ignore_range'
+    write_part(target, b'\xff' * 100_000)
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges == ['bytes=100000-']
+    assert_downloaded(target)
+
+def test_416_accepts_a_part_file_of_the_announced_size(server, session, target):
+    write_part(target, PAYLOAD)
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges == [f'bytes={len(PAYLOAD)}-']
+    assert_downloaded(target)
+
+def test_416_restarts_a_stale_part_file(server, session, target):
+    # Left over from a larger, older version of the file
+    write_part(target, PAYLOAD + b'old tail')
+    assert stream_to_file(session, server.url, target) == len(PAYLOAD)
+    assert server.ranges == [f'bytes={len(PAYLOAD) + 8}-', None]
+    assert_downloaded(target)
+
+def test_416_without_a_total_size_restarts(server, session, target):
+    server.mode = 'no_total'
+    write_part(target, PAYLOAD)
+    assert stream_to_file(session, server.url, target) == len(PAYLOAD)
+    assert server.ranges == [f'bytes={len(PAYLOAD)}-', None]
+    assert_downloaded(target)
+
+def test_416_with_a_corrupt_part_file_fails_the_checksum(server, session, target):
+    write_part(target, b'\x00' * len(PAYLOAD))
+    with pytest.raises(DownloadError, match='checksum mismatch'):
+        stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256)
+    assert_nothing_left(target)
+
+def test_truncated_body_is_resumed(server, session, target, monkeypatch):
+    # Chunks smaller than the half body that arrives, so part of it reaches the .part file
+    monkeypatch.setattr(downloader, 'DOWNLOAD_CHUNK_SIZE', 16 * 1024)
+    server.truncate = 1
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    # Resumed from the last whole chunk written before the connection dropped
+    resumed_at = len(PAYLOAD) // 2 // (16 * 1024) * (16 * 1024)
+    assert server.ranges == [None, f'bytes={resumed_at}-']
+    assert_downloaded(target)
+
+def test_body_truncated_on_every_attempt_fails_and_keeps_the_part_file(server, session, target, monkeypatch):
+    monkeypatch.setattr(downloader, 'DOWNLOAD_CHUNK_SIZE', 16 * 1024)
+    monkeypatch.setattr(downloader, 'DOWNLOAD_RETRIES', 1)
+    server.truncate = 10
+    with pytest.raises(DownloadError, match='after 2 attempts'):
+        stream_to_file(session, server.url, target)
+    assert len(server.ranges) == 2
+    assert not os.path.exists(target)
+    # Kept for the next run, with the version it was cut from
+    with open(part_path(target), 'rb') as f:
+        kept = f.read()
+    assert 0 < len(kept) < len(PAYLOAD) and PAYLOAD.startswith(kept)
+    with open(validator_path(target)) as f:
+        assert f.read() == etag(PAYLOAD)
+
+    # The next run resumes it
+    server.truncate = 0
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges[-1] == f'bytes={len(kept)}-'
+    assert_downloaded(target)
+
+def test_file_changed_between_attempts_restarts_from_zero(server, session, target, monkeypatch):
+    monkeypatch.setattr(downloader, 'DOWNLOAD_CHUNK_SIZE', 16 * 1024)
+    server.truncate, server.change_after_truncate = 1, True
+    assert stream_to_file(session, server.url, target) == len(CHANGED)
+    # The resume was conditional on the first version; the server answered 200 with the new one
+    assert server.if_ranges == [None, etag(PAYLOAD)]
+    assert_downloaded(target, CHANGED)
+
+def test_file_changed_between_runs_restarts_from_zero(server, session, target):
+    server.payload = CHANGED
+    write_part(target, PAYLOAD[:100_000])
+    assert stream_to_file(session, server.url, target) == len(CHANGED)
+    assert_downloaded(target, CHANGED)
+
+def test_part_file_of_unknown_version_is_discarded(server, session, target):
+    write_part(target, b'\xff' * 100_000, validator=None)
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges == [None]
+    assert_downloaded(target)
+
+def test_resumes_within_a_call_without_validators(server, session, target, monkeypatch):
+    monkeypatch.setattr(downloader, 'DOWNLOAD_CHUNK_SIZE', 16 * 1024)
+    server.mode, server.truncate = 'no_validator', 1
+    assert stream_to_file(session, server.url, target, expected_sha256=PAYLOAD_SHA256) == len(PAYLOAD)
+    assert server.ranges[0] is None and server.ranges[1] is not None
+    assert server.if_ranges == [None, None]
+    assert_downloaded(target)
+
+def test_checksum_mismatch_discards_the_download(server, session, target):
+    with pytest.raises(DownloadError, match='checksum mismatch'):
+        stream_to_file(session, server.url, target, expected_sha256='0' * 64)
+    assert_nothing_left(target)
+
+def test_download_pool_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, 'get_cache_dir', lambda: str(tmp_path))
+    monkeypatch.setattr(data_loader, 'DOWNLOAD_WORKERS', 2)
+    lock = threading.Lock()
+    running, peak, started = [0], [0], []
+
+    def fake_download(file_id, file_path, is_gzipped, expected_sha256):
+        with lock:
+            started.append(file_id)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        if file_id == data_loader.GOOGLE_DRIVE_FILES['tblDecCode']:
+            return None  # one failed download
+        with open(file_path, 'wb') as f:
+            f.write(b'data')
+        return 4
+    monkeypatch.setattr(data_loader, 'download_from_google_drive', fake_download)
+
+    # One file is already cached and is skipped
+    cached = data_loader.RAW_DATA_FILES['juvenile_history']
+    (tmp_path / cached).write_bytes(b'cached')
+
+    assert data_loader.download_raw_files_from_google_drive()
+    assert peak[0] == 2
+    assert sorted(started) == sorted(file_id for key, file_id in data_loader.GOOGLE_DRIVE_FILES.items()
+                                     if key != 'juvenile_history')
+    assert (tmp_path / cached).read_bytes() == b'cached'
+    assert not (tmp_path / data_loader.RAW_DATA_FILES['tblDecCode']).exists()
+    assert (tmp_path / data_loader.RAW_DATA_FILES['juvenile_cases']).read_bytes() == b'data'
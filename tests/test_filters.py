@@ -0,0 +1,122 @@
+"""
+Semantics of the compiled filter engine shared by every chart and stats path:
+policy-era date ranges (not calendar years), normalized representation,
+whitespace- and case-insensitive case types, and predicates skipped when a
+table lacks their column. The aggregate cube must select the same rows.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.aggregates import AggregateCube
+from api.filters import (
+    TIME_PERIODS, Filters, FilterPlan, apply_filters, compile_filters, filter_index, prepare_filter_columns,
+)
+
+DATES = [
+    "2016-05-01", "2018-01-15", "2018-04-05 23:59:59", "2018-04-06", "2021-01-19 23:59:59",
+    "2021-01-20", "2025-03-31 23:59:59", "2025-04-01", "2030-01-01", None,
+]
+# HAS_LEGAL_REP values with the representation filter they belong to
+REPRESENTATION = [
+    ("Has Legal Representation", "represented"), ("No Legal Representation", "unrepresented"),
+    ("Unknown", None), ("Yes", "represented"), ("N", "unrepresented"), (True, "represented"),
+    (" true ", "represented"), (" FALSE ", "unrepresented"), (None, None), (0, "unrepresented"),
+    ("maybe", None),
+]
+CASE_TYPES = ["RMV", " rmv ", "AOC", None, np.nan, "Rmv"]
+
+@pytest.fixture
+def analysis_rows():
+    n = len(DATES) * len(REPRESENTATION)
+    return pd.DataFrame({
+        "hearing_date_combined": pd.to_datetime([DATES[i % len(DATES)] for i in range(n)], format="ISO8601"),
+        "HAS_LEGAL_REP": pd.Series([REPRESENTATION[i // len(DATES)][0] for i in range(n)], dtype=object),
+        "BINARY_OUTCOME": ["Favorable", "Unfavorable", "Other"] * (n // 3) + ["Favorable"] * (n % 3),
+        "POLICY_ERA": "other",
+        "CASE_TYPE": pd.Series([CASE_TYPES[i % len(CASE_TYPES)] for i in range(n)], dtype=object),
+    })
+
+def expected_rows(df, filters):
+    """Row labels the filters should select, spelled out row by row"""
+    keep = []
+    for i, row in df.iterrows():
+        date = row["hearing_date_combined"]
+        if filters.time_period != "all":
+            start, end = TIME_PERIODS[filters.time_period]
+            if pd.isna(date) or date < start or (end is not None and date >= end):
+                continue
+        if filters.representation != "all":
+            if REPRESENTATION[i // len(DATES)][1] != filters.representation:
+                continue
+        if filters.case_type != "all":
+            if str(row["CASE_TYPE"]).strip().lower() != filters.case_type.strip().lower():
+                continue
+        keep.append(i)
+    return pd.Index(keep, dtype=df.index.dtype)
+
+ALL_FILTERS = [
+    Filters(time_period=tp, representation=rep, case_type=ct)
+    for tp, rep, ct in itertools.product(
+        list(TIME_PERIODS), ["all", "represented", "unrepresented"], ["all", "RMV", " rmv", "AOC", "DEP"]
+    )
+]
+
+@pytest.mark.parametrize("prepared", [False, True])
+def test_apply_filters_selects_the_specified_rows(analysis_rows, prepared):
+    df = prepare_filter_columns(analysis_rows) if prepared else analysis_rows
+    for filters in ALL_FILTERS:
+        result = apply_filters(df, filters)
+        pd.testing.assert_index_equal(result.index, expected_rows(analysis_rows, filters), obj=str(filters))
+
+def test_policy_eras_are_date_ranges_not_calendar_years():
+    df = pd.DataFrame({"hearing_date_combined": pd.to_datetime(["2018-01-15", "2021-01-19", "2021-01-20", "2025-02-01"])})
+    assert apply_filters(df, Filters(time_period="trump1")).index.tolist() == [1]
+    assert apply_filters(df, Filters(time_period="biden")).index.tolist() == [2, 3]
+    assert apply_filters(df, Filters(time_period="trump2")).empty
+
+def test_representation_level_is_normalized():
+    df = pd.DataFrame({"REPRESENTATION_LEVEL": ["COURT", " board", "no_representation", "OTHER", None]})
+    assert apply_filters(df, Filters(representation="represented")).index.tolist() == [0, 1]
+    assert apply_filters(df, Filters(representation="unrepresented")).index.tolist() == [2]
+
+def test_predicates_without_a_column_are_skipped():
+    # juvenile_cases has no representation column: the filter must not empty it
+    df = pd.DataFrame({"NAT": ["GT", "HO", "MX"], "CASE_TYPE": ["RMV", "AOC", "rmv"]})
+    filters = Filters(representation="represented", case_type="RMV")
+    assert apply_filters(df, filters).index.tolist() == [0, 2]
+
+def test_no_active_filter_returns_the_frame_itself(analysis_rows):
+    assert apply_filters(analysis_rows, Filters()) is analysis_rows
+    assert apply_filters(analysis_rows, None) is analysis_rows
+
+def test_query_forms_compile_to_the_same_plan():
+    plan = compile_filters(Filters(time_period="biden", representation="represented", case_type="RMV"))
+    assert plan == FilterPlan(time_period="biden", rep_code=1, case_type_key="rmv")
+    assert compile_filters({"time_period": "biden", "representation": "represented", "case_type": "RMV"}) == plan
+    assert compile_filters({"timePeriod": " BIDEN ", "representation": "Represented", "caseType": " rmv "}) == plan
+    assert compile_filters(plan) is plan
+    assert compile_filters({"time_period": "obama", "representation": "some"}).is_empty
+
+def test_selected_rows_are_memoized_per_plan(analysis_rows):
+    plan = compile_filters(Filters(time_period="biden"))
+    index = filter_index(analysis_rows)
+    assert index.rows(plan) is index.rows(plan)
+    assert filter_index(analysis_rows) is index
+    assert filter_index(analysis_rows.copy()) is not index
+
+def test_aggregate_cube_matches_the_filtered_rows(analysis_rows):
+    # analysis_filtered holds representation labels as strings
+    labels = analysis_rows["HAS_LEGAL_REP"]
+    analysis_rows["HAS_LEGAL_REP"] = labels.where(labels.isna(), labels.astype(str))
+    df = prepare_filter_columns(analysis_rows)
+    cube = AggregateCube.from_frame(df)
+    for filters in ALL_FILTERS:
+        rows = apply_filters(df, filters)
+        masks = cube.masks(filters)
+        assert cube.total(masks) == len(rows), filters
+        expected = pd.crosstab(rows["HAS_LEGAL_REP"], rows["BINARY_OUTCOME"])
+        actual = cube.crosstab("HAS_LEGAL_REP", "BINARY_OUTCOME", masks)
+        pd.testing.assert_frame_equal(actual, expected, check_names=False, check_dtype=False)
@@ -0,0 +1,35 @@
+"""FindingsSlice.is_empty: only active filters that select no rows count as filtered-empty"""
+import pandas as pd
+
+from api.aggregates import AggregateCube
+from api.chart_generator import FindingsSlice
+from api.filters import Filters
+
+def _cube(dates):
+    frame = pd.DataFrame({
+        "hearing_date_combined": pd.to_datetime(dates),
+        "HAS_LEGAL_REP": ["Has Legal Representation"] * len(dates),
+        "BINARY_OUTCOME": ["Favorable"] * len(dates),
+        "POLICY_ERA": ["Biden Era (2021-2024)"] * len(dates),
+        "CASE_TYPE": ["RMV"] * len(dates),
+    })
+    return AggregateCube.from_frame(frame)
+
+def test_unfiltered_empty_slice_is_not_filtered_empty():
+    cube = _cube([])
+    for filters in (None, Filters(), {}, {"time_period": "all", "representation": "all"}):
+        findings = FindingsSlice(cube, filters)
+        assert findings.total == 0
+        assert not findings.is_empty
+
+def test_active_filters_selecting_no_rows_are_filtered_empty():
+    cube = _cube(["2022-03-01", "2023-07-15"])
+    assert FindingsSlice(cube, Filters(time_period="trump1")).is_empty
+    assert FindingsSlice(cube, Filters(representation="unrepresented")).is_empty
+    assert FindingsSlice(cube, {"case_type": "AOC"}).is_empty
+
+def test_active_filters_selecting_rows_are_not_empty():
+    cube = _cube(["2022-03-01", "2023-07-15"])
+    findings = FindingsSlice(cube, Filters(time_period="biden", representation="represented"))
+    assert findings.total == 2
+    assert not findings.is_empty
@@ -0,0 +1,68 @@
+"""
+Chunked and parallel ingestion return the same frames as one serial
+pd.read_csv of each raw file with its spec's arguments
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from api import ingest
+from api.config import RAW_DATA_FILES, RAW_TABLE_SPECS, table_columns
+from benchmarks.synthetic import write_raw_files
+
+@pytest.fixture(scope='module')
+def raw_dir(tmp_path_factory):
+    raw_dir = tmp_path_factory.mktemp('raw')
+    write_raw_files(str(raw_dir), n_cases=5000, seed=11)
+    return str(raw_dir)
+
+@pytest.fixture(scope='module')
+def jobs(raw_dir):
+    return {
+        key: (os.path.join(raw_dir, RAW_DATA_FILES[spec['file']]), spec, table_columns(key))
+        for key, spec in RAW_TABLE_SPECS.items()
+    }
+
+def serial_read_csv(path, spec, columns):
+    """The table as a single pd.read_csv with the spec's arguments reads it"""
+    arguments = dict(spec.get('read_csv', {}))
+    if columns is not None:
+        arguments['usecols'] = lambda col: col in columns
+        if 'parse_dates' in arguments:
+            arguments['parse_dates'] = [col for col in arguments['parse_dates'] if col in columns]
+    df = pd.read_csv(path, **arguments)
+    for col in spec.get('coerce_dates', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+@pytest.mark.parametrize('chunk_rows', [0, 1000, 100_000])
+def test_chunked_read_matches_read_csv(jobs, chunk_rows):
+    for key, (path, spec, columns) in jobs.items():
+        df, report = ingest.read_table(path, spec, columns=columns, chunk_rows=chunk_rows)
+        pd.testing.assert_frame_equal(df, serial_read_csv(path, spec, columns), obj=key)
+        assert report['rows'] == len(df)
+        if chunk_rows == 1000 and len(df) > 1000:
+            assert report['chunks'] > 1
+
+def test_parallel_read_matches_read_csv(jobs, tmp_path):
+    results = {key: df for key, df, _ in ingest.read_tables_parallel(jobs, 3, str(tmp_path))}
+    assert set(results) == set(jobs)
+    for key, (path, spec, columns) in jobs.items():
+        pd.testing.assert_frame_equal(results[key], serial_read_csv(path, spec, columns), obj=key)
+    # Worker files are consumed
+    assert os.listdir(tmp_path) == []
+
+def test_pool_workers_are_not_forked(jobs, tmp_path, monkeypatch):
+    contexts = []
+
+    class RecordingPool(ingest.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            contexts.append(kwargs.get('mp_context'))
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(ingest, 'ProcessPoolExecutor', RecordingPool)
+    pair = dict(list(jobs.items())[:2])
+    assert len(list(ingest.read_tables_parallel(pair, 2, str(tmp_path)))) == 2
+    assert [context.get_start_method() for context in contexts] == [ingest._START_METHOD]
+    assert ingest._START_METHOD != 'fork'
@@ -0,0 +1,57 @@
+"""
+The quarter index gives the groupby-by-quarter of the filtered rows, and an
+index rolled forward to a later day matches one built on that day
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.filters import Filters, apply_filters, prepare_filter_columns
+from api.quarter_index import QuarterIndex
+
+AS_OF = pd.Timestamp("2024-06-30 12:00")
+FILTERS = [Filters(), Filters("biden"), Filters("trump1", "represented"), Filters("all", "unrepresented", "RMV"),
+           Filters(case_type="DEP")]
+
+@pytest.fixture
+def analysis_rows():
+    rng = np.random.default_rng(3)
+    n = 2000
+    dates = pd.Series(pd.Timestamp("2017-06-01") + pd.to_timedelta(rng.integers(0, 365 * 8, n), "D"))
+    dates[rng.random(n) < 0.05] = pd.NaT
+    labels = pd.Series(rng.choice(["Has Legal Representation", "No Legal Representation", None], n, p=[.4, .5, .1]))
+    return prepare_filter_columns(pd.DataFrame({
+        "hearing_date_combined": dates,
+        "HAS_LEGAL_REP": labels,
+        "BINARY_OUTCOME": rng.choice(["Favorable", "Unfavorable"], n),
+        "CASE_TYPE": rng.choice(["RMV", " rmv", "AOC"], n),
+    }))
+
+def expected_quarters(df, filters, as_of):
+    rows = apply_filters(df, filters)
+    rows = rows[rows["hearing_date_combined"] <= as_of]
+    quarter = rows["hearing_date_combined"].dt.to_period("Q").rename("YEAR_QUARTER")
+    return pd.DataFrame({
+        "total_cases": rows["HAS_LEGAL_REP"].notna().groupby(quarter).sum().astype(np.int64),
+        "represented_cases": (rows["HAS_LEGAL_REP"] == "Has Legal Representation").groupby(quarter).sum().astype(np.int64),
+    })
+
+def test_quarters_match_the_groupby_of_the_filtered_rows(analysis_rows):
+    index = QuarterIndex.from_frame(analysis_rows, as_of=AS_OF)
+    for filters in FILTERS:
+        pd.testing.assert_frame_equal(index.quarterly_representation(filters),
+                                      expected_quarters(analysis_rows, filters, AS_OF), obj=str(filters))
+
+def test_roll_forward_matches_an_index_built_later(analysis_rows):
+    later = AS_OF + pd.Timedelta(days=200)
+    index = QuarterIndex.from_frame(analysis_rows, as_of=AS_OF)
+    assert index.roll_forward(later) > 0
+    rebuilt = QuarterIndex.from_frame(analysis_rows, as_of=later)
+    for filters in FILTERS:
+        pd.testing.assert_frame_equal(index.quarterly_representation(filters),
+                                      rebuilt.quarterly_representation(filters), obj=str(filters))
+
+def test_unknown_case_type_is_empty(analysis_rows):
+    index = QuarterIndex.from_frame(analysis_rows, as_of=AS_OF)
+    assert index.quarterly_representation(Filters(case_type="XYZ")).empty
+    assert QuarterIndex.from_frame(analysis_rows.iloc[:0], as_of=AS_OF).quarterly_representation().empty
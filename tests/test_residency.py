@@ -0,0 +1,70 @@
+"""
+Residency of intermediate tables: spill files round-trip exactly, and the
+memory figures enforce_budget measures are reused by the status endpoint
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import models, snapshot
+from api.models import cache
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'get_cache_dir', lambda: str(tmp_path))
+    return tmp_path / 'spill'
+
+def frame(missing):
+    return pd.DataFrame({
+        'IDNCASE': pd.array([1, 2, None], dtype='Int64'),
+        'decision_description': pd.Series(['Removal', missing[0], 'Relief'], dtype=object),
+        'CASE_OUTCOME': pd.Series([missing[1], 'Other', 'Other'], dtype=object),
+        'NAT': pd.Categorical(['GT', None, 'HO']),
+        'COMP_DATE': pd.to_datetime(['2020-01-01', None, '2021-06-30']),
+    })
+
+@pytest.mark.parametrize('missing', [(np.nan, np.nan), (None, None), (np.nan, None)])
+def test_spilled_table_reads_back_exactly(spill_dir, missing):
+    df = frame(missing)
+    read_back = snapshot.spill_table('merged_data', df, 1)
+    assert [path.suffix for path in spill_dir.iterdir()] == ['.arrow']
+    restored = read_back()
+    pd.testing.assert_frame_equal(restored, df)
+    for col in ('decision_description', 'CASE_OUTCOME'):
+        assert [type(v) for v in restored[col]] == [type(v) for v in df[col]]
+
+def test_mixed_missing_values_are_pickled(spill_dir):
+    df = pd.DataFrame({'CASE_OUTCOME': pd.Series([np.nan, None, 'Other'], dtype=object)})
+    read_back = snapshot.spill_table('merged_data', df, 1)
+    assert [path.suffix for path in spill_dir.iterdir()] == ['.pkl']
+    assert [type(v) for v in read_back()['CASE_OUTCOME']] == [float, type(None), str]
+
+def test_older_spill_files_are_removed(spill_dir):
+    snapshot.spill_table('merged_data', frame((np.nan, np.nan)), 1)
+    read_back = snapshot.spill_table('merged_data', frame((np.nan, np.nan)), 2)
+    assert [path.name for path in spill_dir.iterdir()] == ['merged_data.v2.arrow']
+    assert read_back() is not None
+
+def test_status_memory_reuses_the_budget_measurement(spill_dir, monkeypatch):
+    cache.publish({
+        'analysis_filtered': pd.DataFrame({'x': np.arange(1000)}),
+        'merged_data': frame((np.nan, np.nan)),
+        'data_loaded': True,
+    })
+    scans = []
+    memory_usage = models.DataCache.memory_usage
+    monkeypatch.setattr(models.DataCache, 'memory_usage', lambda self: scans.append(1) or memory_usage(self))
+    try:
+        assert cache.enforce_budget({'merged_data': lambda: None}, budget_mb=0) == ['merged_data']
+        assert len(scans) == 1
+        figures = cache.resident_memory()
+        assert set(figures) == {'analysis_filtered'}
+        assert cache.resident_memory() == figures
+        assert len(scans) == 1
+        # Bringing the spilled table back changes the resident tables: measured once more
+        assert cache.get('merged_data') is not None
+        assert set(cache.resident_memory()) == {'analysis_filtered', 'merged_data'}
+        cache.resident_memory()
+        assert len(scans) == 2
+    finally:
+        cache.clear()
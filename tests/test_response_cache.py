@@ -0,0 +1,87 @@
+"""
+Cached findings responses: a hit serves the stored bytes without running the
+view, a new data version or a new day misses, and the byte-bounded LRU evicts
+the least recently used responses first
+"""
+import datetime
+
+import pytest
+from flask import Flask, jsonify, request
+
+from api import response_cache as response_cache_module
+from api.models import cache
+from api.response_cache import ResponseCache, cached_response, response_cache
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/findings')
+    @cached_response('findings')
+    def findings():
+        calls.append(request.args.get('time_period'))
+        return jsonify({'call': len(calls), 'time_period': request.args.get('time_period')})
+
+    response_cache.clear()
+    cache.publish({'data_loaded': True})
+    try:
+        with app.test_client() as client:
+            client.calls = calls
+            yield client
+    finally:
+        cache.clear()
+        response_cache.clear()
+
+def test_hit_returns_the_same_bytes_without_the_view(client):
+    first = client.get('/findings?time_period=biden')
+    second = client.get('/findings?time_period=biden')
+    assert client.calls == ['biden']
+    assert second.get_data() == first.get_data()
+    assert second.status_code == 200 and second.is_json
+    # Other filters are another entry
+    client.get('/findings?time_period=trump1')
+    assert client.calls == ['biden', 'trump1']
+
+def test_new_data_version_misses(client):
+    client.get('/findings')
+    cache.publish({'data_loaded': True})
+    response = client.get('/findings')
+    assert len(client.calls) == 2
+    assert response.get_json()['call'] == 2
+
+def test_new_day_misses(client, monkeypatch):
+    client.get('/findings')
+
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date.today() + datetime.timedelta(days=1)
+    monkeypatch.setattr(response_cache_module, 'date', Tomorrow)
+    client.get('/findings')
+    assert len(client.calls) == 2
+    client.get('/findings')
+    assert len(client.calls) == 2
+
+def test_nothing_is_cached_while_the_data_is_not_loaded(client):
+    cache.set_loaded(False)
+    client.get('/findings')
+    client.get('/findings')
+    assert len(client.calls) == 2
+
+def test_lru_evicts_oldest_first_within_the_byte_budget():
+    lru = ResponseCache(max_bytes=10)
+    for key in 'abc':
+        lru.put(key, b'xxx', 200, 'application/json')
+    assert lru.stats()['bytes'] == 9
+    # Reading 'a' makes 'b' the least recently used
+    assert lru.get('a') is not None
+    lru.put('d', b'xxxx', 200, 'application/json')
+    assert lru.get('b') is None
+    assert [lru.get(key) is not None for key in 'acd'] == [True, True, True]
+    assert lru.stats()['bytes'] == 10
+    # Replacing an entry counts its new size only; a body over the budget is not stored
+    lru.put('a', b'x', 200, 'application/json')
+    assert lru.stats()['bytes'] == 8
+    lru.put('e', b'x' * 11, 200, 'application/json')
+    assert lru.get('e') is None and lru.stats()['entries'] == 3
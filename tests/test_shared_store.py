@@ -0,0 +1,55 @@
+"""
+Memory-mapped mode across workers: a rebuild republishes only the mapped
+tables, and a worker re-maps once another one has rewritten the store
+"""
+import pandas as pd
+import pytest
+
+from api import data_loader, mmap_store, pipeline
+from api.models import cache
+
+@pytest.fixture
+def shared_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(mmap_store, 'get_cache_dir', lambda: str(tmp_path))
+    monkeypatch.setattr(data_loader, 'DATA_MMAP', True)
+    monkeypatch.setattr(data_loader, '_shared_generation', None)
+    cache.publish({
+        'analysis_filtered': pd.DataFrame({'BINARY_OUTCOME': ['Favorable', 'Unfavorable']}),
+        'juvenile_cases': pd.DataFrame({'IDNCASE': [1, 2], 'NAT': ['GT', 'HO']}),
+        'reps_assigned': pd.DataFrame({'IDNCASE': [1], 'STRATTYLEVEL': ['COURT']}),
+        'aggregates': 'cube of this build',
+        'data_loaded': True,
+    })
+    yield
+    cache.clear()
+
+def other_worker_rewrites(juvenile_cases):
+    """A reload in another process: rewrite a table and stamp the store"""
+    with mmap_store.store_lock(exclusive=True):
+        mmap_store.write_table('juvenile_cases', juvenile_cases)
+        mmap_store.bump_generation()
+
+def test_republish_keeps_the_derived_tables(shared_store):
+    pipeline._republish_shared_tables()
+    assert cache.get('aggregates') == 'cube of this build'
+    assert cache.get('juvenile_cases')['NAT'].tolist() == ['GT', 'HO']
+    # The rebuilding worker already serves the generation it wrote
+    assert not data_loader.remap_shared_tables()
+
+def test_worker_remaps_after_another_worker_rewrites_the_store(shared_store):
+    pipeline._republish_shared_tables()
+    version = cache.version()
+    other_worker_rewrites(pd.DataFrame({'IDNCASE': [3], 'NAT': ['MX']}))
+
+    assert data_loader.remap_shared_tables()
+    assert cache.version() > version
+    assert cache.get('juvenile_cases')['NAT'].tolist() == ['MX']
+    # Derived from the old tables: dropped, rebuilt on next use
+    assert cache.get('aggregates') is None
+    assert cache.is_loaded()
+    assert not data_loader.remap_shared_tables()
+
+def test_no_remap_before_the_store_is_mapped(shared_store):
+    other_worker_rewrites(pd.DataFrame({'IDNCASE': [3], 'NAT': ['MX']}))
+    assert not data_loader.remap_shared_tables()
+    assert cache.get('aggregates') == 'cube of this build'
@@ -0,0 +1,45 @@
+"""
+Snapshot tables round-trip through their Arrow files: categorical and nullable
+integer dtypes and the stored index come back, with or without projecting
+the read to a subset of columns
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import snapshot
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'get_cache_dir', lambda: str(tmp_path))
+    return tmp_path / 'snapshot'
+
+def frame():
+    return pd.DataFrame({
+        'IDNCASE': pd.array([101, None, 103, 104], dtype='Int64'),
+        'NAT': pd.Categorical(['GT', 'HO', None, 'GT'], categories=['GT', 'HO', 'SV']),
+        'CASE_TYPE': pd.Categorical(['RMV', 'AOC', 'RMV', 'RMV'], ordered=True),
+        'AGE_AT_FILING': np.array([15.5, 9.0, np.nan, 17.25], dtype=np.float32),
+        'COMP_DATE': pd.to_datetime(['2020-01-01', None, '2021-06-30', '2023-03-15']),
+        'decision_description': ['Removal', None, 'Relief', 'Removal'],
+    }, index=pd.Index([7, 3, 9, 1], name='row'))
+
+def test_table_round_trips(snapshot_dir):
+    df = frame()
+    manifest = snapshot.write_snapshot({'juvenile_cases': df, 'data_loaded': True})
+    assert set(manifest['tables']) == {'juvenile_cases'}
+    assert manifest['tables']['juvenile_cases']['format'] == 'arrow'
+    pd.testing.assert_frame_equal(snapshot.read_table('juvenile_cases'), df)
+
+@pytest.mark.parametrize('columns', [['NAT', 'IDNCASE'], ['CASE_TYPE'], ['IDNCASE', 'NOT_STORED']])
+def test_projected_read_keeps_dtypes_and_index(snapshot_dir, columns):
+    df = frame()
+    snapshot.write_snapshot({'juvenile_cases': df})
+    projected = snapshot.read_table('juvenile_cases', columns=columns)
+    # Columns come back in the order they are requested, unknown ones are skipped
+    pd.testing.assert_frame_equal(projected, df[[col for col in columns if col in df.columns]])
+
+def test_missing_table_reads_none(snapshot_dir):
+    assert snapshot.read_table('juvenile_cases') is None
+    snapshot.write_snapshot({'juvenile_cases': frame()})
+    assert snapshot.read_table('analysis_filtered') is None
@@ -0,0 +1,136 @@
+"""
+Parity of the precomputed statistics with the pandas computations they
+replace: the materialized overview with the per-request get_data_statistics
+payload, the representation summary with the cases x reps merge, and
+top_counts with value_counts().head(n)
+"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+from api.api_routes import get_overview
+from api.chart_generator import top_counts
+from api.models import cache
+from api.rep_summary import RepresentationSummary
+from benchmarks.synthetic import load_synthetic
+
+def merged_statistics(juvenile_cases, reps_assigned):
+    """The overview payload as the endpoint computed it on every request, merging cases and reps"""
+    cases_with_rep = juvenile_cases.merge(reps_assigned, on='IDNCASE', how='left')
+    has_representation = (~cases_with_rep['STRATTYLEVEL'].isna()).sum()
+    ages = (pd.Timestamp.now() - juvenile_cases['C_BIRTHDATE']).dt.days / 365.25
+    avg_age = ages.mean() if not ages.isna().all() else None
+
+    current_date = pd.Timestamp.now()
+    historical_data = juvenile_cases[
+        (juvenile_cases['LATEST_HEARING'].notna()) & (juvenile_cases['LATEST_HEARING'] <= current_date)
+    ].copy()
+    historical_data['month'] = historical_data['LATEST_HEARING'].dt.to_period('M')
+    monthly_counts = historical_data.groupby('month').size()
+    return {
+        "total_cases": len(juvenile_cases),
+        "average_age": round(avg_age, 1) if avg_age else None,
+        "representation_rate": round(has_representation / len(juvenile_cases) * 100, 1),
+        "top_nationalities": juvenile_cases['NAT'].value_counts().head(10).to_dict(),
+        "demographic_breakdown": {
+            "by_gender": juvenile_cases['Sex'].value_counts().to_dict(),
+            "by_custody": juvenile_cases['CUSTODY'].value_counts().to_dict(),
+            "by_case_type": juvenile_cases['CASE_TYPE'].value_counts().to_dict(),
+        },
+        "representation_breakdown": cases_with_rep['STRATTYTYPE'].value_counts().to_dict(),
+        "language_breakdown": juvenile_cases['LANG'].value_counts().to_dict(),
+        "trends": {"monthly_cases": {str(month): count for month, count in monthly_counts.tail(12).items()}},
+    }
+
+@pytest.fixture(scope='module')
+def tables():
+    tables = load_synthetic(n_cases=4000, seed=5)
+    yield tables
+    cache.clear()
+
+@pytest.fixture
+def client(tables):
+    app = Flask(__name__)
+    app.add_url_rule('/api/overview', 'get_overview', get_overview)
+    cache.publish({**tables, 'overview': None, 'rep_summary': None, 'data_loaded': True})
+    with app.test_client() as client, contextlib.redirect_stdout(io.StringIO()):
+        yield client
+
+def test_overview_matches_the_per_request_statistics(client, tables):
+    response = client.get('/api/overview')
+    assert response.status_code == 200
+    expected = merged_statistics(tables['juvenile_cases'], tables['reps_assigned'])
+    assert response.get_json() == client.application.json.loads(client.application.json.dumps(expected))
+    # The response sorts keys: the materialized payload keeps value_counts order
+    payload = cache.get('overview').payload
+    for key in ('top_nationalities', 'representation_breakdown', 'language_breakdown'):
+        assert list(payload[key]) == list(expected[key])
+
+def test_overview_revalidates_with_its_etag(client):
+    first = client.get('/api/overview')
+    etag = first.headers['ETag']
+    assert etag
+    revalidated = client.get('/api/overview', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.get_data() == b''
+    assert client.get('/api/overview', headers={'If-None-Match': '"other"'}).status_code == 200
+
+def reps_frame(rng, n_reps, n_keys):
+    ids = pd.array(rng.integers(0, n_keys, n_reps), dtype='Int64')
+    ids[rng.random(n_reps) < 0.03] = pd.NA
+    levels = pd.Series(rng.choice(['COURT', 'BOARD', None], n_reps, p=[.5, .3, .2]))
+    types = pd.Categorical(rng.choice(['ALIEN', 'GOV', None], n_reps, p=[.6, .3, .1]),
+                           categories=['ALIEN', 'GOV', 'UNUSED'])
+    return pd.DataFrame({'IDNCASE': ids, 'STRATTYLEVEL': levels, 'STRATTYTYPE': types})
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_representation_summary_matches_the_merge(seed):
+    rng = np.random.default_rng(seed)
+    reps = reps_frame(rng, 3000, 1500)
+    summary = RepresentationSummary.from_frame(reps)
+    # Cases with keys in and out of the reps table, duplicated keys and missing keys
+    case_ids = pd.array(rng.integers(-100, 2000, 2500), dtype='Int64')
+    case_ids[rng.random(2500) < 0.02] = pd.NA
+    cases = pd.DataFrame({'IDNCASE': case_ids})
+
+    merged = cases.merge(reps, on='IDNCASE', how='left')
+    has_representation, type_counts = summary.case_counts(cases['IDNCASE'])
+    assert has_representation == merged['STRATTYLEVEL'].notna().sum()
+    expected = merged['STRATTYTYPE'].value_counts()
+    assert list(type_counts.to_dict().items()) == list(expected.to_dict().items())
+
+    # Cases none of which has reps: the represented count of np.isin is 0
+    outside = pd.Series(pd.array([5000, 5001], dtype='Int64'))
+    assert not np.isin(outside.to_numpy(dtype=np.int64), reps['IDNCASE'].dropna().to_numpy()).any()
+    has_representation, type_counts = summary.case_counts(outside)
+    assert has_representation == 0 and type_counts.sum() == 0
+
+def test_representation_summary_needs_categorical_types():
+    reps = reps_frame(np.random.default_rng(0), 10, 5)
+    assert RepresentationSummary.from_frame(reps.astype({'STRATTYTYPE': object})) is None
+
+def counts_frame():
+    # Ties within the top n, missing values and an unused category
+    nat = ['GT'] * 4 + ['HO'] * 4 + ['SV'] * 3 + ['MX'] * 3 + ['EC'] * 2 + [None] * 5
+    return pd.DataFrame({
+        'NAT': pd.Categorical(nat, categories=['EC', 'GT', 'HO', 'MX', 'SV', 'XX']),
+        'LANG': pd.Series(nat, dtype=object),
+    })
+
+@pytest.mark.parametrize('column', ['NAT', 'LANG'])
+@pytest.mark.parametrize('n', [1, 2, 3, 10])
+def test_top_counts_match_value_counts(column, n):
+    df = counts_frame()
+    expected = df[column].value_counts().head(n).to_dict()
+    assert list(top_counts(df, column, n=n).items()) == list(expected.items())
+
+@pytest.mark.parametrize('column', ['NAT', 'LANG'])
+@pytest.mark.parametrize('rows', [[0, 4, 5, 8, 20], [16, 17, 18], [], list(range(21))])
+def test_top_counts_of_rows_match_value_counts(column, rows):
+    df = counts_frame()
+    rows = np.array(rows, dtype=np.intp)
+    expected = df[column].take(rows).value_counts().head(3).to_dict()
+    assert list(top_counts(df, column, rows, n=3).items()) == list(expected.items())